@@ -1,7 +1,7 @@
-import pathlib
 from flask import abort, current_app, flash, redirect, render_template, request, url_for
 from flask_login import login_required, current_user
 from sqlalchemy import desc, func
+from sqlalchemy.orm import undefer
 from sqlalchemy.orm.exc import NoResultFound
 from datetime import date, datetime, timedelta
 
@@ -19,6 +19,7 @@ from application.auth.models import (
 )
 from application.cms.forms import SelectMultipleDataSourcesForm
 from application.cms.models import user_measure, DataSource, Topic, Subtopic
+from application.sitebuilder.build_service import request_build
 from application.sitebuilder.models import Build, BuildStatus
 from application.cms.page_service import page_service
 from application.utils import create_and_send_activation_email, user_can
@@ -222,26 +223,24 @@ def site_build():
     site_build_search_form = SiteBuildSearchForm(data={"q": q})
 
     if request.form.get("build", "") == "y":
-        import subprocess
-
-        def build():
-            current_file_path = pathlib.Path(__file__)
-            repo_root_dir = current_file_path.parent.parent.parent.resolve()
-            subprocess.call(f'{repo_root_dir}/scripts/build_site.sh')
-
-        build()
-        '''heavy_process = Process(
-            target=build,
-            daemon=True
-        )
-        heavy_process.start()'''
+        # The build worker is notified of the request and picks it up straight away
+        request_build()
 
         return render_template("admin/site_build_requested.html")
 
+    # Show the phase timings and slowest pages for the most recent build which recorded them
+    build_with_telemetry = (
+        Build.query.filter(Build.telemetry.isnot(None))
+        .order_by(Build.created_at.desc())
+        .options(undefer(Build.telemetry))
+        .first()
+    )
+
     return render_template(
         "admin/site_build.html",
         msg=msg,
         site_builds=site_builds,
+        build_with_telemetry=build_with_telemetry,
         BuildStatus=BuildStatus,
         q=q,
         site_build_search_form=site_build_search_form,
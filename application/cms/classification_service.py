@@ -105,10 +105,7 @@ class ClassificationService:
 
     @staticmethod
     def get_value_by_slug(slug):
-        from slugify import slugify
-
-        value_list = [v for v in Ethnicity.query.all() if slugify(v.value) == slug]
-        return value_list[0] if len(value_list) > 0 else None
+        return Ethnicity.query.filter_by(slug=slug).order_by(Ethnicity.id).first()
 
     @staticmethod
     def get_all_classification_values():
@@ -70,6 +70,13 @@ class PageFileSystem:
         full_path = "%s/%s" % (self.page_identifier, fs_path)
         return self.file_system.url_for_file(full_path, time_out)
 
+    def full_path(self, fs_path):
+        return "%s/%s" % (self.page_identifier, fs_path)
+
+    def content_version(self, fs_path):
+        full_path = "%s/%s" % (self.page_identifier, fs_path)
+        return self.file_system.content_version(full_path)
+
     def rename_file(self, key, new_key, fs_path):
         self.file_system.rename_file(key, new_key, fs_path)
 
@@ -130,6 +137,11 @@ class S3FileSystem:
     def list_paths(self, fs_path):
         return [x.key for x in self.bucket.objects.filter(Prefix=fs_path)]
 
+    def content_version(self, fs_path):
+        """An identifier which changes whenever the object's content does, without downloading the object itself."""
+        obj = self.s3.Object(self.bucket_name, fs_path)
+        return "%s:%s" % (obj.e_tag, obj.version_id)
+
     def list_files(self, fs_path):
         return [x.key[len(fs_path) + 1 :] for x in self.bucket.objects.filter(Prefix=fs_path)]
 
@@ -171,6 +183,11 @@ class LocalFileSystem:
 
         shutil.copyfile(local_path, full_path)
 
+    def content_version(self, fs_path):
+        full_path = "%s/%s" % (self.root, fs_path)
+        stat = os.stat(full_path)
+        return "%s:%s" % (stat.st_mtime_ns, stat.st_size)
+
     def list_paths(self, fs_path):
         full_path = "%s/%s" % (self.root, fs_path)
         try:
@@ -6,6 +6,7 @@ from typing import Optional, Iterable
 
 import sqlalchemy
 from bidict import bidict
+from slugify import slugify
 #from dictalchemy import DictableModel
 from sqlalchemy import inspect, ForeignKeyConstraint, UniqueConstraint, ForeignKey, not_, text, func, desc
 from sqlalchemy.dialects.postgresql import JSON, ARRAY
@@ -408,6 +409,9 @@ class MeasureVersion(db.Model, CopyableModel):
         order_by="Dimension.position",
         cascade="all, delete-orphan",
     )
+    # A read-only, non-dynamic view of `dimensions`. Unlike `dimensions` this can be eager-loaded, which the static site
+    # build relies on to avoid issuing a query for every measure version it renders.
+    ordered_dimensions = db.relationship("Dimension", viewonly=True, order_by="Dimension.position")
     data_sources = db.relationship(
         "DataSource", secondary="data_source_in_measure_version", back_populates="measure_versions"
     )
@@ -1012,6 +1016,7 @@ class Ethnicity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.String(255))
     position = db.Column(db.Integer())
+    slug = db.Column(db.String(255), index=True)  # set from `value`, for looking up ethnic group dashboards by URL
 
     # relationships
     classifications = db.relationship("Classification", secondary=association_table, back_populates="ethnicities")
@@ -1020,6 +1025,11 @@ class Ethnicity(db.Model):
     )
 
 
+@sqlalchemy.event.listens_for(Ethnicity.value, "set")
+def _set_ethnicity_slug(target, value, oldvalue, initiator):
+    target.slug = slugify(value) if value is not None else None
+
+
 class DimensionClassification(db.Model):
     # metadata
     __tablename__ = "dimension_categorisation"
@@ -1159,11 +1169,17 @@ class LowestLevelOfGeography(db.Model):
     name = db.Column(db.String(255), primary_key=True)
     description = db.Column(db.String(255), nullable=True)
     position = db.Column(db.Integer, nullable=False)
+    slug = db.Column(db.String(255), index=True)  # set from `name`, for looking up geography dashboards by URL
 
     # relationships
     measure_versions = db.relationship("MeasureVersion", back_populates="lowest_level_of_geography")
 
 
+@sqlalchemy.event.listens_for(LowestLevelOfGeography.name, "set")
+def _set_lowest_level_of_geography_slug(target, value, oldvalue, initiator):
+    target.slug = slugify(value) if value is not None else None
+
+
 class Topic(db.Model):
     # metadata
     __tablename__ = "topic"
@@ -4,7 +4,7 @@ from typing import Iterable, Tuple, List
 from flask import request
 from slugify import slugify
 from sqlalchemy import func, desc
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm.exc import NoResultFound
 
 from application import db
@@ -20,6 +20,8 @@ from application.cms.exceptions import (
     CannotChangeSubtopicOncePublished,
 )
 from application.cms.models import (
+    DataSource,
+    Dimension,
     Measure,
     MeasureVersion,
     Subtopic,
@@ -452,6 +454,59 @@ class PageService(Service):
         request_build()
 
     #  Methods below are used only by the static site build
+    @staticmethod
+    def _measure_version_build_options():
+        """Loader options for everything rendered onto a measure version page or into its downloads."""
+        return (
+            selectinload(MeasureVersion.ordered_dimensions).options(
+                joinedload(Dimension.dimension_chart), joinedload(Dimension.dimension_table)
+            ),
+            selectinload(MeasureVersion.uploads),
+            selectinload(MeasureVersion.data_sources).options(
+                joinedload(DataSource.publisher),
+                joinedload(DataSource.type_of_statistic),
+                joinedload(DataSource.frequency_of_release),
+            ),
+            joinedload(MeasureVersion.lowest_level_of_geography),
+        )
+
+    @staticmethod
+    def get_build_snapshot():
+        """Returns the topics to be published, the same as `get_topics(include_testing_space=False)`, but with the whole
+        publishable tree beneath them (subtopics, measures, versions, dimensions, charts, tables, uploads and data
+        sources) loaded up-front in a handful of set-based queries. The static site build renders entirely from this
+        in-memory graph rather than lazily loading each object as it is needed."""
+        topic_query = Topic.query.filter(Topic.slug != TESTING_SPACE_SLUG).options(
+            selectinload(Topic.subtopics)
+            .selectinload(Subtopic.measures)
+            .options(
+                selectinload(Measure.subtopics),
+                selectinload(Measure.replaced_by_measure).selectinload(Measure.versions),
+                selectinload(Measure.replaces_measures),
+                selectinload(Measure.versions).options(*PageService._measure_version_build_options()),
+            )
+        )
+
+        return sorted(topic_query.all(), key=lambda topic: topic.title)
+
+    @staticmethod
+    def get_measure_version_for_build(measure_version_id):
+        """Returns a single measure version with everything needed to render it preloaded, as `get_build_snapshot`
+        does for the whole site."""
+        return (
+            MeasureVersion.query.options(
+                joinedload(MeasureVersion.measure).options(
+                    selectinload(Measure.versions),
+                    selectinload(Measure.subtopics).joinedload(Subtopic.topic),
+                    selectinload(Measure.replaced_by_measure).selectinload(Measure.versions),
+                    selectinload(Measure.replaces_measures),
+                ),
+                *PageService._measure_version_build_options(),
+            )
+            .filter(MeasureVersion.id == measure_version_id)
+            .one()
+        )
+
     @staticmethod
     def get_publishable_measures_for_subtopic(subtopic):
         measures_to_publish = []
@@ -20,6 +20,9 @@ from application.cms.scanner_service import scanner_service
 from application.cms.service import Service
 from application.utils import create_guid
 
+# Callers of `get_measure_download` are responsible for removing the file; this prefix lets any that are leaked be found
+MEASURE_DOWNLOAD_PREFIX = "measure-download-"
+
 
 class UploadService(Service):
     def __init__(self):
@@ -91,11 +94,17 @@ class UploadService(Service):
 
     def get_measure_download(self, upload, file_name, directory):
         page_file_system = self.app.file_service.page_system(upload.measure_version)
-        output_file = tempfile.NamedTemporaryFile(delete=False)
+        output_file = tempfile.NamedTemporaryFile(prefix=MEASURE_DOWNLOAD_PREFIX, delete=False)
         key = "%s/%s" % (directory, file_name)
         page_file_system.read(key, output_file.name)
         return output_file.name
 
+    def get_measure_download_version(self, upload, file_name, directory):
+        """Returns the full path of the source file and an identifier for its current content, e.g. its S3 ETag."""
+        page_file_system = self.app.file_service.page_system(upload.measure_version)
+        key = "%s/%s" % (directory, file_name)
+        return page_file_system.full_path(key), page_file_system.content_version(key)
+
     def upload_data(self, measure_version, file, filename=None):
         page_file_system = self.app.file_service.page_system(measure_version)
         if not filename:
@@ -1130,7 +1130,7 @@ def set_measure_order():
 def _build_if_necessary(measure_version):
     if measure_version.eligible_for_build():
         page_service.mark_measure_version_published(measure_version)
-        build_service.request_build()
+        build_service.request_build(measure=measure_version.measure)
 
 
 @cms_blueprint.route("/measure-version/<measure_version_id>", methods=["GET"])
@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 from os.path import join, dirname
@@ -62,9 +63,21 @@ class Config:
     RDU_EMAIL = os.environ.get("RDU_EMAIL", "noreply@ethnicity-facts-figures.service.gov.uk")
 
     LOCAL_BUILD = get_bool(os.environ.get("LOCAL_BUILD", False))
+    INCREMENTAL_BUILD = get_bool(os.environ.get("INCREMENTAL_BUILD", False))
+    BUILD_WORKERS = int(os.environ.get("BUILD_WORKERS", 1))
+    BUILD_DOWNLOAD_CACHE_DIR = os.environ.get(
+        "BUILD_DOWNLOAD_CACHE_DIR", os.path.join(tempfile.gettempdir(), "build-download-cache")
+    )
+    BUILD_DOWNLOAD_CACHE_MAX_BYTES = int(os.environ.get("BUILD_DOWNLOAD_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+    DASHBOARD_CACHE_MAX_ENTRIES = int(os.environ.get("DASHBOARD_CACHE_MAX_ENTRIES", 500))
 
     BUILD_SITE = get_bool(os.environ.get("BUILD_SITE", False))
     DEPLOY_SITE = get_bool(os.environ.get("DEPLOY_SITE", False))
+    DEPLOY_WORKERS = int(os.environ.get("DEPLOY_WORKERS", 16))
+    COMPRESS_STATIC_SITE = get_bool(os.environ.get("COMPRESS_STATIC_SITE", False))
+    VERSIONED_DEPLOYS = get_bool(os.environ.get("VERSIONED_DEPLOYS", False))
+    STATIC_SITE_DISTRIBUTION_ID = os.environ.get("STATIC_SITE_DISTRIBUTION_ID", "")
 
     ATTACHMENT_SCANNER_ENABLED = get_bool(os.environ.get("ATTACHMENT_SCANNER_ENABLED", False))
     ATTACHMENT_SCANNER_URL = os.environ.get("ATTACHMENT_SCANNER_URL", "")
@@ -80,6 +93,10 @@ class Config:
 
     TRELLO_API_KEY = os.environ.get("TRELLO_API_KEY", "")
     TRELLO_API_TOKEN = os.environ.get("TRELLO_API_TOKEN", "")
+    TRELLO_CACHE_SECONDS = int(os.environ.get("TRELLO_CACHE_SECONDS", 300))
+    TRELLO_SNAPSHOT_PATH = os.environ.get(
+        "TRELLO_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "trello-measure-cards.json")
+    )
 
     GOOGLE_CUSTOM_SEARCH_ENDPOINT = "https://cse.google.com/cse/publicurl"
     GOOGLE_CUSTOM_SEARCH_ID = "018356501072542209775:85_lddxwwh4"
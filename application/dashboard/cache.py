@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+from flask import g, has_request_context, request
+
+from application.cms.service import Service
+from application.dashboard.view_refresh import dashboard_views_generation
+
+
+class DashboardCache(Service):
+    """An in-process cache of the data computed from the dashboard materialized views, which only change when they are
+    refreshed. Entries are kept until the next refresh of the views gives them a new generation, and the least recently
+    used are evicted once there are more than DASHBOARD_CACHE_MAX_ENTRIES, as there is one for every ethnic group,
+    classification and geography dashboard.
+
+    The generation of the views is looked up at most once per request, however many entries the request uses."""
+
+    def __init__(self):
+        super().__init__()
+        self.max_entries = None
+        self.generation = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.max_entries = app.config["DASHBOARD_CACHE_MAX_ENTRIES"]
+
+    def get(self, key, compute):
+        """Returns the data cached under `key` for the current generation of the views, calling `compute` to compute it
+        if it isn't cached."""
+        generation = self._current_generation()
+
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = compute()
+
+        with self._lock:
+            # The views may have been refreshed while the data was being computed, in which case it might be out of date
+            if generation == self.generation:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def _current_generation(self):
+        if not has_request_context():
+            return dashboard_views_generation()
+
+        # Remembered along with the request it was looked up for, as a request may share its app context, and so `g`,
+        # with earlier requests, e.g. in tests
+        current_request = request._get_current_object()
+        looked_up_for, generation = g.get("dashboard_views_generation", (None, None))
+        if looked_up_for is not current_request:
+            generation = dashboard_views_generation()
+            g.dashboard_views_generation = (current_request, generation)
+        return generation
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation = None
+
+
+dashboard_cache = DashboardCache()
@@ -1,4 +1,3 @@
-import calendar
 from collections import defaultdict
 from datetime import date, timedelta
 
@@ -7,8 +6,9 @@ from slugify import slugify
 from sqlalchemy import func
 from trello.exceptions import TokenError
 
+from application import db
 from application.cms.classification_service import classification_service
-from application.cms.models import MeasureVersion, LowestLevelOfGeography
+from application.cms.models import Ethnicity, MeasureVersion, LowestLevelOfGeography
 from application.dashboard.trello_service import trello_service
 
 # We import everything from application.dashboard.models locally where needed.
@@ -68,31 +68,36 @@ def get_published_dashboard_data():
         "first_publication": first_publication.published_at,
     }
 
+    # Bucket the pages by the Monday of the week they were published in, in a single pass over each list. Each bucket
+    # keeps the pages in the order they were queried in.
+    publications_by_week = defaultdict(list)
+    for page in original_publications:
+        publications_by_week[_week_beginning(page.published_at)].append(page)
+
+    updates_by_week = defaultdict(list)
+    for updated_page in major_updates:
+        updates_by_week[_week_beginning(updated_page.published_at)].append(updated_page)
+
     weeks = []
     cumulative_number_of_pages = []
     cumulative_number_of_major_updates = []
+    number_of_pages = 0
+    number_of_major_updates = 0
 
-    # week by week rows
-    for d in _from_month_to_month(first_publication.published_at, date.today()):
-        c = calendar.Calendar(calendar.MONDAY).monthdatescalendar(d.year, d.month)
-        for week in c:
-            if _in_range(week, first_publication.published_at, d.month):
-
-                publications = [page for page in original_publications if _page_in_week(page, week)]
-                updates = [updated_page for updated_page in major_updates if _page_in_week(updated_page, week)]
-                weeks.append({"week": week[0], "publications": publications, "major_updates": updates})
+    # week by week rows, from the week of the first publication up to this week
+    week = _week_beginning(first_publication.published_at)
+    this_week = _week_beginning(date.today())
+    while week <= this_week:
+        publications = publications_by_week.get(week, [])
+        updates = updates_by_week.get(week, [])
+        weeks.append({"week": week, "publications": publications, "major_updates": updates})
 
-                if not cumulative_number_of_major_updates:
-                    cumulative_number_of_major_updates.append(len(updates))
-                else:
-                    last_total = cumulative_number_of_major_updates[-1]
-                    cumulative_number_of_major_updates.append(last_total + len(updates))
+        number_of_pages += len(publications)
+        number_of_major_updates += len(updates)
+        cumulative_number_of_pages.append(number_of_pages)
+        cumulative_number_of_major_updates.append(number_of_major_updates)
 
-                if not cumulative_number_of_pages:
-                    cumulative_number_of_pages.append(len(publications))
-                else:
-                    last_total = cumulative_number_of_pages[-1]
-                    cumulative_number_of_pages.append(last_total + len(publications))
+        week += timedelta(weeks=1)
 
     weeks.reverse()
     data["weeks"] = weeks
@@ -105,161 +110,140 @@ def get_published_dashboard_data():
 def get_ethnic_groups_dashboard_data():
     from application.dashboard.models import EthnicGroupByDimension
 
-    links = EthnicGroupByDimension.query.all()
-
-    # build a data structure with the links to count unique
-    ethnicities = {}
-    for link in sorted(links, key=lambda rec: rec.ethnicity_position):
-        if link.ethnicity_value not in ethnicities:
-            ethnicities[link.ethnicity_value] = {
-                "value": link.ethnicity_value,
-                "position": link.ethnicity_position,
-                "url": url_for("dashboards.ethnic_group", value_slug=slugify(link.ethnicity_value)),
-                "measure_ids": {link.measure_id},  # temporary list to allow calculating `measure_count` later
-                "measure_count": 0,  # calculated afterwards using `measure_ids`
-                "dimension_count": 1,
-                "classifications": {link.classification_title},
-            }
-        else:
-            ethnicities[link.ethnicity_value]["measure_ids"].add(link.measure_id)
-            ethnicities[link.ethnicity_value]["dimension_count"] += 1
-            ethnicities[link.ethnicity_value]["classifications"].add(link.classification_title)
-
-    # Count the number of distinct measures for each ethnic group
-    for ethnic_group in ethnicities.values():
-        ethnic_group["measure_count"] = len(ethnic_group.pop("measure_ids"))
+    # Aggregated in the database, so only one row per ethnic group is loaded rather than one per dimension link
+    position = func.min(EthnicGroupByDimension.ethnicity_position)
+    ethnic_groups = (
+        db.session.query(
+            EthnicGroupByDimension.ethnicity_value,
+            position,
+            func.count(func.distinct(EthnicGroupByDimension.measure_id)),
+            func.count(),
+            func.array_agg(func.distinct(EthnicGroupByDimension.classification_title)),
+        )
+        .group_by(EthnicGroupByDimension.ethnicity_value)
+        .order_by(position, EthnicGroupByDimension.ethnicity_value)
+    )
 
-    return ethnicities.values()
+    return [
+        {
+            "value": value,
+            "position": value_position,
+            "url": url_for("dashboards.ethnic_group", value_slug=slugify(value)),
+            "measure_count": measure_count,
+            "dimension_count": dimension_count,
+            "classifications": set(classification_titles),
+        }
+        for value, value_position, measure_count, dimension_count, classification_titles in ethnic_groups
+    ]
 
 
 def get_ethnic_group_by_slug_dashboard_data(ethnic_group_slug):
     ethnicity = classification_service.get_value_by_slug(ethnic_group_slug)
 
-    ethnic_group_title = ""
-    page_count = 0
+    if not ethnicity:
+        return "", 0, _nested_measures_and_dimensions([])
+
+    from application.dashboard.models import EthnicGroupByDimension
+
+    dimension_links = EthnicGroupByDimension.query.filter_by(ethnicity_value=ethnicity.value).all()
+    nested_measures_and_dimensions = _nested_measures_and_dimensions(_sorted_dimension_links(dimension_links))
+
+    return ethnicity.value, _count_measures(nested_measures_and_dimensions), nested_measures_and_dimensions
+
+
+def _sorted_dimension_links(dimension_links):
+    return sorted(
+        dimension_links,
+        key=lambda rec: (rec.topic_title, rec.subtopic_position, rec.measure_position, rec.dimension_position),
+    )
+
+
+def _nested_measures_and_dimensions(sorted_dimension_links):
+    """Group dimension links, which must already be in order, by topic, subtopic and measure."""
     nested_measures_and_dimensions = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list))))
 
-    if ethnicity:
-        ethnic_group_title = ethnicity.value
-        from application.dashboard.models import EthnicGroupByDimension
-
-        dimension_links = EthnicGroupByDimension.query.filter_by(ethnicity_value=ethnicity.value).all()
-
-        for link in sorted(
-            dimension_links,
-            key=lambda rec: (rec.topic_title, rec.subtopic_position, rec.measure_position, rec.dimension_position),
-        ):
-            measure_dict = nested_measures_and_dimensions[link.topic_title][link.subtopic_title][
-                link.measure_version_title
-            ]
-
-            measure_dict["title"] = link.measure_version_title
-            measure_dict["url"] = url_for(
-                "static_site.measure_version",
-                topic_slug=link.topic_slug,
-                subtopic_slug=link.subtopic_slug,
-                measure_slug=link.measure_slug,
-                version="latest",
-            )
-            measure_dict["dimensions"].append(
-                {
-                    "guid": link.dimension_guid,
-                    "title": link.dimension_title,
-                    "short_title": _calculate_short_title(link.measure_version_title, link.dimension_title),
-                    "position": link.dimension_position,
-                }
-            )
+    for link in sorted_dimension_links:
+        measure_dict = nested_measures_and_dimensions[link.topic_title][link.subtopic_title][link.measure_version_title]
 
-    for (topic, measures_with_dimensions_by_subtopic) in nested_measures_and_dimensions.items():
-        for subtopic, measures_with_dimensions in measures_with_dimensions_by_subtopic.items():
-            page_count += len(measures_with_dimensions)
+        measure_dict["title"] = link.measure_version_title
+        measure_dict["url"] = url_for(
+            "static_site.measure_version",
+            topic_slug=link.topic_slug,
+            subtopic_slug=link.subtopic_slug,
+            measure_slug=link.measure_slug,
+            version="latest",
+        )
+        measure_dict["dimensions"].append(
+            {
+                "guid": link.dimension_guid,
+                "title": link.dimension_title,
+                "short_title": _calculate_short_title(link.measure_version_title, link.dimension_title),
+                "position": link.dimension_position,
+            }
+        )
 
-    return ethnic_group_title, page_count, nested_measures_and_dimensions
+    return nested_measures_and_dimensions
 
 
-def get_ethnicity_classifications_dashboard_data():
-    from application.dashboard.models import ClassificationByDimension
+def _count_measures(measures_by_topic_and_subtopic):
+    page_count = 0
+    for (topic, measures_by_subtopic) in measures_by_topic_and_subtopic.items():
+        for subtopic, measures in measures_by_subtopic.items():
+            page_count += len(measures)
 
-    all_classifications = classification_service.get_all_classifications()
-    all_dimension_classifications = ClassificationByDimension.query.all()
-
-    classifications = {
-        classification.id: {
-            "id": classification.id,
-            "title": classification.long_title,
-            "position": classification.position,
-            "has_parents": len(classification.parent_values) > 0,
-            "pages": set([]),
-            "dimension_count": 0,
-            "includes_parents_count": 0,
-            "includes_all_count": 0,
-            "includes_unknown_count": 0,
-        }
-        for classification in all_classifications
-    }
+    return page_count
 
-    for link in all_dimension_classifications:
-        classifications[link.classification_id]["pages"].add(link.measure_id)
-        classifications[link.classification_id]["dimension_count"] += 1
 
-        if link.includes_parents:
-            classifications[link.classification_id]["includes_parents_count"] += 1
-        if link.includes_all:
-            classifications[link.classification_id]["includes_all_count"] += 1
-        if link.includes_unknown:
-            classifications[link.classification_id]["includes_unknown_count"] += 1
+def get_ethnicity_classifications_dashboard_data():
+    from application.dashboard.models import ClassificationByDimension
 
-    ordered_classifications = sorted(classifications.values(), key=lambda x: x["position"])
+    # Aggregated in the database, so only one row per classification is loaded rather than one per dimension link
+    counts_by_classification_id = {
+        classification_id: counts
+        for classification_id, *counts in db.session.query(
+            ClassificationByDimension.classification_id,
+            func.count(func.distinct(ClassificationByDimension.measure_id)),
+            func.count(),
+            func.count().filter(ClassificationByDimension.includes_parents),
+            func.count().filter(ClassificationByDimension.includes_all),
+            func.count().filter(ClassificationByDimension.includes_unknown),
+        ).group_by(ClassificationByDimension.classification_id)
+    }
 
-    for classification in ordered_classifications:
-        classification["measure_count"] = len(classification["pages"])
+    classifications = []
+    for classification in classification_service.get_all_classifications():
+        measure_count, dimension_count, includes_parents_count, includes_all_count, includes_unknown_count = (
+            counts_by_classification_id.get(classification.id, (0, 0, 0, 0, 0))
+        )
+        classifications.append(
+            {
+                "id": classification.id,
+                "title": classification.long_title,
+                "position": classification.position,
+                "has_parents": len(classification.parent_values) > 0,
+                "measure_count": measure_count,
+                "dimension_count": dimension_count,
+                "includes_parents_count": includes_parents_count,
+                "includes_all_count": includes_all_count,
+                "includes_unknown_count": includes_unknown_count,
+            }
+        )
 
-    return ordered_classifications
+    return sorted(classifications, key=lambda x: x["position"])
 
 
 def get_ethnicity_classification_by_id_dashboard_data(classification_id):
     classification = classification_service.get_classification_by_id(classification_id)
 
-    classification_title = ""
-    page_count = 0
-    nested_measures_and_dimensions = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list))))
+    if not classification:
+        return "", 0, _nested_measures_and_dimensions([])
 
-    if classification:
-        classification_title = classification.long_title
-        from application.dashboard.models import ClassificationByDimension
-
-        dimension_links = ClassificationByDimension.query.filter_by(classification_id=classification_id).all()
-
-        for link in sorted(
-            dimension_links,
-            key=lambda rec: (rec.topic_title, rec.subtopic_position, rec.measure_position, rec.dimension_position),
-        ):
-            measure_dict = nested_measures_and_dimensions[link.topic_title][link.subtopic_title][
-                link.measure_version_title
-            ]
-
-            measure_dict["title"] = link.measure_version_title
-            measure_dict["url"] = url_for(
-                "static_site.measure_version",
-                topic_slug=link.topic_slug,
-                subtopic_slug=link.subtopic_slug,
-                measure_slug=link.measure_slug,
-                version="latest",
-            )
-            measure_dict["dimensions"].append(
-                {
-                    "guid": link.dimension_guid,
-                    "title": link.dimension_title,
-                    "short_title": _calculate_short_title(link.measure_version_title, link.dimension_title),
-                    "position": link.dimension_position,
-                }
-            )
+    from application.dashboard.models import ClassificationByDimension
 
-    for (topic, measures_with_dimensions_by_subtopic) in nested_measures_and_dimensions.items():
-        for subtopic, measures_with_dimensions in measures_with_dimensions_by_subtopic.items():
-            page_count += len(measures_with_dimensions)
+    dimension_links = ClassificationByDimension.query.filter_by(classification_id=classification_id).all()
+    nested_measures_and_dimensions = _nested_measures_and_dimensions(_sorted_dimension_links(dimension_links))
 
-    return classification_title, page_count, nested_measures_and_dimensions
+    return classification.long_title, _count_measures(nested_measures_and_dimensions), nested_measures_and_dimensions
 
 
 def get_geographic_breakdown_dashboard_data():
@@ -276,6 +260,10 @@ def get_geographic_breakdown_dashboard_data():
         .order_by(LatestPublishedMeasureVersionByGeography.geography_position)
     )
 
+    return _location_levels(page_counts_by_geography)
+
+
+def _location_levels(page_counts_by_geography):
     location_levels = []
     for geography_name, page_count in page_counts_by_geography:
         if page_count > 0:
@@ -304,13 +292,27 @@ def get_geographic_breakdown_by_slug_dashboard_data(slug):
         )
     ).all()
 
+    measure_titles_and_urls_by_topic_and_subtopic = _measure_titles_and_urls_by_topic_and_subtopic(
+        _sorted_geography_records(measure_versions_with_geography)
+    )
+
+    return (
+        geography,
+        _count_measures(measure_titles_and_urls_by_topic_and_subtopic),
+        measure_titles_and_urls_by_topic_and_subtopic,
+    )
+
+
+def _sorted_geography_records(records):
+    # Sort records by topic title, subtopic position, measure position. Relies on preserved dict insertion order.
+    return sorted(records, key=lambda rec: (rec.topic_title, rec.subtopic_position, rec.measure_position))
+
+
+def _measure_titles_and_urls_by_topic_and_subtopic(sorted_records):
     # Structure: {topic_title: {subtopic_title: [{title: mv_title, url: mv_url}, ...]}}
     measure_titles_and_urls_by_topic_and_subtopic = defaultdict(lambda: defaultdict(list))
 
-    # Sort records by topic title, subtopic position, measure position. Relies on preserved dict insertion order.
-    for record in sorted(
-        measure_versions_with_geography, key=lambda rec: (rec.topic_title, rec.subtopic_position, rec.measure_position)
-    ):
+    for record in sorted_records:
         measure_titles_and_urls_by_topic_and_subtopic[record.topic_title][record.subtopic_title].append(
             {
                 "title": record.measure_version_title,
@@ -324,12 +326,106 @@ def get_geographic_breakdown_by_slug_dashboard_data(slug):
             }
         )
 
-    page_count = 0
-    for topic, measures_by_subtopic in measure_titles_and_urls_by_topic_and_subtopic.items():
-        for subtopic, measures in measures_by_subtopic.items():
-            page_count += len(measures)
+    return measure_titles_and_urls_by_topic_and_subtopic
 
-    return geography, page_count, measure_titles_and_urls_by_topic_and_subtopic
+
+class DashboardData:
+    """The data for every ethnic group, ethnicity classification and geographic breakdown dashboard, computed from a
+    single scan of each of their materialized views.
+
+    The static site build writes all of these dashboards, and would otherwise re-query the views once for each ethnic
+    group, classification and geography, so that writing the dashboards took time proportional to groups × rows rather
+    than just rows. The `get_..._dashboard_data` functions above are still used to show a single dashboard in the CMS,
+    and the index dashboards are aggregated by the database for both.
+    """
+
+    def __init__(self):
+        from application.dashboard.models import (
+            ClassificationByDimension,
+            EthnicGroupByDimension,
+            LatestPublishedMeasureVersionByGeography,
+        )
+
+        ethnic_group_links = EthnicGroupByDimension.query.all()
+        classification_links = ClassificationByDimension.query.all()
+        self.geography_records = LatestPublishedMeasureVersionByGeography.query.all()
+        self.classifications_by_id = {
+            classification.id: classification for classification in classification_service.get_all_classifications()
+        }
+        self.geographies_by_slug = {geography.slug: geography for geography in LowestLevelOfGeography.query.all()}
+
+        # Different values can have the same slug, in which case the slug is for the first value, as in the CMS
+        self.ethnicity_values_by_slug = {}
+        for ethnicity in Ethnicity.query.order_by(Ethnicity.id).all():
+            self.ethnicity_values_by_slug.setdefault(ethnicity.slug, ethnicity.value)
+
+        # Partitioned after sorting, so each partition is already in the order its dashboard lists it in
+        self.ethnic_group_links_by_value = defaultdict(list)
+        for link in _sorted_dimension_links(ethnic_group_links):
+            self.ethnic_group_links_by_value[link.ethnicity_value].append(link)
+
+        self.classification_links_by_id = defaultdict(list)
+        for link in _sorted_dimension_links(classification_links):
+            self.classification_links_by_id[link.classification_id].append(link)
+
+        self.geography_records_by_slug = defaultdict(list)
+        for record in _sorted_geography_records(self.geography_records):
+            self.geography_records_by_slug[slugify(record.geography_name)].append(record)
+
+    def ethnic_groups(self):
+        return get_ethnic_groups_dashboard_data()
+
+    def ethnic_group_by_slug(self, ethnic_group_slug):
+        ethnicity_value = self.ethnicity_values_by_slug.get(ethnic_group_slug)
+        dimension_links = self.ethnic_group_links_by_value.get(ethnicity_value)
+        if not dimension_links:
+            # An ethnic group which no dimension links to any more, e.g. when writing the dashboards for a measure
+            return get_ethnic_group_by_slug_dashboard_data(ethnic_group_slug)
+
+        nested_measures_and_dimensions = _nested_measures_and_dimensions(dimension_links)
+        return (
+            ethnicity_value,
+            _count_measures(nested_measures_and_dimensions),
+            nested_measures_and_dimensions,
+        )
+
+    def ethnicity_classifications(self):
+        return get_ethnicity_classifications_dashboard_data()
+
+    def ethnicity_classification_by_id(self, classification_id):
+        classification = self.classifications_by_id.get(classification_id)
+        if classification is None:
+            return get_ethnicity_classification_by_id_dashboard_data(classification_id)
+
+        nested_measures_and_dimensions = _nested_measures_and_dimensions(
+            self.classification_links_by_id.get(classification_id, [])
+        )
+        return (
+            classification.long_title,
+            _count_measures(nested_measures_and_dimensions),
+            nested_measures_and_dimensions,
+        )
+
+    def geographic_breakdown(self):
+        page_counts_by_geography = defaultdict(int)
+        geography_positions = {}
+        for record in self.geography_records:
+            page_counts_by_geography[record.geography_name] += 1
+            geography_positions[record.geography_name] = record.geography_position
+
+        return _location_levels(
+            sorted(page_counts_by_geography.items(), key=lambda item: geography_positions[item[0]])
+        )
+
+    def geographic_breakdown_by_slug(self, slug):
+        measure_titles_and_urls_by_topic_and_subtopic = _measure_titles_and_urls_by_topic_and_subtopic(
+            self.geography_records_by_slug.get(slug, [])
+        )
+        return (
+            self.geographies_by_slug.get(slug),
+            _count_measures(measure_titles_and_urls_by_topic_and_subtopic),
+            measure_titles_and_urls_by_topic_and_subtopic,
+        )
 
 
 def get_planned_pages_dashboard_data():
@@ -341,7 +437,7 @@ def get_planned_pages_dashboard_data():
     # and updates, which could make the headline "Done" figure from this board confusing to users.
     stages_reported_in_dashboard = ("planned", "progress", "review")
 
-    measure_cards = trello_service.get_measure_cards()
+    measure_cards = trello_service.get_cached_measure_cards()
     measures = [measure for measure in measure_cards if measure["stage"] in stages_reported_in_dashboard]
     planned_count = len([measure for measure in measures if measure["stage"] == "planned"])
     progress_count = len([measure for measure in measures if measure["stage"] == "progress"])
@@ -366,25 +462,8 @@ def _calculate_short_title(page_title, dimension_title):
 
 
 def _deslugifiedLocation(slug):
-    for location in LowestLevelOfGeography.query.all():
-        if slugify(location.name) == slug:
-            return location
-    return None
-
-
-def _from_month_to_month(start, end):
-    current = start
-    while current < end:
-        yield current
-        current += timedelta(days=current.max.day)
-    yield current
-
-
-def _in_range(week, begin, month, end=date.today()):
-    if any([d for d in week if d.month > month]):
-        return False
-    return any([d for d in week if d >= begin]) and any([d for d in week if d <= end])
+    return LowestLevelOfGeography.query.filter_by(slug=slug).first()
 
 
-def _page_in_week(page, week):
-    return page.published_at >= week[0] and page.published_at <= week[6]
+def _week_beginning(day):
+    return day - timedelta(days=day.weekday())
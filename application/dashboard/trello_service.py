@@ -1,5 +1,9 @@
 import re
 import json
+import os
+import threading
+import time
+
 import trello
 from trello import TrelloClient
 
@@ -106,11 +110,24 @@ class TrelloService(Service):
     api_key = ""
     api_token = ""
     client = None
+    snapshot_path = None
+    cache_seconds = 300
 
     # Matches a leading reference number in square brackets plus optional space
     # e.g. for "[BLAH 002] New measure name" this will match the "[BLAH 002] " at the start
     INTERNAL_REFERENCE_REGEX = re.compile(r"^\[.+?\]\s*")
 
+    def __init__(self):
+        super().__init__()
+        self._snapshot = None
+        self._refresh_thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.snapshot_path = app.config["TRELLO_SNAPSHOT_PATH"]
+        self.cache_seconds = app.config["TRELLO_CACHE_SECONDS"]
+
     def is_initialised(self):
         return self.api_key != "" and self.api_token != ""
 
@@ -128,6 +145,66 @@ class TrelloService(Service):
 
         return card_dicts
 
+    def get_cached_measure_cards(self):
+        """Returns the measure cards from the latest snapshot of the board, which is fetched again in the background
+        once it is more than TRELLO_CACHE_SECONDS old, so that pages and builds don't wait for Trello. The snapshot is
+        saved to TRELLO_SNAPSHOT_PATH, so only waits for Trello if no process has ever fetched a snapshot."""
+        snapshot = self._snapshot or self._load_snapshot()
+        if snapshot is None:
+            return self._refresh_snapshot()["cards"]
+
+        if time.time() - snapshot["fetched_at"] > self.cache_seconds:
+            self._refresh_snapshot_in_background()
+
+        return snapshot["cards"]
+
+    def wait_for_refresh(self, timeout=None):
+        refresh_thread = self._refresh_thread
+        if refresh_thread is not None:
+            refresh_thread.join(timeout)
+
+    def _refresh_snapshot_in_background(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_snapshot_or_keep_stale, daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_snapshot_or_keep_stale(self):
+        try:
+            self._refresh_snapshot()
+        except Exception:
+            self.logger.exception("Could not refresh the Trello snapshot; the stale snapshot will be used until it can")
+
+    def _refresh_snapshot(self):
+        snapshot = {"fetched_at": time.time(), "cards": self.get_measure_cards()}
+        self._snapshot = snapshot
+        self._save_snapshot(snapshot)
+        return snapshot
+
+    def _load_snapshot(self):
+        if not self.snapshot_path:
+            return None
+
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                self._snapshot = json.load(snapshot_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        return self._snapshot
+
+    def _save_snapshot(self, snapshot):
+        if not self.snapshot_path:
+            return
+
+        # Written to a temporary file and renamed, so another process never reads a partly written snapshot
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        temporary_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(temporary_path, self.snapshot_path)
+
     def _map_card(self, card):
         obj = {
             "id": card.id,
@@ -0,0 +1,139 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from application import db
+
+# The dashboard materialized views, in the order they must be refreshed, with the tables and views each is built from.
+# Triggers on the tables log every change to them in `dashboard_source_change`, so that a refresh only needs to
+# refresh the views whose inputs have changed since the last one.
+DASHBOARD_VIEWS = {
+    "latest_published_measure_versions": {"tables": {"measure_version"}, "views": set()},
+    "latest_published_measure_versions_by_geography": {
+        "tables": {"lowest_level_of_geography", "measure", "measure_version", "subtopic", "subtopic_measure", "topic"},
+        "views": {"latest_published_measure_versions"},
+    },
+    "ethnic_groups_by_dimension": {
+        "tables": {
+            "classification",
+            "dimension",
+            "dimension_categorisation",
+            "ethnicity",
+            "ethnicity_in_classification",
+            "measure",
+            "parent_ethnicity_in_classification",
+            "subtopic",
+            "subtopic_measure",
+            "topic",
+        },
+        "views": {"latest_published_measure_versions"},
+    },
+    "classifications_by_dimension": {
+        "tables": {
+            "classification",
+            "dimension",
+            "dimension_categorisation",
+            "measure",
+            "subtopic",
+            "subtopic_measure",
+            "topic",
+        },
+        "views": {"latest_published_measure_versions"},
+    },
+}
+
+
+def views_to_refresh(changed_tables):
+    """The views built from any of `changed_tables`, or from another view which is itself being refreshed."""
+    to_refresh = []
+    for view_name, sources in DASHBOARD_VIEWS.items():
+        if sources["tables"] & set(changed_tables) or sources["views"] & set(to_refresh):
+            to_refresh.append(view_name)
+    return to_refresh
+
+
+def refresh_dashboard_views(refresh_all=False):
+    """Refresh the dashboard materialized views whose source tables have changed since they were last refreshed, or
+    every view if `refresh_all`, and return the number of seconds each view took to refresh.
+
+    Views are refreshed in waves: each view once the views it is built from have been refreshed, and the views in a
+    wave concurrently, each on its own pooled connection. The logged changes are consumed in a transaction which is only
+    committed once every view has been refreshed, so if any refresh fails the changes are left for the next refresh.
+    A change committed while the refresh is running is either included in it or left for the next refresh."""
+    try:
+        consumed_changes = db.session.execute("DELETE FROM dashboard_source_change RETURNING table_name").fetchall()
+        changed_tables = {table_name for (table_name,) in consumed_changes}
+        to_refresh = list(DASHBOARD_VIEWS) if refresh_all else views_to_refresh(changed_tables)
+
+        durations = {}
+        for wave in refresh_waves(to_refresh):
+            durations.update(_refresh_concurrently(db.engine, wave))
+        record_dashboard_views_refreshed(to_refresh)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {view_name: durations[view_name] for view_name in to_refresh}
+
+
+def refresh_waves(view_names):
+    """Split `view_names` into the groups which can be refreshed concurrently, in the order they must be refreshed."""
+    waves = []
+    remaining = [view_name for view_name in DASHBOARD_VIEWS if view_name in view_names]
+    while remaining:
+        wave = [view_name for view_name in remaining if not DASHBOARD_VIEWS[view_name]["views"] & set(remaining)]
+        waves.append(wave)
+        remaining = [view_name for view_name in remaining if view_name not in wave]
+    return waves
+
+
+def _refresh_concurrently(engine, view_names):
+    if len(view_names) == 1:
+        return {view_names[0]: _refresh_view(engine, view_names[0])}
+
+    with ThreadPoolExecutor(max_workers=len(view_names)) as executor:
+        durations = executor.map(lambda view_name: _refresh_view(engine, view_name), view_names)
+        return dict(zip(view_names, durations))
+
+
+def _refresh_view(engine, view_name):
+    started_at = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}")
+    return round(time.perf_counter() - started_at, 3)
+
+
+def record_dashboard_views_refreshed(view_names):
+    """Record that `view_names` were refreshed, under a new generation, so anything cached from the views can tell that
+    it is out of date."""
+    if not view_names:
+        return
+
+    generation = db.session.execute("SELECT nextval('dashboard_view_generation_seq')").scalar()
+    refreshed_at = datetime.utcnow()
+    for view_name in view_names:
+        db.session.execute(
+            """
+            INSERT INTO dashboard_view_refresh (view_name, generation, refreshed_at)
+            VALUES (:view_name, :generation, :refreshed_at)
+            ON CONFLICT (view_name) DO UPDATE
+            SET generation = EXCLUDED.generation, refreshed_at = EXCLUDED.refreshed_at
+            """,
+            {"view_name": view_name, "generation": generation, "refreshed_at": refreshed_at},
+        )
+
+
+def dashboard_views_generation():
+    """The generation of the most recent refresh of any of the dashboard views, or 0 if they have never been
+    refreshed."""
+    return db.session.execute("SELECT coalesce(max(generation), 0) FROM dashboard_view_refresh").scalar()
+
+
+def dashboard_views_last_refreshed():
+    """The generation and time of the most recent refresh of any of the dashboard views, or (0, None) if they have
+    never been refreshed."""
+    generation, refreshed_at = db.session.execute(
+        "SELECT coalesce(max(generation), 0), max(refreshed_at) FROM dashboard_view_refresh"
+    ).fetchone()
+    return generation, refreshed_at
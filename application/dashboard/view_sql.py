@@ -9,13 +9,6 @@ DROP MATERIALIZED VIEW IF EXISTS classifications_by_dimension;
 DROP MATERIALIZED VIEW IF EXISTS latest_published_measure_versions;
 """
 
-refresh_all_dashboard_helper_views = """
-REFRESH MATERIALIZED VIEW CONCURRENTLY latest_published_measure_versions;
-REFRESH MATERIALIZED VIEW CONCURRENTLY latest_published_measure_versions_by_geography;
-REFRESH MATERIALIZED VIEW CONCURRENTLY ethnic_groups_by_dimension;
-REFRESH MATERIALIZED VIEW CONCURRENTLY classifications_by_dimension;
-"""
-
 latest_published_measure_versions_view = """
 CREATE MATERIALIZED VIEW latest_published_measure_versions AS
 (
@@ -1,8 +1,13 @@
-from flask import render_template, current_app
+from datetime import datetime, time
+
+from flask import current_app, jsonify, render_template, request, url_for
 from flask_login import login_required
+from werkzeug.http import is_resource_modified
 
 from application.auth.models import VIEW_DASHBOARDS
 from application.dashboard import dashboard_blueprint
+from application.dashboard.cache import dashboard_cache
+from application.dashboard.view_refresh import dashboard_views_last_refreshed
 
 from application.dashboard.data_helpers import (
     get_published_dashboard_data,
@@ -17,7 +22,7 @@ from application.dashboard.data_helpers import (
 )
 
 from application.factory import page_service
-from application.utils import user_can
+from application.utils import source_data_last_changed, user_can
 
 
 @dashboard_blueprint.route("")
@@ -69,7 +74,7 @@ def planned_pages():
 @login_required
 @user_can(VIEW_DASHBOARDS)
 def ethnic_groups():
-    sorted_ethnicity_list = get_ethnic_groups_dashboard_data()
+    sorted_ethnicity_list = dashboard_cache.get("ethnic-groups", get_ethnic_groups_dashboard_data)
     return render_template("dashboards/ethnic_groups.html", ethnic_groups=sorted_ethnicity_list)
 
 
@@ -77,7 +82,9 @@ def ethnic_groups():
 @login_required
 @user_can(VIEW_DASHBOARDS)
 def ethnic_group(value_slug):
-    value_title, page_count, nested_measures_and_dimensions = get_ethnic_group_by_slug_dashboard_data(value_slug)
+    value_title, page_count, nested_measures_and_dimensions = dashboard_cache.get(
+        ("ethnic-groups", value_slug), lambda: get_ethnic_group_by_slug_dashboard_data(value_slug)
+    )
     return render_template(
         "dashboards/ethnic_group.html",
         ethnic_group=value_title,
@@ -90,7 +97,7 @@ def ethnic_group(value_slug):
 @login_required
 @user_can(VIEW_DASHBOARDS)
 def ethnicity_classifications():
-    classifications = get_ethnicity_classifications_dashboard_data()
+    classifications = dashboard_cache.get("ethnicity-classifications", get_ethnicity_classifications_dashboard_data)
     return render_template("dashboards/ethnicity_classifications.html", ethnicity_classifications=classifications)
 
 
@@ -102,8 +109,9 @@ def ethnicity_classification(classification_id):
         classification_title,
         page_count,
         nested_measures_and_dimensions,
-    ) = get_ethnicity_classification_by_id_dashboard_data(  # noqa
-        classification_id
+    ) = dashboard_cache.get(
+        ("ethnicity-classifications", classification_id),
+        lambda: get_ethnicity_classification_by_id_dashboard_data(classification_id),
     )
 
     classification = current_app.classification_finder.get_classification_collection().get_classification_by_id(classification_id)
@@ -121,7 +129,7 @@ def ethnicity_classification(classification_id):
 @login_required
 @user_can(VIEW_DASHBOARDS)
 def locations():
-    location_levels = get_geographic_breakdown_dashboard_data()
+    location_levels = dashboard_cache.get("geographic-breakdown", get_geographic_breakdown_dashboard_data)
     return render_template("dashboards/geographic-breakdown.html", location_levels=location_levels)
 
 
@@ -130,15 +138,167 @@ def locations():
 @user_can(VIEW_DASHBOARDS)
 def location(slug):
     (
-        geography,
+        geography_name,
         page_count,
         measure_titles_and_urls_by_topic_and_subtopic,
-    ) = get_geographic_breakdown_by_slug_dashboard_data(  # noqa
-        slug
-    )
+    ) = dashboard_cache.get(("geographic-breakdown", slug), lambda: _geographic_breakdown_by_slug(slug))
     return render_template(
         "dashboards/lowest-level-of-geography.html",
-        level_of_geography=geography.name,
+        level_of_geography=geography_name,
         page_count=page_count,
         measure_titles_and_urls_by_topic_and_subtopic=measure_titles_and_urls_by_topic_and_subtopic,
     )
+
+
+def _geographic_breakdown_by_slug(slug):
+    # Only the geography's name is cached, as the geography itself belongs to the request's database session
+    geography, page_count, measures_by_topic_and_subtopic = get_geographic_breakdown_by_slug_dashboard_data(slug)
+    return geography.name, page_count, measures_by_topic_and_subtopic
+
+
+# JSON versions of the dashboards, for polling by monitoring and reporting tools. The data only changes when the
+# dashboard views are refreshed, so responses carry an ETag and Last-Modified from the latest refresh, and a request
+# which already has the current data gets an empty 304 response without it being computed again.
+
+
+@dashboard_blueprint.route("/data/published")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def published_json():
+    return _conditional_json(lambda: _published_json(get_published_dashboard_data()), published_data=True)
+
+
+@dashboard_blueprint.route("/data/ethnic-groups")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def ethnic_groups_json():
+    def ethnic_groups_json_data():
+        ethnic_groups = dashboard_cache.get("ethnic-groups", get_ethnic_groups_dashboard_data)
+        return [{**group, "classifications": sorted(group["classifications"])} for group in ethnic_groups]
+
+    return _conditional_json(ethnic_groups_json_data)
+
+
+@dashboard_blueprint.route("/data/ethnic-groups/<value_slug>")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def ethnic_group_json(value_slug):
+    def ethnic_group_json_data():
+        value_title, measure_count, nested_measures_and_dimensions = dashboard_cache.get(
+            ("ethnic-groups", value_slug), lambda: get_ethnic_group_by_slug_dashboard_data(value_slug)
+        )
+        return {"ethnic_group": value_title, "measure_count": measure_count, "measures": nested_measures_and_dimensions}
+
+    return _conditional_json(ethnic_group_json_data)
+
+
+@dashboard_blueprint.route("/data/ethnicity-classifications")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def ethnicity_classifications_json():
+    return _conditional_json(
+        lambda: dashboard_cache.get("ethnicity-classifications", get_ethnicity_classifications_dashboard_data)
+    )
+
+
+@dashboard_blueprint.route("/data/ethnicity-classifications/<classification_id>")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def ethnicity_classification_json(classification_id):
+    def ethnicity_classification_json_data():
+        classification_title, page_count, nested_measures_and_dimensions = dashboard_cache.get(
+            ("ethnicity-classifications", classification_id),
+            lambda: get_ethnicity_classification_by_id_dashboard_data(classification_id),
+        )
+        return {
+            "classification_title": classification_title,
+            "page_count": page_count,
+            "measures": nested_measures_and_dimensions,
+        }
+
+    return _conditional_json(ethnicity_classification_json_data)
+
+
+@dashboard_blueprint.route("/data/geographic-breakdown")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def locations_json():
+    return _conditional_json(
+        lambda: dashboard_cache.get("geographic-breakdown", get_geographic_breakdown_dashboard_data)
+    )
+
+
+@dashboard_blueprint.route("/data/geographic-breakdown/<slug>")
+@login_required
+@user_can(VIEW_DASHBOARDS)
+def location_json(slug):
+    def location_json_data():
+        geography_name, page_count, measure_titles_and_urls_by_topic_and_subtopic = dashboard_cache.get(
+            ("geographic-breakdown", slug), lambda: _geographic_breakdown_by_slug(slug)
+        )
+        return {
+            "level_of_geography": geography_name,
+            "page_count": page_count,
+            "measures": measure_titles_and_urls_by_topic_and_subtopic,
+        }
+
+    return _conditional_json(location_json_data)
+
+
+def _conditional_json(compute, published_data=False):
+    generation, last_modified = dashboard_views_last_refreshed()
+    etag = f"dashboards-{generation}"
+    if published_data:
+        # The published pages are read from the measure versions rather than the dashboard views, so also change with
+        # any change to the source data, and the weekly figures change at the start of each day, as they run up to the
+        # current week
+        last_change_id, last_changed_at = source_data_last_changed()
+        today = datetime.utcnow().date()
+        etag = f"{etag}-{last_change_id}-{today.isoformat()}"
+        start_of_today = datetime.combine(today, time())
+        last_modified = max(filter(None, (last_modified, last_changed_at, start_of_today)))
+
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = jsonify(compute())
+    else:
+        response = current_app.response_class(status=304)
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Clients may keep the data, but must check it is still current before using it
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _published_json(data):
+    return {
+        "number_of_publications": data["number_of_publications"],
+        "number_of_major_updates": data["number_of_major_updates"],
+        "first_publication": data["first_publication"].isoformat(),
+        "weeks": [
+            {
+                "week": week["week"].isoformat(),
+                "publications": [_published_page_json(page) for page in week["publications"]],
+                "major_updates": [_published_page_json(page) for page in week["major_updates"]],
+            }
+            for week in data["weeks"]
+        ],
+        "total_page_count_each_week": data["total_page_count_each_week"],
+        "total_major_updates_count_each_week": data["total_major_updates_count_each_week"],
+    }
+
+
+def _published_page_json(page):
+    return {
+        "title": page.title,
+        "version": page.version,
+        "published_at": page.published_at.isoformat(),
+        "url": url_for(
+            "static_site.measure_version",
+            topic_slug=page.measure.subtopic.topic.slug,
+            subtopic_slug=page.measure.subtopic.slug,
+            measure_slug=page.measure.slug,
+            version="latest",
+        ),
+    }
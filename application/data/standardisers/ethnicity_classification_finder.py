@@ -1,3 +1,6 @@
+from collections import Counter, defaultdict
+
+
 class EthnicityClassificationFinder:
     """
     EthnicityClassificationFinder is the standardiser used by ChartBuilder and TableBuilder
@@ -69,9 +72,11 @@ class EthnicityStandardiser:
 class EthnicityClassificationCollection:
     def __init__(self):
         self.classifications = []
+        self.__index = None
 
     def add_classification(self, classification):
         self.classifications.append(classification)
+        self.__index = None
 
     def add_classifications(self, classifications):
         [self.add_classification(classification) for classification in classifications]
@@ -80,16 +85,9 @@ class EthnicityClassificationCollection:
         return self.classifications
 
     def get_valid_classifications(self, raw_ethnicity_list, ethnicity_standardiser):
-        standardised_ethnicities = ethnicity_standardiser.standardise_all(raw_ethnicity_list)
-        valid_classifications = [
-            classification
-            for classification in self.classifications
-            if classification.is_valid_for_standard_ethnicities(standardised_ethnicities)
-        ]
-        valid_classifications.sort(
-            key=lambda classification: -classification.get_data_fit_level(raw_ethnicity_list, ethnicity_standardiser)
-        )
-        return valid_classifications
+        if self.__index is None:
+            self.__index = EthnicityClassificationIndex(self.classifications)
+        return self.__index.get_valid_classifications(raw_ethnicity_list, ethnicity_standardiser)
 
     def get_classification_by_id(self, id):
         for classification in self.classifications:
@@ -117,6 +115,76 @@ class EthnicityClassificationCollection:
         return int(digits), ""
 
 
+class EthnicityClassificationIndex:
+    """
+    An index of classifications by the standard values they map, used by EthnicityClassificationCollection to find the
+    classifications valid for some data without checking every value against every classification
+
+    Valid classifications are those which map every standard value in the data, and whose required display ethnicities
+    are all mapped to by one of the values. Each classification's required display ethnicities are numbered, so the
+    second check is whether the bits for the data's values OR together to give all of the classification's bits.
+    Classifications are returned in the order of how many of the values they have data items for, as by
+    EthnicityClassification.get_data_fit_level
+    """
+
+    def __init__(self, classifications):
+        self.classifications = list(classifications)
+        # standard value -> {classification position: bit of the required display ethnicity it maps to, or 0}
+        self.required_bits_by_standard_value = defaultdict(dict)
+        # display ethnicity -> positions of the classifications with a data item for it
+        self.positions_by_display_ethnicity = defaultdict(set)
+        self.required_masks = []
+
+        for position, classification in enumerate(self.classifications):
+            required_bits = {}
+            for item in classification.get_data_items():
+                self.positions_by_display_ethnicity[item.display_ethnicity].add(position)
+                if item.required is True:
+                    required_bits[item.display_ethnicity] = 1 << len(required_bits)
+            self.required_masks.append((1 << len(required_bits)) - 1)
+
+            for standard_value, display_ethnicity in classification.standard_value_to_display_value_map.items():
+                self.required_bits_by_standard_value[standard_value][position] = required_bits.get(display_ethnicity, 0)
+
+    def get_valid_classifications(self, raw_ethnicities, standardiser):
+        # Each distinct raw value is only standardised once
+        standard_value_counts = Counter()
+        for raw_ethnicity, count in Counter(raw_ethnicities).items():
+            standard_value_counts[standardiser.standardise(raw_ethnicity)] += count
+
+        # The least used values first, to rule out the most classifications soonest
+        standard_values = sorted(standard_value_counts, key=self.__classification_count)
+        if standard_values:
+            covered_bits = dict(self.required_bits_by_standard_value.get(standard_values[0], {}))
+        else:
+            covered_bits = {position: 0 for position in range(len(self.classifications))}
+
+        for standard_value in standard_values[1:]:
+            if not covered_bits:
+                return []
+            bits_by_position = self.required_bits_by_standard_value.get(standard_value, {})
+            covered_bits = {
+                position: bits | bits_by_position[position]
+                for position, bits in covered_bits.items()
+                if position in bits_by_position
+            }
+
+        valid_positions = [
+            position for position, bits in sorted(covered_bits.items()) if bits == self.required_masks[position]
+        ]
+
+        fit_levels = Counter()
+        for standard_value, count in standard_value_counts.items():
+            for position in self.positions_by_display_ethnicity.get(standard_value, ()):
+                fit_levels[position] += count
+        valid_positions.sort(key=lambda position: -fit_levels[position])
+
+        return [self.classifications[position] for position in valid_positions]
+
+    def __classification_count(self, standard_value):
+        return len(self.required_bits_by_standard_value.get(standard_value, ()))
+
+
 class EthnicityClassificationDataItem:
     """
     An ethnicity classification data item contains the return data for that
@@ -40,6 +40,7 @@ from application.cms.page_service import page_service
 from application.cms.scanner_service import scanner_service
 from application.cms.upload_service import upload_service
 from application.cms.utils import get_form_errors
+from application.dashboard.cache import dashboard_cache
 from application.dashboard.trello_service import trello_service
 
 from application.static_site.filters import (
@@ -92,6 +93,7 @@ def create_app(config_object):
     scanner_service.init_app(app)
     dimension_service.init_app(app)
 
+    dashboard_cache.init_app(app)
     trello_service.init_app(app)
     trello_service.set_credentials(config_object.TRELLO_API_KEY, config_object.TRELLO_API_TOKEN)
 
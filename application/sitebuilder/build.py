@@ -1,19 +1,35 @@
 #! /usr/bin/env python
+import errno
 import glob
+import hashlib
 import json
 
 import os
 import pathlib
 import shutil
 import subprocess
+import tempfile
 from datetime import datetime
 from uuid import uuid4
 
 from flask import current_app, render_template, g
+from slugify import slugify
 
-from application.cms.upload_service import upload_service
 from application.data.dimensions import DimensionObjectBuilder
-from application.utils import get_csv_data_for_download, write_dimension_csv, write_dimension_tabular_csv
+from application.sitebuilder.checkpoints import (
+    BuildCheckpoint,
+    can_resume,
+    prune_source_data_changes,
+    run_unit,
+    source_data_fingerprint,
+)
+from application.sitebuilder.compression import compress_build_outputs, remove_compressed_outputs
+from application.sitebuilder.download_cache import DownloadCache, remove_leaked_downloads
+from application.sitebuilder.fingerprints import BuildFingerprints, measure_version_fingerprint, templates_fingerprint
+from application.sitebuilder.manifest import OutputSources, build_output_manifest
+from application.sitebuilder.render_pool import MeasureVersionRenderPool
+from application.sitebuilder.telemetry import record_bytes_written, telemetry_page, telemetry_phase
+from application.utils import write_dimension_csv, write_dimension_tabular_csv
 
 BUILD_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S.%f"
 
@@ -38,45 +54,201 @@ def make_new_build_dir(application, build=None):
     return build_dir
 
 
+def reuse_previous_build_dir(application, build=None):
+    """Moves the most recent build directory (if there is one) to the location for this build, and removes any older
+    build directories, so that an incremental build can start from the output of the previous build."""
+    base_build_dir = application.config["STATIC_BUILD_DIR"]
+    os.makedirs(base_build_dir, exist_ok=True)
+
+    previous_build_dirs = _previous_build_dirs(application)
+    if not previous_build_dirs:
+        return make_new_build_dir(application, build=build)
+
+    for old_build_dir in previous_build_dirs[:-1]:
+        shutil.rmtree(old_build_dir)
+
+    build_timestamp = _stringify_timestamp(build.created_at if build else datetime.utcnow())
+    build_id = build.id if build else uuid4()
+
+    build_dir = "%s/%s_%s" % (base_build_dir, build_timestamp, build_id)
+    os.rename(previous_build_dirs[-1], build_dir)
+
+    current_app.logger.info(f"Reusing previous build in build directory: {build_dir}")
+
+    return build_dir
+
+
+def _previous_build_dirs(application):
+    base_build_dir = application.config["STATIC_BUILD_DIR"]
+    return sorted(path for path in glob.glob(os.path.join(base_build_dir, "*")) if os.path.isdir(path))
+
+
 def do_it(application, build):
     with application.app_context():
         load_build_info()
+        g.output_sources = OutputSources()
 
         # Build the pages in static mode
         application.config["STATIC_MODE"] = True
 
         print("DEBUG: do_it()")
-        remove_old_build_dirs(application)
-        build_dir = make_new_build_dir(application, build=build)
+        incremental_build = application.config["INCREMENTAL_BUILD"]
+
+        templates_hash = templates_fingerprint(
+            os.path.join(application.root_path, application.template_folder), build_info=g.build_info
+        )
+        source_fingerprint = source_data_fingerprint(templates_hash)
+
+        with telemetry_phase("prepare_build_dir"):
+            # The most recent build directory is only left behind with a checkpoint if that build didn't finish
+            previous_build_dirs = _previous_build_dirs(application)
+            resuming = bool(previous_build_dirs) and can_resume(previous_build_dirs[-1], source_fingerprint)
+
+            if incremental_build or resuming:
+                build_dir = reuse_previous_build_dir(application, build=build)
+            else:
+                remove_old_build_dirs(application)
+                build_dir = make_new_build_dir(application, build=build)
+
+                print("DEBUG do_it(): Deleting files from repo...")
+                delete_files_from_repo(build_dir)
+
+            fingerprints = (
+                BuildFingerprints.load(build_dir, templates_hash=templates_hash) if incremental_build else None
+            )
+            checkpoint = BuildCheckpoint.load(
+                build_dir, source_fingerprint, fingerprints=fingerprints, output_sources=g.output_sources
+            )
 
-        print("DEBUG do_it(): Deleting files from repo...")
-        delete_files_from_repo(build_dir)
         print("DEBUG do_it(): Creating versioned assets...")
-        create_versioned_assets(build_dir)
+        with telemetry_phase("create_versioned_assets"):
+            create_versioned_assets(build_dir)
 
         local_build = application.config["LOCAL_BUILD"]
 
+        build_workers = application.config["BUILD_WORKERS"]
+        render_pool = MeasureVersionRenderPool(application, build_workers) if build_workers > 1 else None
+
         print("DEBUG do_it(): Building from homepage...")
-        build_homepage_and_topic_hierarchy(build_dir, config=application.config)
+        with telemetry_phase("build_homepage_and_topic_hierarchy"):
+            build_homepage_and_topic_hierarchy(
+                build_dir,
+                config=application.config,
+                fingerprints=fingerprints,
+                render_pool=render_pool,
+                checkpoint=checkpoint,
+            )
+
+            if fingerprints is not None:
+                fingerprints.remove_stale_units(build_dir)
+                fingerprints.save(build_dir)
+
+            DownloadCache.from_config(application.config).evict()
+            remove_leaked_downloads()
 
         print("DEBUG do_it(): Building dashboards...")
-        build_dashboards(build_dir)
+        with telemetry_phase("build_dashboards"):
+            if incremental_build and not checkpoint.has_completed_any("dashboards/"):
+                clear_up(os.path.join(build_dir, "dashboards"))
+            build_dashboards(build_dir, checkpoint=checkpoint)
 
         print("DEBUG do_it(): Building other static pages...")
-        build_other_static_pages(build_dir)
+        with telemetry_phase("build_other_static_pages"):
+            run_unit(checkpoint, "static_pages", lambda: build_other_static_pages(build_dir))
+
+        print("DEBUG do_it(): Recording build manifest...")
+        with telemetry_phase("build_output_manifest"):
+            manifest = build_output_manifest(build_dir, g.output_sources)
+            if build is not None:
+                build.manifest = manifest
+
+        with telemetry_phase("compress_build_outputs"):
+            if application.config["COMPRESS_STATIC_SITE"]:
+                print("DEBUG do_it(): Compressing text files...")
+                compress_build_outputs(build_dir, manifest)
+            else:
+                remove_compressed_outputs(build_dir)
 
         print(f"{'Deploying' if application.config['DEPLOY_SITE'] else 'NOT deploying'} site to S3")
         if application.config["DEPLOY_SITE"]:
             from application.sitebuilder.build_service import s3_deployer
 
-            s3_deployer(application, build_dir)
+            # A deploy which fails part-way is resumed by the next one, which only uploads what is still out of date
+            with telemetry_phase("deploy"):
+                s3_deployer(application, build_dir, manifest=manifest, build_id=build.id if build else None)
             print("Static site deployed")
 
-        if not local_build:
+        checkpoint.clear()
+        prune_source_data_changes()
+
+        # Incremental builds keep the build directory so the next build can start from it
+        if not local_build and not incremental_build:
             print("DEBUG do_it(): Clearing up build directory...")
             clear_up(build_dir)
 
 
+def do_partial_build(application, build, measure):
+    """Writes and deploys only the pages affected by publishing a new version of `measure`: its versions and '/latest'
+    alias, its topic page, the homepage, the corrections page, and the dashboards which list or count it. Everything
+    else is left as deployed by the previous build."""
+    with application.app_context():
+        load_build_info()
+        g.output_sources = OutputSources()
+
+        # Build the pages in static mode
+        application.config["STATIC_MODE"] = True
+
+        from application.cms.page_service import page_service
+
+        # Kept apart from STATIC_BUILD_DIR so that an incremental build never mistakes this for a complete build
+        build_dir = tempfile.mkdtemp(prefix="partial-build-")
+        current_app.logger.info(f"New partial build directory: {build_dir} for measure {measure.slug}")
+
+        with telemetry_phase("build_measure_and_topic"):
+            topics = page_service.get_build_snapshot()
+            write_homepage(build_dir, topics)
+
+            # The measure's topic won't be in the snapshot if it isn't published, e.g. it's in the testing space
+            for topic in topics:
+                if topic.id != measure.subtopic.topic.id:
+                    continue
+
+                measures_by_subtopic = write_topic_page(topic, build_dir)
+                for measures in measures_by_subtopic.values():
+                    for publishable_measure in measures:
+                        if publishable_measure.id == measure.id:
+                            write_measure_versions(
+                                publishable_measure, build_dir, local_build=application.config["LOCAL_BUILD"]
+                            )
+
+        with telemetry_phase("build_dashboards"):
+            build_dashboards(build_dir, measure=measure)
+            write_corrections_page(build_dir)
+
+        with telemetry_phase("build_output_manifest"):
+            manifest = build_output_manifest(build_dir, g.output_sources)
+            if build is not None:
+                build.manifest = manifest
+
+        if application.config["COMPRESS_STATIC_SITE"]:
+            with telemetry_phase("compress_build_outputs"):
+                compress_build_outputs(build_dir, manifest)
+
+        if application.config["DEPLOY_SITE"]:
+            from application.sitebuilder.build_service import s3_deployer
+
+            with telemetry_phase("deploy"):
+                s3_deployer(
+                    application, build_dir, manifest=manifest, partial=True, build_id=build.id if build else None
+                )
+            print("Partial static site deployed")
+
+        prune_source_data_changes()
+
+        if not application.config["LOCAL_BUILD"]:
+            clear_up(build_dir)
+
+
 def load_build_info():
     # Load build info from JSON file
     current_file_path = pathlib.Path(__file__)
@@ -88,28 +260,65 @@ def load_build_info():
     g.build_info = build_info
 
 
-def build_homepage_and_topic_hierarchy(build_dir, config):
+def build_homepage_and_topic_hierarchy(build_dir, config, fingerprints=None, render_pool=None, checkpoint=None):
 
     os.makedirs(build_dir, exist_ok=True)
     from application.cms.page_service import page_service
 
-    topics = page_service.get_topics(include_testing_space=False)
+    topics = page_service.get_build_snapshot()
+    write_homepage(build_dir, topics)
+
+    rendering_topic_units = []
+    for topic in topics:
+        unit = f"topics/{topic.slug}"
+        if checkpoint is not None and checkpoint.is_complete(unit):
+            print(f"Skipping {unit}: completed by a previous attempt at this build")
+            continue
+
+        write_topic_html(topic, build_dir, config, fingerprints=fingerprints, render_pool=render_pool)
+
+        if render_pool is not None:
+            rendering_topic_units.append(unit)
+        elif checkpoint is not None:
+            checkpoint.complete(unit)
+
+    if render_pool is not None:
+        print("DEBUG build_homepage_and_topic_hierarchy(): Waiting for measure pages to be rendered...")
+        render_pool.wait()
+
+        # Topics' measure pages can be rendered in any order, so they're only complete once the whole pool has finished
+        if checkpoint is not None:
+            checkpoint.complete(*rendering_topic_units)
+
+
+def write_homepage(build_dir, topics):
     content = render_template("static_site/index.html", topics=topics)
 
     file_path = os.path.join(build_dir, "index.html")
     write_html(file_path, content)
 
-    for topic in topics:
-        write_topic_html(topic, build_dir, config)
 
+def write_topic_html(topic, build_dir, config, fingerprints=None, render_pool=None):
+    local_build = config["LOCAL_BUILD"]
+
+    measures_by_subtopic = write_topic_page(topic, build_dir)
 
-def write_topic_html(topic, build_dir, config):
+    if fingerprints is not None:
+        # Topic pages are always re-rendered, but are recorded so that a topic which is removed gets cleared up
+        fingerprints.record(topic.slug, None)
 
+    for measures in measures_by_subtopic.values():
+        for measure in measures:
+            write_measure_versions(
+                measure, build_dir, local_build=local_build, fingerprints=fingerprints, render_pool=render_pool
+            )
+
+
+def write_topic_page(topic, build_dir):
+    """Writes the topic's own page, and returns its publishable measures grouped by subtopic id."""
     slug = os.path.join(build_dir, topic.slug)
     os.makedirs(slug, exist_ok=True)
 
-    local_build = config["LOCAL_BUILD"]
-
     measures_by_subtopic = {}
     subtopics = []
 
@@ -121,33 +330,115 @@ def write_topic_html(topic, build_dir, config):
             measures_by_subtopic[subtopic.id] = measures
             subtopics.append(subtopic)
 
-    content = render_template(
-        "static_site/topic.html", topic=topic, subtopics=subtopics, measures_by_subtopic=measures_by_subtopic
-    )
-
     file_path = os.path.join(slug, "index.html")
-    write_html(file_path, content)
+    with telemetry_page(topic.slug):
+        content = render_template(
+            "static_site/topic.html", topic=topic, subtopics=subtopics, measures_by_subtopic=measures_by_subtopic
+        )
+        write_html(file_path, content)
+    _register_output_source(build_dir, file_path, topic=topic.slug)
 
-    for measures in measures_by_subtopic.values():
-        for measure in measures:
-            write_measure_versions(measure, build_dir, local_build=local_build)
+    return measures_by_subtopic
 
 
-def write_measure_versions(measure, build_dir, local_build=False):
+def write_measure_versions(measure, build_dir, local_build=False, fingerprints=None, render_pool=None):
 
     for measure_version in measure.versions_to_publish:
-        slug = os.path.join(
-            build_dir, measure.subtopic.topic.slug, measure.subtopic.slug, measure.slug, measure_version.version
-        )
-
-        write_measure_vesion_at_slug(measure, measure_version, slug, latest_url=False, local_build=local_build)
+        measure_dir = os.path.join(build_dir, measure.subtopic.topic.slug, measure.subtopic.slug, measure.slug)
+        slug = os.path.join(measure_dir, measure_version.version)
 
         # ALSO publish the same version at a '/latest' URL if it’s the latest one.
+        latest_slug = None
         if measure_version == measure.latest_published_version:
+            latest_slug = os.path.join(measure_dir, "latest")
+
+        _write_measure_version_unless_unchanged(
+            measure,
+            measure_version,
+            build_dir,
+            slug,
+            latest_slug=latest_slug,
+            local_build=local_build,
+            fingerprints=fingerprints,
+            render_pool=render_pool,
+        )
+
+
+def _write_measure_version_unless_unchanged(
+    measure, measure_version, build_dir, slug, latest_slug=None, local_build=False, fingerprints=None, render_pool=None
+):
+    for path in (slug, latest_slug):
+        if path:
+            _register_measure_version_output_sources(measure_version, build_dir, path)
+
+    if fingerprints is None:
+        _write_measure_version(measure, measure_version, build_dir, slug, latest_slug, local_build, render_pool)
+        return
+
+    units = [os.path.relpath(path, build_dir) for path in (slug, latest_slug) if path]
+    fingerprint = measure_version_fingerprint(
+        measure,
+        measure_version,
+        fingerprints.templates_hash,
+        latest_url=latest_slug is not None,
+        local_build=local_build,
+    )
+
+    if not all(fingerprints.is_unchanged(build_dir, unit, fingerprint) for unit in units):
+        # Clear out the previous output so that renamed dimensions and uploads don't leave old files behind
+        for path in (slug, latest_slug):
+            if path and os.path.isdir(path):
+                shutil.rmtree(path)
+        _write_measure_version(measure, measure_version, build_dir, slug, latest_slug, local_build, render_pool)
+
+    for unit in units:
+        fingerprints.record(unit, fingerprint)
+
+
+def _register_measure_version_output_sources(measure_version, build_dir, slug):
+    _register_output_source(build_dir, slug, measure_version_id=measure_version.id)
+
+    download_dir = os.path.join(slug, "downloads")
+    for dimension in measure_version.ordered_dimensions:
+        for file_name in (dimension.static_file_name, dimension.static_table_file_name):
+            _register_output_source(
+                build_dir,
+                os.path.join(download_dir, file_name),
+                measure_version_id=measure_version.id,
+                dimension_guid=dimension.guid,
+            )
+
+    for upload in measure_version.uploads:
+        _register_output_source(
+            build_dir,
+            os.path.join(download_dir, upload.file_name),
+            measure_version_id=measure_version.id,
+            upload_guid=upload.guid,
+        )
+
+
+def _register_output_source(build_dir, path, **source):
+    output_sources = g.get("output_sources")
+    if output_sources is not None:
+        output_sources.register(build_dir, path, **source)
 
-            slug = os.path.join(build_dir, measure.subtopic.topic.slug, measure.subtopic.slug, measure.slug, "latest")
 
-            write_measure_vesion_at_slug(measure, measure_version, slug, latest_url=True, local_build=local_build)
+def _write_measure_version(measure, measure_version, build_dir, slug, latest_slug, local_build, render_pool=None):
+    page_path = os.path.relpath(slug, build_dir)
+    if render_pool is not None:
+        render_pool.submit(measure_version, slug, latest_slug=latest_slug, local_build=local_build, page_path=page_path)
+    else:
+        with telemetry_page(page_path):
+            write_measure_version(measure, measure_version, slug, latest_slug=latest_slug, local_build=local_build)
+
+
+def write_measure_version(measure, measure_version, slug, latest_slug=None, local_build=False):
+    """Writes a measure version page with its dimension CSVs and downloads. If this is the latest published version,
+    the '/latest' page is also written, reusing the CSVs and downloads rather than generating them a second time."""
+    write_measure_vesion_at_slug(measure, measure_version, slug, latest_url=False, local_build=local_build)
+
+    if latest_slug:
+        write_measure_version_alias(measure, measure_version, slug, latest_slug)
 
 
 def write_measure_vesion_at_slug(measure, measure_version, slug, latest_url, local_build=False):
@@ -155,6 +446,28 @@ def write_measure_vesion_at_slug(measure, measure_version, slug, latest_url, loc
 
     process_dimensions(measure_version, slug)
 
+    write_measure_version_html(measure, measure_version, slug, latest_url)
+
+    if not local_build:
+        write_measure_version_downloads(measure_version, slug)
+
+
+def write_measure_version_alias(measure, measure_version, slug, alias_slug):
+    """Populates `alias_slug` with the files already written for the measure version at `slug` (hardlinked where
+    possible), and renders only the page itself, as that's the only output which differs at the alias URL."""
+    if os.path.isdir(alias_slug):
+        shutil.rmtree(alias_slug)
+    os.makedirs(alias_slug)
+
+    for name in os.listdir(slug):
+        path = os.path.join(slug, name)
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(alias_slug, name), copy_function=_link_or_copy)
+
+    write_measure_version_html(measure, measure_version, alias_slug, latest_url=True)
+
+
+def write_measure_version_html(measure, measure_version, slug, latest_url):
     # define template
     template = "static_site/measure.html"
 
@@ -172,8 +485,26 @@ def write_measure_vesion_at_slug(measure, measure_version, slug, latest_url, loc
     file_path = os.path.join(slug, "index.html")
     write_html(file_path, content)
 
-    if not local_build:
-        write_measure_version_downloads(measure_version, slug)
+
+def _link_or_copy(source, destination):
+    """Hardlinks `source` to `destination`, or copies it where it can't be linked, e.g. onto another filesystem.
+
+    Whatever is already at `destination` is unlinked first rather than written through, as it may itself be a link to
+    a download cache entry or to a file in the app's static folder."""
+    _remove_existing(destination)
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copy2(source, destination)
+
+
+def _remove_existing(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
 
 
 def write_measure_version_downloads(measure_version, slug):
@@ -182,13 +513,13 @@ def write_measure_version_downloads(measure_version, slug):
         download_dir = os.path.join(slug, "downloads")
         os.makedirs(download_dir, exist_ok=True)
 
+    download_cache = DownloadCache.from_config(current_app.config)
+
     for d in measure_version.uploads:
         try:
-            filename = upload_service.get_measure_download(d, d.file_name, "source")
-            content = get_csv_data_for_download(filename)
             file_path = os.path.join(download_dir, d.file_name)
-            with open(file_path, "w", encoding="windows-1252") as download_file:
-                download_file.write(content)
+            _link_or_copy(download_cache.get_download(d), file_path)
+            record_bytes_written(file_path)
         except Exception as e:
             message = "Error writing download for file %s" % d.file_name
             print(message)
@@ -196,11 +527,11 @@ def write_measure_version_downloads(measure_version, slug):
 
 
 def process_dimensions(measure_version, slug):
-    if measure_version.dimensions:
+    if measure_version.ordered_dimensions:
         download_dir = os.path.join(slug, "downloads")
         os.makedirs(download_dir, exist_ok=True)
 
-    for dimension in measure_version.dimensions:
+    for dimension in measure_version.ordered_dimensions:
 
         if (
             dimension.dimension_chart
@@ -215,8 +546,10 @@ def process_dimensions(measure_version, slug):
 
         try:
             file_path = os.path.join(download_dir, dimension.static_file_name)
+            _remove_existing(file_path)
             with open(file_path, "w") as dimension_file:
                 dimension_file.write(output)
+            record_bytes_written(file_path)
 
         except Exception as e:
             print(f"Could not write file path {file_path}")
@@ -226,21 +559,20 @@ def process_dimensions(measure_version, slug):
             table_output = write_dimension_tabular_csv(dimension=dimension_obj)
 
             table_file_path = os.path.join(download_dir, dimension.static_table_file_name)
+            _remove_existing(table_file_path)
             with open(table_file_path, "w") as dimension_file:
                 dimension_file.write(table_output)
+            record_bytes_written(table_file_path)
 
 
-def build_dashboards(build_dir):
+def build_dashboards(build_dir, measure=None, checkpoint=None):
+    """Writes every dashboard, or if `measure` is given, only the dashboards which list it or count it. The individual
+    ethnic group, classification and geography dashboards are each checkpointed as a group."""
     # Import these locally, as importing at file level gives circular imports when running tests
     from application.dashboard.data_helpers import (
+        DashboardData,
         get_published_dashboard_data,
         get_planned_pages_dashboard_data,
-        get_ethnic_groups_dashboard_data,
-        get_ethnic_group_by_slug_dashboard_data,
-        get_ethnicity_classifications_dashboard_data,
-        get_ethnicity_classification_by_id_dashboard_data,
-        get_geographic_breakdown_dashboard_data,
-        get_geographic_breakdown_by_slug_dashboard_data,
         get_published_measures_by_years_and_months,
     )
 
@@ -254,112 +586,181 @@ def build_dashboards(build_dir):
         "dashboards/whats-new",
     ]
     for dir in directories:
+        _register_output_source(build_dir, os.path.join(build_dir, dir), dashboard=os.path.basename(dir))
         dir = os.path.join(build_dir, dir)
         os.makedirs(dir, exist_ok=True)
+    _register_output_source(build_dir, os.path.join(dashboards_dir, "index.html"), dashboard="index")
+
+    if measure is not None:
+        affected_ethnic_group_slugs, affected_classification_ids, affected_geography_slugs = (
+            _dashboards_affected_by_measure(measure)
+        )
 
     # Dashboards home page
-    content = render_template("dashboards/index.html")
-    file_path = os.path.join(dashboards_dir, "index.html")
-    write_html(file_path, content)
+    if measure is None:
+        content = render_template("dashboards/index.html")
+        file_path = os.path.join(dashboards_dir, "index.html")
+        write_html(file_path, content)
+
+    # Every dashboard below is written from one scan of each of the dashboards' materialized views
+    dashboard_data = DashboardData()
 
     # New and updated pages
-    data = get_published_dashboard_data()
+    published_dashboard_data = get_published_dashboard_data()
     pages_by_years_and_months = get_published_measures_by_years_and_months()
     content = render_template(
-        "dashboards/whats_new.html", pages_by_years_and_months=pages_by_years_and_months, data=data
+        "dashboards/whats_new.html", pages_by_years_and_months=pages_by_years_and_months, data=published_dashboard_data
     )
     file_path = os.path.join(dashboards_dir, "whats-new/index.html")
     write_html(file_path, content)
 
     # Published measures dashboard
-    data = get_published_dashboard_data()
-    content = render_template("dashboards/publications.html", data=data)
+    content = render_template("dashboards/publications.html", data=published_dashboard_data)
     file_path = os.path.join(dashboards_dir, "published/index.html")
     write_html(file_path, content)
 
     # Planned measures dashboard
-    measures, planned_count, progress_count, review_count = get_planned_pages_dashboard_data()
-    content = render_template(
-        "dashboards/planned_pages.html",
-        measures=measures,
-        planned_count=planned_count,
-        progress_count=progress_count,
-        review_count=review_count,
-    )
-    file_path = os.path.join(dashboards_dir, "planned-pages/index.html")
-    write_html(file_path, content)
+    if measure is None:
+        measures, planned_count, progress_count, review_count = get_planned_pages_dashboard_data()
+        content = render_template(
+            "dashboards/planned_pages.html",
+            measures=measures,
+            planned_count=planned_count,
+            progress_count=progress_count,
+            review_count=review_count,
+        )
+        file_path = os.path.join(dashboards_dir, "planned-pages/index.html")
+        write_html(file_path, content)
 
     # Ethnic groups top-level dashboard
-    sorted_ethnicity_list = get_ethnic_groups_dashboard_data()
+    sorted_ethnicity_list = dashboard_data.ethnic_groups()
     content = render_template("dashboards/ethnic_groups.html", ethnic_groups=sorted_ethnicity_list)
     file_path = os.path.join(dashboards_dir, "ethnic-groups/index.html")
     write_html(file_path, content)
 
     # Individual ethnic group dashboards
-    for ethnicity in sorted_ethnicity_list:
-        slug = ethnicity["url"][ethnicity["url"].rindex("/") + 1 :]  # The part of the url after the final /
-        value_title, page_count, nested_measures_and_dimensions = get_ethnic_group_by_slug_dashboard_data(slug)
-        content = render_template(
-            "dashboards/ethnic_group.html",
-            ethnic_group=value_title,
-            measure_count=page_count,
-            nested_measures_and_dimensions=nested_measures_and_dimensions,
-        )
-        dir_path = os.path.join(dashboards_dir, f"ethnic-groups/{slug}")
-        os.makedirs(dir_path, exist_ok=True)
-        write_html(os.path.join(dir_path, "index.html"), content)
+    if measure is None:
+        # The part of the url after the final /
+        ethnic_group_slugs = [
+            ethnicity["url"][ethnicity["url"].rindex("/") + 1 :] for ethnicity in sorted_ethnicity_list
+        ]
+    else:
+        ethnic_group_slugs = affected_ethnic_group_slugs
+
+    def write_ethnic_group_dashboards():
+        for slug in ethnic_group_slugs:
+            value_title, page_count, nested_measures_and_dimensions = dashboard_data.ethnic_group_by_slug(slug)
+            content = render_template(
+                "dashboards/ethnic_group.html",
+                ethnic_group=value_title,
+                measure_count=page_count,
+                nested_measures_and_dimensions=nested_measures_and_dimensions,
+            )
+            dir_path = os.path.join(dashboards_dir, f"ethnic-groups/{slug}")
+            os.makedirs(dir_path, exist_ok=True)
+            write_html(os.path.join(dir_path, "index.html"), content)
+
+    run_unit(checkpoint, "dashboards/ethnic-groups", write_ethnic_group_dashboards)
 
     # Ethnicity classifications top-level dashboard
-    classifications = get_ethnicity_classifications_dashboard_data()
+    classifications = dashboard_data.ethnicity_classifications()
     content = render_template("dashboards/ethnicity_classifications.html", ethnicity_classifications=classifications)
     file_path = os.path.join(dashboards_dir, "ethnicity-classifications/index.html")
     write_html(file_path, content)
 
     # Individual ethnicity classifications dashboards
-    for classification in classifications:
-        (
-            classification_title,
-            page_count,
-            nested_measures_and_dimensions,
-        ) = get_ethnicity_classification_by_id_dashboard_data(  # noqa
-            classification["id"]
-        )
-        content = render_template(
-            "dashboards/ethnicity_classification.html",
-            classification_title=classification_title,
-            page_count=page_count,
-            nested_measures_and_dimensions=nested_measures_and_dimensions,
-            classification=current_app.classification_finder.get_classification_collection().get_classification_by_id(classification["id"])
-        )
-        dir_path = os.path.join(dashboards_dir, f'ethnicity-classifications/{classification["id"]}')
-        os.makedirs(dir_path, exist_ok=True)
-        write_html(os.path.join(dir_path, "index.html"), content)
+    if measure is None:
+        classification_ids = [classification["id"] for classification in classifications]
+    else:
+        classification_ids = affected_classification_ids
+
+    def write_ethnicity_classification_dashboards():
+        for classification_id in classification_ids:
+            (
+                classification_title,
+                page_count,
+                nested_measures_and_dimensions,
+            ) = dashboard_data.ethnicity_classification_by_id(classification_id)
+            content = render_template(
+                "dashboards/ethnicity_classification.html",
+                classification_title=classification_title,
+                page_count=page_count,
+                nested_measures_and_dimensions=nested_measures_and_dimensions,
+                classification=current_app.classification_finder.get_classification_collection().get_classification_by_id(classification_id)
+            )
+            dir_path = os.path.join(dashboards_dir, f"ethnicity-classifications/{classification_id}")
+            os.makedirs(dir_path, exist_ok=True)
+            write_html(os.path.join(dir_path, "index.html"), content)
+
+    run_unit(checkpoint, "dashboards/ethnicity-classifications", write_ethnicity_classification_dashboards)
 
     # Geographic breakdown top-level dashboard
-    location_levels = get_geographic_breakdown_dashboard_data()
+    location_levels = dashboard_data.geographic_breakdown()
     content = render_template("dashboards/geographic-breakdown.html", location_levels=location_levels)
     file_path = os.path.join(dashboards_dir, "geographic-breakdown/index.html")
     write_html(file_path, content)
 
     # Individual geographic area dashboards
-    for loc_level in location_levels:
-        slug = loc_level["url"][loc_level["url"].rindex("/") + 1 :]  # The part of the url after the final /
-        (
-            geography,
-            page_count,
-            measure_titles_and_urls_by_topic_and_subtopic,
-        ) = get_geographic_breakdown_by_slug_dashboard_data(  # noqa
-            slug
-        )
-        content = render_template(
-            "dashboards/lowest-level-of-geography.html",
-            level_of_geography=geography.name,
-            page_count=page_count,
-            measure_titles_and_urls_by_topic_and_subtopic=measure_titles_and_urls_by_topic_and_subtopic,
-        )
-        dir_path = os.path.join(dashboards_dir, f"geographic-breakdown/{slug}")
-        os.makedirs(dir_path, exist_ok=True)
-        write_html(os.path.join(dir_path, "index.html"), content)
+    if measure is None:
+        # The part of the url after the final /
+        geography_slugs = [loc_level["url"][loc_level["url"].rindex("/") + 1 :] for loc_level in location_levels]
+    else:
+        geography_slugs = affected_geography_slugs
+
+    def write_geographic_breakdown_dashboards():
+        for slug in geography_slugs:
+            (
+                geography,
+                page_count,
+                measure_titles_and_urls_by_topic_and_subtopic,
+            ) = dashboard_data.geographic_breakdown_by_slug(slug)
+            content = render_template(
+                "dashboards/lowest-level-of-geography.html",
+                level_of_geography=geography.name,
+                page_count=page_count,
+                measure_titles_and_urls_by_topic_and_subtopic=measure_titles_and_urls_by_topic_and_subtopic,
+            )
+            dir_path = os.path.join(dashboards_dir, f"geographic-breakdown/{slug}")
+            os.makedirs(dir_path, exist_ok=True)
+            write_html(os.path.join(dir_path, "index.html"), content)
+
+    run_unit(checkpoint, "dashboards/geographic-breakdown", write_geographic_breakdown_dashboards)
+
+
+def _dashboards_affected_by_measure(measure):
+    """The ethnic groups, classifications and geographies whose dashboards could list any version of the measure,
+    including those which only earlier versions were associated with, so that the measure is removed from them.
+
+    As in a full build, only the ethnic groups which some published measure is listed under have a dashboard."""
+    from application.dashboard.models import EthnicGroupByDimension
+
+    classifications = set()
+    geography_slugs = set()
+
+    for measure_version in measure.versions:
+        if measure_version.lowest_level_of_geography:
+            geography_slugs.add(slugify(measure_version.lowest_level_of_geography.name))
+        for dimension in measure_version.dimensions:
+            if dimension.dimension_classification:
+                classifications.add(dimension.dimension_classification.classification)
+
+    ethnicity_values = {
+        ethnicity.value
+        for classification in classifications
+        for ethnicity in classification.ethnicities + classification.parent_values
+    }
+    listed_ethnicity_values = (
+        EthnicGroupByDimension.query.with_entities(EthnicGroupByDimension.ethnicity_value)
+        .filter(EthnicGroupByDimension.ethnicity_value.in_(ethnicity_values))
+        .distinct()
+    )
+    ethnic_group_slugs = {slugify(ethnicity_value) for (ethnicity_value,) in listed_ethnicity_values}
+
+    return (
+        sorted(ethnic_group_slugs),
+        sorted(classification.id for classification in classifications),
+        sorted(geography_slugs),
+    )
 
 
 def build_other_static_pages(build_dir):
@@ -383,6 +784,10 @@ def build_other_static_pages(build_dir):
             content = render_template(template_path)
             write_html(file_path, content)
 
+    write_corrections_page(build_dir)
+
+
+def write_corrections_page(build_dir):
     # Data corrections page - relies on being run *after* publishing (and marking published) any new measure versions.
     from application.cms.page_service import page_service
 
@@ -415,14 +820,61 @@ def clear_up(build_dir):
 def create_versioned_assets(build_dir):
     # subprocess.run(["npx", "gulp", "make"])
     static_dir = os.path.join(build_dir, get_static_dir())
-    if os.path.exists(static_dir):
-        shutil.rmtree(static_dir)
-    shutil.copytree(current_app.static_folder, static_dir)
+    sync_directory(current_app.static_folder, static_dir)
+
+
+def sync_directory(source_dir, destination_dir):
+    """Make `destination_dir` a copy of `source_dir`, hardlinking files where possible. Files which already have the
+    same content as their source are left alone, and files and directories which no longer exist in the source are
+    removed.
+
+    Anything which writes to the linked files in `destination_dir` must replace them rather than write in place, or it
+    would also change `source_dir`."""
+    expected_paths = set()
+
+    for root, dirs, files in os.walk(source_dir):
+        destination_root = os.path.join(destination_dir, os.path.relpath(root, source_dir))
+        os.makedirs(destination_root, exist_ok=True)
+        expected_paths.add(os.path.normpath(destination_root))
+
+        for name in files:
+            source_path = os.path.join(root, name)
+            destination_path = os.path.join(destination_root, name)
+            expected_paths.add(os.path.normpath(destination_path))
+
+            if os.path.isfile(destination_path) and _same_file_content(source_path, destination_path):
+                continue
+            _link_or_copy(source_path, destination_path)
+
+    # Bottom up, so that a directory is only checked once everything removed from inside it has gone
+    for root, dirs, files in os.walk(destination_dir, topdown=False):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path not in expected_paths:
+                os.remove(path)
+        if os.path.normpath(root) not in expected_paths and not os.listdir(root):
+            os.rmdir(root)
+
+
+def _same_file_content(path, other_path):
+    if os.path.samefile(path, other_path):
+        return True
+    if os.path.getsize(path) != os.path.getsize(other_path):
+        return False
+    return _file_hash(path) == _file_hash(other_path)
+
+
+def _file_hash(path):
+    with open(path, "rb") as hashed_file:
+        return hashlib.sha256(hashed_file.read()).hexdigest()
 
 
 def write_html(file_path, content):
+    # Replaced rather than written in place, in case the file is linked to one outside the build directory
+    _remove_existing(file_path)
     with open(file_path, "w") as out_file:
         out_file.write(content)
+    record_bytes_written(file_path)
 
 
 def get_static_dir():
@@ -1,25 +1,50 @@
 import atexit
-import subprocess
+import json
+import mimetypes
 
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 
 import shutil
 
 import os
+import select
+
+import boto3
+from botocore.exceptions import ClientError
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from sqlalchemy import desc, func
 from sqlalchemy.orm import sessionmaker
 
 from application import db
 from application.sitebuilder.models import Build, BuildStatus
-from application.sitebuilder.build import do_it, get_static_dir
+from application.sitebuilder.build import do_it, do_partial_build, get_static_dir
+from application.sitebuilder.compression import compressed_variant
+from application.sitebuilder.exceptions import DeployException
+from application.sitebuilder.manifest import build_output_manifest
+from application.sitebuilder.telemetry import BuildTelemetry
 
 YEAR_IN_SECONDS = 60 * 60 * 24 * 365
 HOUR_IN_SECONDS = 60 * 60
 FIFTEEN_MINUTES_IN_SECONDS = 60 * 15
 
+BUILD_REQUESTED_CHANNEL = "build_requested"
+BUILD_WORKER_POLL_INTERVAL_SECONDS = 60
+BUILD_REQUEST_COALESCE_SECONDS = 0.5
+
+DEPLOY_MANIFEST_KEY = ".deploy-manifest.json"
+DELETE_OBJECTS_BATCH_SIZE = 1000
+DEPLOY_CHECKPOINT_BATCH_SIZE = 500
+
+# Used by versioned deploys, where each build is deployed under its own prefix
+BUILDS_PREFIX = "builds/"
+LIVE_BUILD_POINTER_KEY = "live-build.json"
+VERSIONED_BUILDS_KEPT = 5
+ROUTE_REQUESTS_ATTEMPTS = 3
+
 
 class BuildException(Exception):
     def __init__(self, original_exception):
@@ -48,14 +73,57 @@ def clear_stalled_build():
         db.session.commit()
 
 
-def request_build():
+def request_build(measure=None):
+    """Request a build of the whole site, or if `measure` is given, of only the pages affected by publishing it."""
     build = Build()
     build.id = str(uuid.uuid4())
+    build.measure = measure
     db.session.add(build)
+
+    # The notification is only delivered to the build worker once the build has been committed
+    db.session.execute(f"NOTIFY {BUILD_REQUESTED_CHANNEL}")
     db.session.commit()
     return build
 
 
+def run_build_worker(app, poll_interval_seconds=BUILD_WORKER_POLL_INTERVAL_SECONDS):
+    """Wait for builds to be requested, and run them. This listens for the notification sent by `request_build`, so
+    a build starts as soon as it is requested rather than when `build_static_site` is next run. The worker also checks
+    for pending builds every `poll_interval_seconds`, in case a notification was sent while it wasn't listening."""
+    connection = db.engine.raw_connection()
+    try:
+        connection.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        connection.cursor().execute(f"LISTEN {BUILD_REQUESTED_CHANNEL}")
+        print("Build worker listening for build requests")
+
+        while True:
+            _wait_for_build_request(connection.connection, poll_interval_seconds)
+
+            try:
+                build_site(app)
+            except Exception:
+                # The failure has been recorded on the build, and shouldn't stop the worker picking up the next one
+                traceback.print_exc()
+    finally:
+        connection.close()
+
+
+def _wait_for_build_request(connection, timeout_seconds):
+    if select.select([connection], [], [], timeout_seconds) == ([], [], []):
+        return
+
+    # Wait for a burst of requests (e.g. several measures being published together) to finish arriving, so they're
+    # all covered by one build rather than the first request superseding the rest once its build has started
+    while select.select([connection], [], [], BUILD_REQUEST_COALESCE_SECONDS) != ([], [], []):
+        connection.poll()
+        connection.notifies.clear()
+
+
+def _record_build_progress(build, phase):
+    # Written outside the build's own session, so that progress is visible while the build is still running
+    db.engine.execute(Build.__table__.update().where(Build.id == build.id).values(progress=phase))
+
+
 def _any_build_has_been_started(session):
     started_builds = session.query(Build).filter(Build.status == BuildStatus.STARTED).all()
 
@@ -76,6 +144,10 @@ def _retrieve_and_start_latest_pending_build(session):
 
     target_build = builds[0]
     target_build.status = BuildStatus.STARTED
+
+    # A partial build can only stand in for the builds it supersedes if they were all for the same measure
+    if len({build.measure_id for build in builds}) > 1:
+        target_build.measure_id = None
     session.add(target_build)
 
     superseded_builds = builds[1:]
@@ -110,23 +182,312 @@ def build_site(app):
         print("DEBUG _build_site(): Finished build.")
 
 
-def s3_deployer(app, build_dir):
+def s3_deployer(app, build_dir, manifest=None, partial=False, build_id=None):
     _delete_files_not_needed_for_deploy(build_dir)
 
     site_bucket_name = app.config["S3_STATIC_SITE_BUCKET"]
+    s3_client = boto3.client("s3", region_name=app.config["S3_REGION"])
+
+    if app.config["VERSIONED_DEPLOYS"]:
+        versioned_s3_deployer(app, s3_client, workers=app.config["DEPLOY_WORKERS"]).deploy(
+            build_dir, build_id or uuid.uuid4(), manifest=manifest, partial=partial
+        )
+    else:
+        S3Deployer(s3_client, site_bucket_name, workers=app.config["DEPLOY_WORKERS"]).deploy(
+            build_dir, manifest=manifest, partial=partial
+        )
 
-    # Ensure static assets (css, JavaScripts, etc) are uploaded before the rest of the site
-    _upload_dir_to_s3(build_dir, site_bucket_name, specific_subdirectory=get_static_dir())
 
-    # Upload the whole site now the updated static assets are in place
-    _upload_dir_to_s3(build_dir, site_bucket_name)
+def versioned_s3_deployer(app, s3_client, workers=16):
+    if not app.config["STATIC_SITE_DISTRIBUTION_ID"]:
+        raise DeployException("VERSIONED_DEPLOYS needs STATIC_SITE_DISTRIBUTION_ID to route requests to the live build")
+
+    return VersionedS3Deployer(
+        s3_client,
+        app.config["S3_STATIC_SITE_BUCKET"],
+        boto3.client("cloudfront"),
+        app.config["STATIC_SITE_DISTRIBUTION_ID"],
+        workers=workers,
+    )
+
+
+class S3Deployer:
+    """Deploys a build directory to the static site bucket, uploading only the files which have changed since the
+    previous deploy and deleting the objects for files which no longer exist.
+
+    A manifest of the path and content hash of every deployed file is stored in the bucket alongside the site, so each
+    deploy only has to compare it with the new build rather than listing and checking every object in the bucket."""
+
+    def __init__(self, s3_client, bucket_name, workers=16):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.workers = workers
+
+    def deploy(self, build_dir, manifest=None, partial=False):
+        """`manifest` is the build's output manifest, if it has already been generated. A `partial` build only contains
+        some of the site's files, so nothing is deleted and the files it doesn't contain are left as they are."""
+        previous_manifest = self._load_previous_manifest()
+        manifest = self._deployed_hashes(build_dir, manifest)
+
+        changed_paths = [path for path, file_hash in manifest.items() if previous_manifest.get(path) != file_hash]
+        removed_paths = [] if partial else sorted(set(previous_manifest) - set(manifest))
+
+        # The bucket's manifest is updated after each batch of uploads, so that if the deploy fails part-way the next
+        # one doesn't upload the same files again
+        deployed_manifest = dict(previous_manifest)
+
+        # Ensure static assets (css, JavaScripts, etc) are uploaded before the rest of the site
+        static_prefix = f"{get_static_dir()}/"
+        static_paths = [path for path in changed_paths if path.startswith(static_prefix)]
+        other_paths = [path for path in changed_paths if not path.startswith(static_prefix)]
+
+        for paths in (static_paths, other_paths):
+            for start in range(0, len(paths), DEPLOY_CHECKPOINT_BATCH_SIZE):
+                batch = paths[start : start + DEPLOY_CHECKPOINT_BATCH_SIZE]
+                self._upload(build_dir, batch)
+                deployed_manifest.update((path, manifest[path]) for path in batch)
+                self._put_manifest(deployed_manifest)
+
+        # Nothing that's been uploaded links to the removed objects any more, so they can now go
+        self._delete(removed_paths)
+        for path in removed_paths:
+            del deployed_manifest[path]
+
+        self._put_manifest(deployed_manifest)
+
+        print(f"Deployed {len(changed_paths)} changed files and deleted {len(removed_paths)} removed files")
+
+    @staticmethod
+    def _deployed_hashes(build_dir, manifest=None):
+        return {
+            # Files which are served compressed are hashed differently, so they're re-uploaded if that changes
+            path: f"{entry['hash']}+gzip" if compressed_variant(build_dir, path) else entry["hash"]
+            for path, entry in (manifest or build_output_manifest(build_dir)).items()
+        }
+
+    def _put_manifest(self, manifest, key=DEPLOY_MANIFEST_KEY):
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=json.dumps(manifest, sort_keys=True).encode("utf-8"),
+            ContentType="application/json",
+            CacheControl="no-cache",
+        )
+
+    def _load_previous_manifest(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=DEPLOY_MANIFEST_KEY)
+            return json.loads(response["Body"].read())
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                raise
+
+        # The first deploy to a bucket has nothing to compare against, so every object is treated as changed, and any
+        # object which isn't part of the new build is deleted.
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return {
+            obj["Key"]: None
+            for page in paginator.paginate(Bucket=self.bucket_name)
+            for obj in page.get("Contents", [])
+            if obj["Key"] != DEPLOY_MANIFEST_KEY
+        }
+
+    def _upload(self, build_dir, paths, prefix=""):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for _ in executor.map(lambda path: self._upload_file(build_dir, path, prefix), paths):
+                # Iterating over the map consumes the results, re-raising the first error from any upload
+                pass
+
+    def _upload_file(self, build_dir, path, prefix=""):
+        extra_args = _object_headers(path)
+        filename = compressed_variant(build_dir, path)
+        if filename:
+            extra_args["ContentEncoding"] = "gzip"
+        else:
+            filename = os.path.join(build_dir, path)
+
+        self.s3_client.upload_file(
+            Filename=filename, Bucket=self.bucket_name, Key=f"{prefix}{path}", ExtraArgs=extra_args
+        )
+
+    def _delete(self, paths):
+        for start in range(0, len(paths), DELETE_OBJECTS_BATCH_SIZE):
+            batch = paths[start : start + DELETE_OBJECTS_BATCH_SIZE]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name, Delete={"Objects": [{"Key": path} for path in batch], "Quiet": True}
+            )
+            if response.get("Errors"):
+                raise DeployException(f"Could not delete {len(response['Errors'])} objects: {response['Errors'][:5]}")
+
+
+class VersionedS3Deployer(S3Deployer):
+    """Deploys each build under its own immutable `builds/<build id>/` prefix in the static site bucket, and then makes
+    it live by pointing the origin path of the CloudFront distribution which serves the site at the build's prefix. A
+    pointer object in the bucket records the live build and the builds which can be rolled back to. Each edge location
+    serves either the old build or the new one, never a mix of the two, a deploy which fails part-way leaves the
+    previous build live, and rolling back is just pointing back at an earlier build.
+
+    Files which haven't changed since the live build are copied from its prefix within S3 rather than re-uploaded."""
+
+    def __init__(
+        self, s3_client, bucket_name, cloudfront_client, distribution_id, workers=16, builds_kept=VERSIONED_BUILDS_KEPT
+    ):
+        super().__init__(s3_client, bucket_name, workers=workers)
+        self.cloudfront_client = cloudfront_client
+        self.distribution_id = distribution_id
+        self.builds_kept = builds_kept
+
+    def deploy(self, build_dir, build_id, manifest=None, partial=False):
+        """A `partial` build only contains some of the site's files, so the rest are copied from the live build."""
+        live_build = self.live_build()
+        live_prefix = live_build["prefix"] if live_build else None
+        live_manifest = self._load_build_manifest(live_prefix) if live_build else {}
+
+        prefix = build_prefix(build_id)
+        manifest = self._deployed_hashes(build_dir, manifest)
+        if partial:
+            manifest = {**live_manifest, **manifest}
+
+        unchanged_paths = [path for path, file_hash in manifest.items() if live_manifest.get(path) == file_hash]
+        changed_paths = [path for path, file_hash in manifest.items() if live_manifest.get(path) != file_hash]
+
+        self._copy(live_prefix, prefix, unchanged_paths)
+        self._upload(build_dir, changed_paths, prefix=prefix)
+        self._put_manifest(manifest, key=f"{prefix}{DEPLOY_MANIFEST_KEY}")
+
+        self.switch_to(build_id)
+
+        print(
+            f"Deployed build {build_id}: uploaded {len(changed_paths)} changed files "
+            f"and copied {len(unchanged_paths)} unchanged files"
+        )
+
+    def live_build(self):
+        """The pointer to the live build, or None if nothing has been deployed this way yet."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=LIVE_BUILD_POINTER_KEY)
+            return json.loads(response["Body"].read())
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                raise
+            return None
+
+    def switch_to(self, build_id):
+        """Make a completely deployed build live, e.g. to roll back to an earlier build. Builds beyond the most recent
+        `builds_kept` are deleted once every edge location has switched over, and the next switch can't start before
+        then either, so a fast second deploy can't race the first."""
+        prefix = build_prefix(build_id)
+        if self._load_build_manifest(prefix) is None:
+            raise DeployException(f"Build {build_id} has not been completely deployed, so cannot be made live")
+
+        self._route_requests_to(prefix)
+
+        live_build = self.live_build()
+        previous_build_ids = [str(build_id)] + [
+            previous_build_id
+            for previous_build_id in (live_build["build_ids"] if live_build else [])
+            if previous_build_id != str(build_id)
+        ]
+
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=LIVE_BUILD_POINTER_KEY,
+            Body=json.dumps(
+                {"build_id": str(build_id), "prefix": prefix, "build_ids": previous_build_ids[: self.builds_kept]}
+            ).encode("utf-8"),
+            ContentType="application/json",
+            CacheControl="no-cache",
+        )
+
+        # Only removed once the pointer has moved on, so a build is never deleted while it could still be live
+        for old_build_id in previous_build_ids[self.builds_kept :]:
+            self._delete(self._keys_with_prefix(build_prefix(old_build_id)))
+
+    def _route_requests_to(self, prefix):
+        """Point the distribution's origin for the static site bucket at `prefix`, and wait until the change has been
+        deployed to every edge location. Until then, edge locations which haven't switched over yet still serve the
+        previous build. Pages already cached from the previous build are served until they expire."""
+        for attempt in range(1, ROUTE_REQUESTS_ATTEMPTS + 1):
+            response = self.cloudfront_client.get_distribution_config(Id=self.distribution_id)
+            distribution_config = response["DistributionConfig"]
+
+            # The origin is the bucket's website endpoint, e.g. <bucket>.s3-website.eu-west-2.amazonaws.com
+            origins = [
+                origin
+                for origin in distribution_config["Origins"]["Items"]
+                if origin["DomainName"].startswith(f"{self.bucket_name}.")
+            ]
+            if not origins:
+                raise DeployException(
+                    f"Distribution {self.distribution_id} has no origin for bucket {self.bucket_name}"
+                )
+
+            for origin in origins:
+                origin["OriginPath"] = f"/{prefix.rstrip('/')}"
+
+            try:
+                self.cloudfront_client.update_distribution(
+                    Id=self.distribution_id, IfMatch=response["ETag"], DistributionConfig=distribution_config
+                )
+                break
+            except ClientError as e:
+                # The distribution was changed since its config was read, so read it again and reapply the change
+                if e.response["Error"]["Code"] != "PreconditionFailed" or attempt == ROUTE_REQUESTS_ATTEMPTS:
+                    raise
+
+        self.cloudfront_client.get_waiter("distribution_deployed").wait(Id=self.distribution_id)
+
+    def _load_build_manifest(self, prefix):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=f"{prefix}{DEPLOY_MANIFEST_KEY}")
+            return json.loads(response["Body"].read())
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                raise
+            return None
+
+    def _copy(self, from_prefix, to_prefix, paths):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for _ in executor.map(lambda path: self._copy_object(f"{from_prefix}{path}", f"{to_prefix}{path}"), paths):
+                # Iterating over the map consumes the results, re-raising the first error from any copy
+                pass
+
+    def _copy_object(self, from_key, to_key):
+        # Copied within S3 along with the object's headers, so nothing is downloaded or re-uploaded
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            Key=to_key,
+            CopySource={"Bucket": self.bucket_name, "Key": from_key},
+            MetadataDirective="COPY",
+        )
+
+    def _keys_with_prefix(self, prefix):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
 
 
-def _upload_dir_to_s3(source_dir, site_bucket_name, specific_subdirectory=None):
-    target_dir_local = os.path.join(source_dir, specific_subdirectory) if specific_subdirectory else source_dir
-    target_dir_s3 = f'{specific_subdirectory}/' if specific_subdirectory else ''
+def build_prefix(build_id):
+    return f"{BUILDS_PREFIX}{build_id}/"
 
-    subprocess.run(f'aws s3 sync --delete --only-show-errors "{target_dir_local}/" "s3://{site_bucket_name}/{target_dir_s3}"', shell=True)
+
+def _object_headers(path):
+    content_type = mimetypes.guess_type(path, strict=False)[0]
+    if content_type is None and path.endswith(".map"):
+        # .map files are sourcemaps which tell browsers how minified CSS and JS relates back to source files
+        content_type = "application/json"
+
+    if _is_versioned_asset(path):
+        max_age = YEAR_IN_SECONDS
+    elif _measure_related(path):
+        max_age = FIFTEEN_MINUTES_IN_SECONDS
+    else:
+        max_age = HOUR_IN_SECONDS
+
+    return {"ContentType": content_type or "binary/octet-stream", "CacheControl": f"max-age={max_age}"}
 
 
 def _delete_files_not_needed_for_deploy(build_dir):
@@ -141,14 +502,20 @@ def _delete_files_not_needed_for_deploy(build_dir):
 
 def _start_build(app, build, session):
     build_exception = None
+    telemetry = BuildTelemetry(on_phase_started=lambda phase: _record_build_progress(build, phase))
     try:
-        print("DEBUG _start_build(): Refreshing materialized views...")
-        from manage import refresh_materialized_views
-
-        refresh_materialized_views()
-        print("DEBUG _start_build(): Doing it...")
-        do_it(app, build)
-        print("DEBUG _start_build(): Done it!")
+        with telemetry.active():
+            print("DEBUG _start_build(): Refreshing materialized views...")
+            from manage import refresh_materialized_views
+
+            with telemetry.phase("refresh_materialized_views"):
+                refresh_materialized_views()
+            print("DEBUG _start_build(): Doing it...")
+            if build.measure is not None and build.measure.has_published_version:
+                do_partial_build(app, build, build.measure)
+            else:
+                do_it(app, build)
+            print("DEBUG _start_build(): Done it!")
 
         build.status = BuildStatus.DONE
         build.succeeded_at = datetime.utcnow()
@@ -165,6 +532,7 @@ def _start_build(app, build, session):
     finally:
         print("DEBUG _start_build(): Adding build to session...")
 
+        build.telemetry = telemetry.summary()
         session.add(build)
         if build_exception:
             raise BuildException(build_exception)
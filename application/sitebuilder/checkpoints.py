@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+
+from application import db
+
+CHECKPOINT_FILE_NAME = ".build-checkpoint.json"
+
+
+class BuildCheckpoint:
+    """Records each unit of a build (a topic and its measure pages, a group of dashboards, the static pages) as it is
+    completed, so that if the build fails or is killed part-way, the next build can resume in the same build directory
+    rather than starting again from nothing.
+
+    The checkpoint is only used if the source data fingerprint it was recorded with matches the new build's, i.e. if
+    nothing that is rendered into the site has changed in the meantime. It is removed once the build has succeeded."""
+
+    def __init__(self, build_dir, source_fingerprint, fingerprints=None, output_sources=None):
+        self.build_dir = build_dir
+        self.source_fingerprint = source_fingerprint
+        self.fingerprints = fingerprints
+        self.output_sources = output_sources
+        self.completed = set()
+
+    @classmethod
+    def load(cls, build_dir, source_fingerprint, fingerprints=None, output_sources=None):
+        """Load the checkpoint left in `build_dir` by a previous attempt, if it is for the same source data, restoring
+        the incremental build fingerprints and output sources recorded for the units it completed."""
+        checkpoint = cls(build_dir, source_fingerprint, fingerprints=fingerprints, output_sources=output_sources)
+        saved = read_checkpoint(build_dir)
+        if saved is None or saved.get("source_fingerprint") != source_fingerprint:
+            return checkpoint
+
+        checkpoint.completed = set(saved["completed"])
+        if fingerprints is not None:
+            fingerprints.current.update(saved.get("fingerprints") or {})
+        if output_sources is not None:
+            output_sources.sources.update(saved.get("output_sources") or {})
+
+        print(f"Resuming build from checkpoint with {len(checkpoint.completed)} units already completed")
+        return checkpoint
+
+    def is_complete(self, unit):
+        return unit in self.completed
+
+    def has_completed_any(self, prefix):
+        return any(unit.startswith(prefix) for unit in self.completed)
+
+    def complete(self, *units):
+        self.completed.update(units)
+        self.save()
+
+    def save(self):
+        checkpoint = {
+            "source_fingerprint": self.source_fingerprint,
+            "completed": sorted(self.completed),
+            "fingerprints": self.fingerprints.current if self.fingerprints is not None else None,
+            "output_sources": self.output_sources.sources if self.output_sources is not None else None,
+        }
+
+        # Written to a temporary file and renamed, so a build killed mid-write never leaves a truncated checkpoint
+        path = os.path.join(self.build_dir, CHECKPOINT_FILE_NAME)
+        with open(f"{path}.tmp", "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+
+    def clear(self):
+        path = os.path.join(self.build_dir, CHECKPOINT_FILE_NAME)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def read_checkpoint(build_dir):
+    try:
+        with open(os.path.join(build_dir, CHECKPOINT_FILE_NAME)) as checkpoint_file:
+            return json.load(checkpoint_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def can_resume(build_dir, source_fingerprint):
+    saved = read_checkpoint(build_dir)
+    return saved is not None and saved.get("source_fingerprint") == source_fingerprint
+
+
+def run_unit(checkpoint, unit, write):
+    """Call `write` to write a unit of the build, unless a previous attempt already completed it."""
+    if checkpoint is not None and checkpoint.is_complete(unit):
+        print(f"Skipping {unit}: completed by a previous attempt at this build")
+        return
+
+    write()
+
+    if checkpoint is not None:
+        checkpoint.complete(unit)
+
+
+def source_data_fingerprint(templates_hash):
+    """A hash of the templates and of the log of changes to the tables the site is built from, so any change to the
+    data the site is built from gives a different fingerprint.
+
+    Triggers on each of those tables add a row to `source_data_change` for each transaction which writes to it, and rows
+    are only removed by `prune_source_data_changes` once a build has succeeded. The log is transactional, so a committed
+    change always adds a row and a rolled back one never does. The number of rows changes with every committed change,
+    and the highest id tells apart the same number of rows before and after the log was pruned."""
+    change_count, last_change_id = db.session.execute(
+        "SELECT count(*), coalesce(max(id), 0) FROM source_data_change"
+    ).fetchone()
+
+    return hashlib.sha256(
+        json.dumps({"templates": templates_hash, "changes": [change_count, last_change_id]}).encode("utf-8")
+    ).hexdigest()
+
+
+def prune_source_data_changes():
+    """Remove the logged changes once there is no checkpoint left whose fingerprint depends on them, except the most
+    recent, whose id keeps the fingerprint of the pruned log from matching an older one.
+
+    Pruned in a transaction of its own, so that nothing else the build's session holds is committed with it."""
+    with db.engine.begin() as connection:
+        connection.execute("DELETE FROM source_data_change WHERE id < (SELECT max(id) FROM source_data_change)")
+
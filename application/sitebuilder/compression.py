@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Compressed variants are written to a separate tree in the build directory, which is never deployed as-is
+COMPRESSED_DIR_NAME = ".compressed"
+COMPRESSED_HASHES_FILE_NAME = ".hashes.json"
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".csv", ".css", ".js", ".json", ".map", ".svg", ".txt", ".xml"}
+
+
+def compressed_variant(build_dir, path):
+    """Returns the path of the gzipped variant of the build output at `path`, or None if it doesn't have one."""
+    compressed_path = os.path.join(build_dir, COMPRESSED_DIR_NAME, f"{path}.gz")
+    return compressed_path if os.path.isfile(compressed_path) else None
+
+
+def compress_build_outputs(build_dir, manifest, workers=None):
+    """Write a gzipped variant of every text file in the build manifest, skipping any whose content hash hasn't changed
+    since its variant was written by a previous build in the same directory. Variants which are no larger than the
+    original are not kept."""
+    compressed_dir = os.path.join(build_dir, COMPRESSED_DIR_NAME)
+    hashes_path = os.path.join(compressed_dir, COMPRESSED_HASHES_FILE_NAME)
+    try:
+        with open(hashes_path) as hashes_file:
+            previous_hashes = json.load(hashes_file)
+    except (FileNotFoundError, ValueError):
+        previous_hashes = {}
+
+    compressible = {
+        path: entry["hash"]
+        for path, entry in manifest.items()
+        if os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+    }
+
+    for path in set(previous_hashes) - set(compressible):
+        _remove_compressed_variant(compressed_dir, path)
+
+    to_compress = [path for path, file_hash in compressible.items() if previous_hashes.get(path) != file_hash]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(lambda path: _compress(build_dir, compressed_dir, path), to_compress):
+            # Iterating over the map consumes the results, re-raising the first error from any file
+            pass
+
+    os.makedirs(compressed_dir, exist_ok=True)
+    with open(hashes_path, "w") as hashes_file:
+        json.dump(compressible, hashes_file, sort_keys=True)
+
+    print(f"Compressed {len(to_compress)} of {len(compressible)} text files")
+
+
+def _compress(build_dir, compressed_dir, path):
+    with open(os.path.join(build_dir, path), "rb") as original_file:
+        content = original_file.read()
+
+    # A fixed mtime means identical content always compresses to identical bytes
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+    if len(compressed) >= len(content):
+        _remove_compressed_variant(compressed_dir, path)
+        return
+
+    compressed_path = os.path.join(compressed_dir, f"{path}.gz")
+    os.makedirs(os.path.dirname(compressed_path), exist_ok=True)
+    with open(compressed_path, "wb") as compressed_file:
+        compressed_file.write(compressed)
+
+
+def _remove_compressed_variant(compressed_dir, path):
+    compressed_path = os.path.join(compressed_dir, f"{path}.gz")
+    if os.path.isfile(compressed_path):
+        os.remove(compressed_path)
+
+
+def remove_compressed_outputs(build_dir):
+    compressed_dir = os.path.join(build_dir, COMPRESSED_DIR_NAME)
+    if os.path.isdir(compressed_dir):
+        shutil.rmtree(compressed_dir)
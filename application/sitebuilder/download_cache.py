@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+import time
+
+from application.cms.upload_service import MEASURE_DOWNLOAD_PREFIX, upload_service
+from application.utils import get_csv_data_for_download
+
+# Temporary downloads older than this can't belong to a build that's still running
+LEAKED_DOWNLOAD_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class DownloadCache:
+    """A cache of upload downloads, as written to the static site, which persists between builds.
+
+    Entries are keyed on the upload's path in the file store and the identifier of its current content (the S3 ETag
+    and version), so an upload is only downloaded and converted to windows-1252 again if it has been replaced. Each
+    entry's mtime is updated whenever it is used, and `evict` removes the least recently used entries once the cache
+    grows past `max_bytes`."""
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["BUILD_DOWNLOAD_CACHE_DIR"], config["BUILD_DOWNLOAD_CACHE_MAX_BYTES"])
+
+    def get_download(self, upload):
+        """Returns the path of a cached file containing the download for `upload`, fetching it first if needed."""
+        source_path, content_version = upload_service.get_measure_download_version(upload, upload.file_name, "source")
+        key = hashlib.sha256(f"{source_path}\0{content_version}".encode("utf-8")).hexdigest()
+        cached_path = os.path.join(self.cache_dir, key[:2], key)
+
+        try:
+            os.utime(cached_path)
+            return cached_path
+        except FileNotFoundError:
+            pass
+
+        filename = upload_service.get_measure_download(upload, upload.file_name, "source")
+        try:
+            content = get_csv_data_for_download(filename).encode("windows-1252")
+        finally:
+            os.remove(filename)
+
+        # Write to a temporary file first, as other build workers may be reading or writing the same entry
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(cached_path), delete=False) as cached_file:
+            cached_file.write(content)
+        os.replace(cached_file.name, cached_path)
+
+        return cached_path
+
+    def evict(self):
+        entries = []
+        for root, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            os.remove(path)
+            total_size -= size
+
+
+def remove_leaked_downloads(max_age_seconds=LEAKED_DOWNLOAD_MAX_AGE_SECONDS):
+    """Remove temporary files from `upload_service.get_measure_download` which were never cleaned up, e.g. because
+    the process writing them was killed."""
+    temp_dir = tempfile.gettempdir()
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(temp_dir):
+        if not name.startswith(MEASURE_DOWNLOAD_PREFIX):
+            continue
+        path = os.path.join(temp_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,2 +1,6 @@
 class StalledBuildException(Exception):
     pass
+
+
+class DeployException(Exception):
+    pass
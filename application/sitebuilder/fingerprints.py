@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import shutil
+
+from sqlalchemy import inspect
+
+FINGERPRINTS_FILE_NAME = ".build-fingerprints.json"
+
+
+class BuildFingerprints:
+    """Tracks a fingerprint for each unit of output written by the static site build, so that an incremental build can
+    skip re-rendering any unit whose inputs have not changed since the previous successful build.
+
+    Units are identified by the path of their output directory, relative to the build directory."""
+
+    def __init__(self, previous=None, templates_hash=None):
+        self.previous = previous or {}
+        self.current = {}
+        self.templates_hash = templates_hash
+
+    @classmethod
+    def load(cls, build_dir, templates_hash=None):
+        try:
+            with open(os.path.join(build_dir, FINGERPRINTS_FILE_NAME)) as fingerprints_file:
+                return cls(previous=json.load(fingerprints_file), templates_hash=templates_hash)
+        except (FileNotFoundError, ValueError):
+            return cls(templates_hash=templates_hash)
+
+    def save(self, build_dir):
+        with open(os.path.join(build_dir, FINGERPRINTS_FILE_NAME), "w") as fingerprints_file:
+            json.dump(self.current, fingerprints_file, sort_keys=True)
+
+    def is_unchanged(self, build_dir, unit, fingerprint):
+        return self.previous.get(unit) == fingerprint and os.path.isdir(os.path.join(build_dir, unit))
+
+    def record(self, unit, fingerprint):
+        self.current[unit] = fingerprint
+
+    def stale_units(self):
+        return set(self.previous) - set(self.current)
+
+    def remove_stale_units(self, build_dir):
+        """Delete the output of any unit written by the previous build which was not written by this one, e.g. the
+        pages for a measure which has since been unpublished or moved."""
+        for unit in self.stale_units():
+            path = os.path.join(build_dir, unit)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+
+def _hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _column_values(model):
+    if model is None:
+        return None
+    return {attr.key: getattr(model, attr.key) for attr in inspect(model).mapper.column_attrs}
+
+
+def templates_fingerprint(template_folder, build_info=None):
+    """A single hash covering every template (and the build info shown in the footer), so that a change to any of
+    them causes every page to be re-rendered."""
+    digest = hashlib.sha256(json.dumps(build_info, sort_keys=True, default=str).encode("utf-8"))
+    for root, dirs, files in sorted(os.walk(template_folder)):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, template_folder).encode("utf-8"))
+            with open(path, "rb") as template_file:
+                digest.update(template_file.read())
+    return digest.hexdigest()
+
+
+def measure_version_fingerprint(measure, measure_version, templates_hash, latest_url, local_build):
+    """Everything that is rendered into a measure version page or its downloads: the version itself, its dimensions and
+    uploads, its data sources, its sibling versions (which are listed on the page) and the measure's place in the
+    topic hierarchy."""
+    replaced_by = measure.replaced_by_measure
+    return _hash(
+        {
+            "templates": templates_hash,
+            "latest_url": latest_url,
+            "local_build": local_build,
+            "measure": _column_values(measure),
+            "subtopic": _column_values(measure.subtopic),
+            "topic": _column_values(measure.subtopic.topic),
+            "replaced_by": (
+                [replaced_by.subtopic.topic.slug, replaced_by.subtopic.slug, replaced_by.slug]
+                + [replaced_by.latest_published_version.title if replaced_by.latest_published_version else None]
+                if replaced_by
+                else None
+            ),
+            "replaces": [replaced.id for replaced in measure.replaces_measures],
+            "versions": [
+                [
+                    version.id,
+                    version.version,
+                    version.status,
+                    version.published_at,
+                    version.db_version_id,
+                    version.latest,
+                    version.update_corrects_data_mistake,
+                    version.update_corrects_measure_version,
+                ]
+                for version in measure.versions
+            ],
+            "measure_version": _column_values(measure_version),
+            "dimensions": [[dimension.guid, dimension.updated_at] for dimension in measure_version.ordered_dimensions],
+            "uploads": [[upload.guid, upload.file_name, upload.size] for upload in measure_version.uploads],
+            "data_sources": [
+                [
+                    _column_values(data_source),
+                    _column_values(data_source.publisher),
+                    _column_values(data_source.type_of_statistic),
+                    _column_values(data_source.frequency_of_release),
+                ]
+                for data_source in measure_version.data_sources
+            ],
+        }
+    )
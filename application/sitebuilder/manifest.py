@@ -0,0 +1,76 @@
+import hashlib
+import os
+
+from application.sitebuilder.checkpoints import CHECKPOINT_FILE_NAME
+from application.sitebuilder.compression import COMPRESSED_DIR_NAME
+from application.sitebuilder.fingerprints import FINGERPRINTS_FILE_NAME
+
+# Files which are left in the build directory but never deployed
+NOT_DEPLOYED_FILE_NAMES = [
+    FINGERPRINTS_FILE_NAME,
+    CHECKPOINT_FILE_NAME,
+    COMPRESSED_DIR_NAME,
+    ".git",
+    ".gitignore",
+    "README.md",
+]
+
+
+class OutputSources:
+    """Records which entity (measure version, dimension, upload, dashboard, ...) each part of a build's output was
+    generated from. Sources can be registered for individual files or for whole directories, and a file takes the
+    source of its nearest registered ancestor."""
+
+    def __init__(self):
+        self.sources = {}
+
+    def register(self, build_dir, path, **source):
+        self.sources[os.path.relpath(path, build_dir).replace(os.sep, "/")] = source
+
+    def source_for(self, relative_path):
+        path = relative_path
+        while path:
+            if path in self.sources:
+                return self.sources[path]
+            path = path.rpartition("/")[0]
+        return None
+
+
+def build_output_manifest(build_dir, sources=None):
+    """Map the path of every file in the build, relative to `build_dir`, to its content hash, size in bytes and the
+    entity it was generated from."""
+    manifest = {}
+    for root, dirs, files in os.walk(build_dir):
+        if root == build_dir:
+            dirs[:] = [name for name in dirs if name not in NOT_DEPLOYED_FILE_NAMES]
+            files = [name for name in files if name not in NOT_DEPLOYED_FILE_NAMES]
+
+        for name in files:
+            full_path = os.path.join(root, name)
+            relative_path = os.path.relpath(full_path, build_dir).replace(os.sep, "/")
+            with open(full_path, "rb") as output_file:
+                content = output_file.read()
+
+            manifest[relative_path] = {
+                "hash": hashlib.sha256(content).hexdigest(),
+                "size": len(content),
+                "source": sources.source_for(relative_path) if sources else None,
+            }
+
+    return manifest
+
+
+def diff_manifests(old_manifest, new_manifest):
+    """Returns the paths which were added, removed and changed between two build manifests."""
+    old_manifest = old_manifest or {}
+    new_manifest = new_manifest or {}
+
+    return {
+        "added": sorted(set(new_manifest) - set(old_manifest)),
+        "removed": sorted(set(old_manifest) - set(new_manifest)),
+        "changed": sorted(
+            path
+            for path in set(old_manifest) & set(new_manifest)
+            if old_manifest[path]["hash"] != new_manifest[path]["hash"]
+        ),
+    }
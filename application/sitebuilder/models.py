@@ -2,7 +2,7 @@ from datetime import datetime
 import enum
 
 from sqlalchemy import PrimaryKeyConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSON, UUID
 from application import db
 
 
@@ -25,3 +25,20 @@ class Build(db.Model):
     succeeded_at = db.Column(db.DateTime, nullable=True)
     failure_reason = db.Column(db.String, nullable=True)
     failed_at = db.Column(db.DateTime, nullable=True)
+
+    # Set for a partial build of just the pages affected by publishing this measure
+    measure_id = db.Column(db.Integer, db.ForeignKey("measure.id", ondelete="SET NULL"), nullable=True)
+    measure = db.relationship("Measure")
+
+    # The phase the build is in while it's running
+    progress = db.Column(db.String, nullable=True)
+
+    # Every file written by the build, mapped to its content hash, size and the entity it was generated from. Deferred,
+    # as it can be several megabytes and is not needed to list builds.
+    manifest = db.deferred(db.Column(JSON, nullable=True))
+
+    # Wall time, database queries and bytes written for each phase of the build, and for its slowest pages
+    telemetry = db.deferred(db.Column(JSON, nullable=True))
+
+    # The build's total duration, read from its telemetry without loading the rest of it
+    telemetry_seconds = db.column_property(telemetry.columns[0][("totals", "seconds")].astext.cast(db.Float))
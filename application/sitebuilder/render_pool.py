@@ -0,0 +1,86 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from application.sitebuilder.telemetry import record_page
+
+# Set in each worker process by `_initialise_worker`
+_worker_application = None
+
+
+def _initialise_worker(config):
+    """Workers are started with the 'spawn' method rather than forked, so that they never share the parent's database
+    connections. Each one creates its own app from a copy of the parent app's config."""
+    global _worker_application
+
+    from application.factory import create_app
+
+    _worker_application = create_app(type("BuildWorkerConfig", (object,), config))
+
+
+def _worker_config(config):
+    """The settings in `config` which can be sent to a worker process. Extensions add some which can't be pickled, such
+    as functions, but they add them again when the worker's app is created."""
+    worker_config = {}
+    for key, value in config.items():
+        try:
+            pickle.dumps(value)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            continue
+        worker_config[key] = value
+    return worker_config
+
+
+def _render_measure_version(measure_version_id, slug, latest_slug, local_build, page_path):
+    from application import db
+    from application.cms.page_service import page_service
+    from application.sitebuilder.build import load_build_info, write_measure_version
+    from application.sitebuilder.telemetry import BuildTelemetry
+
+    telemetry = BuildTelemetry()
+    # Templates read the request, so pages are rendered in a request context, as manage.py commands are
+    with _worker_application.test_request_context(), telemetry.active(), telemetry.page(page_path):
+        load_build_info()
+
+        # Workers only ever read from the database
+        db.session.execute("SET TRANSACTION READ ONLY")
+        try:
+            measure_version = page_service.get_measure_version_for_build(measure_version_id)
+            write_measure_version(
+                measure_version.measure, measure_version, slug, latest_slug=latest_slug, local_build=local_build
+            )
+        finally:
+            db.session.rollback()
+
+    # Returned to the parent process to be added to the build's telemetry
+    return telemetry.pages[0]
+
+
+class MeasureVersionRenderPool:
+    """Renders measure version pages, dimension CSVs and downloads in a pool of worker processes, so that the
+    CPU-bound template rendering can use every core on the build host."""
+
+    def __init__(self, application, workers):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialise_worker,
+            initargs=(_worker_config(application.config),),
+        )
+        self.futures = []
+
+    def submit(self, measure_version, slug, latest_slug=None, local_build=False, page_path=None):
+        self.futures.append(
+            self.executor.submit(
+                _render_measure_version, measure_version.id, slug, latest_slug, local_build, page_path or slug
+            )
+        )
+
+    def wait(self):
+        """Block until every submitted page has been rendered, re-raising the first error from any worker."""
+        try:
+            for future in as_completed(self.futures):
+                record_page(future.result())
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.futures = []
@@ -0,0 +1,124 @@
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOWEST_PAGES_COUNT = 20
+
+# The telemetry for the build running in this process, if any. Build worker processes each have their own.
+_active_telemetry = None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_telemetry is not None:
+        conn.info.setdefault("build_telemetry_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_starts = conn.info.get("build_telemetry_query_start")
+    if _active_telemetry is not None and query_starts:
+        _active_telemetry.queries += 1
+        _active_telemetry.query_seconds += time.perf_counter() - query_starts.pop()
+
+
+def record_page(page):
+    """Add a page recorded by the telemetry in another process, e.g. a build worker, to the active telemetry."""
+    if _active_telemetry is not None:
+        _active_telemetry.add_page(page)
+
+
+def record_bytes_written(file_path):
+    if _active_telemetry is not None:
+        _active_telemetry.bytes_written += os.path.getsize(file_path)
+
+
+class BuildTelemetry:
+    """Records the wall time, number and duration of database queries, and bytes written by each phase of a site build
+    and for each page rendered, so that regressions in build duration can be traced to their cause."""
+
+    def __init__(self, on_phase_started=None):
+        self.on_phase_started = on_phase_started
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.bytes_written = 0
+        self.phases = []
+        self.pages = []
+        self._started = self._snapshot()
+
+    @contextmanager
+    def active(self):
+        global _active_telemetry
+
+        previous_telemetry, _active_telemetry = _active_telemetry, self
+        try:
+            yield self
+        finally:
+            _active_telemetry = previous_telemetry
+
+    @contextmanager
+    def phase(self, name):
+        if self.on_phase_started is not None:
+            self.on_phase_started(name)
+        started = self._snapshot()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, **self._measure_since(started)})
+
+    @contextmanager
+    def page(self, path):
+        started = self._snapshot()
+        try:
+            yield
+        finally:
+            self.pages.append({"path": path, **self._measure_since(started)})
+
+    def add_page(self, page):
+        self.pages.append(page)
+        self.queries += page["queries"]
+        self.query_seconds += page["query_seconds"]
+        self.bytes_written += page["bytes_written"]
+
+    def summary(self, slowest_pages_count=SLOWEST_PAGES_COUNT):
+        return {
+            "totals": self._measure_since(self._started),
+            "phases": self.phases,
+            "page_count": len(self.pages),
+            "slowest_pages": sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:slowest_pages_count],
+        }
+
+    def _snapshot(self):
+        return time.perf_counter(), self.queries, self.query_seconds, self.bytes_written
+
+    def _measure_since(self, snapshot):
+        started_at, queries, query_seconds, bytes_written = snapshot
+        return {
+            "seconds": round(time.perf_counter() - started_at, 3),
+            "queries": self.queries - queries,
+            "query_seconds": round(self.query_seconds - query_seconds, 3),
+            "bytes_written": self.bytes_written - bytes_written,
+        }
+
+
+@contextmanager
+def telemetry_page(path):
+    """Record a page with the active telemetry, if there is any."""
+    if _active_telemetry is None:
+        yield
+    else:
+        with _active_telemetry.page(path):
+            yield
+
+
+@contextmanager
+def telemetry_phase(name):
+    """Record a phase with the active telemetry, if there is any."""
+    if _active_telemetry is None:
+        yield
+    else:
+        with _active_telemetry.phase(name):
+            yield
@@ -3,6 +3,7 @@ import bleach
 import json
 import jinja2
 import html
+import os
 
 from flask import Markup
 from hurry.filesize import size, alternative
@@ -109,13 +110,30 @@ def version_filter(context, file_name):
     manifest_path = "%s/rev-manifest.json" % asset_directory
 
     try:
-        with open(manifest_path) as m:
-            manifest = json.load(m)
-            return manifest.get(file_name, file_name)
+        return load_rev_manifest(manifest_path).get(file_name, file_name)
     except Exception:
         return file_name
 
 
+# Parsed rev-manifest.json files and the mtime they were loaded at, keyed on path
+_rev_manifests = {}
+
+
+def load_rev_manifest(manifest_path):
+    """Returns the contents of a rev-manifest.json file. This is called for every asset on every page, so the file is
+    only re-read when it has been modified since it was last loaded."""
+    mtime = os.stat(manifest_path).st_mtime_ns
+    cached = _rev_manifests.get(manifest_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(manifest_path) as m:
+        manifest = json.load(m)
+
+    _rev_manifests[manifest_path] = (mtime, manifest)
+    return manifest
+
+
 def strip_trailing_slash(string):
     if string and string[-1] == "/":
         return string[0:-1]
@@ -15,7 +15,7 @@ from flask_mail import Message
 from itsdangerous import SignatureExpired, TimestampSigner, URLSafeTimedSerializer
 from slugify import slugify
 
-from application import mail
+from application import db, mail
 
 
 def setup_module_logging(logger, level):
@@ -276,5 +276,14 @@ class TimedExecution:
         return execution_time
 
 
+def source_data_last_changed():
+    """The id and time of the most recently logged change to the source data, or (0, None) if none has been logged.
+    Pruning keeps the most recent change, so the id only ever increases."""
+    last_change_id, last_changed_at = db.session.execute(
+        "SELECT id, changed_at FROM source_data_change ORDER BY id DESC LIMIT 1"
+    ).fetchone() or (0, None)
+    return last_change_id, last_changed_at
+
+
 def cleanup_filename(filename):
     return slugify(filename)
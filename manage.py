@@ -80,10 +80,25 @@ def create_local_user_account(email, user_type):
         print("email is not a gov.uk email address and has not been whitelisted")
 
 
-@manager.command
-def build_static_site():
+@manager.option("--measure", dest="measure", help="Only rebuild the pages for topic/subtopic/measure")
+def build_static_site(measure=None):
     if app.config["BUILD_SITE"]:
-        from application.sitebuilder.build_service import build_site
+        from application.sitebuilder.build_service import build_site, request_build
+
+        if measure:
+            from application.cms.exceptions import PageNotFoundException
+            from application.cms.page_service import page_service
+
+            slugs = measure.strip("/").split("/")
+            if len(slugs) != 3:
+                print("--measure must be given as topic_slug/subtopic_slug/measure_slug")
+                sys.exit(-1)
+
+            try:
+                request_build(measure=page_service.get_measure(*slugs))
+            except PageNotFoundException:
+                print(f"No measure found at {'/'.join(slugs)}")
+                sys.exit(-1)
 
         build_site(app)
     else:
@@ -102,6 +117,16 @@ def request_static_build():
         print("Build is disabled at the moment. Set BUILD_SITE to true to enable")
 
 
+@manager.command
+def run_build_worker():
+    if app.config["BUILD_SITE"]:
+        from application.sitebuilder.build_service import run_build_worker
+
+        run_build_worker(app)
+    else:
+        print("Build is disabled at the moment. Set BUILD_SITE to true to enable")
+
+
 @manager.command
 def clear_stalled_builds():
     from application.sitebuilder.build_service import clear_stalled_build
@@ -342,13 +367,23 @@ def report_stalled_build():
         print("No stalled builds")
 
 
-@manager.command
-def refresh_materialized_views():
-    from application.dashboard.view_sql import refresh_all_dashboard_helper_views
-
-    db.session.execute(refresh_all_dashboard_helper_views)
-    db.session.commit()
-    print("Refreshed data for MATERIALIZED VIEWS")
+@manager.option(
+    "--all",
+    dest="refresh_all",
+    action="store_true",
+    default=False,
+    help="Refresh every view, not only those whose source tables have changed",
+)
+def refresh_materialized_views(refresh_all=False):
+    from application.dashboard.view_refresh import refresh_dashboard_views
+
+    durations = refresh_dashboard_views(refresh_all=refresh_all)
+    if durations:
+        print("Refreshed data for MATERIALIZED VIEWS:")
+        for view_name, seconds in durations.items():
+            print(f"  {view_name} in {seconds}s")
+    else:
+        print("MATERIALIZED VIEWS are up to date")
 
 
 @manager.command
@@ -360,12 +395,14 @@ def drop_and_create_materialized_views():
         ethnic_groups_by_dimension_view,
         classifications_by_dimension,
     )
+    from application.dashboard.view_refresh import DASHBOARD_VIEWS, record_dashboard_views_refreshed
 
     db.session.execute(drop_all_dashboard_helper_views)
     db.session.execute(latest_published_measure_versions_view)
     db.session.execute(latest_published_measure_versions_by_geography_view)
     db.session.execute(ethnic_groups_by_dimension_view)
     db.session.execute(classifications_by_dimension)
+    record_dashboard_views_refreshed(list(DASHBOARD_VIEWS))
     db.session.commit()
     print("Drop and create MATERIALIZED VIEWS done")
 
@@ -384,6 +421,105 @@ def acknowledge_build_issue(build_id):
         print("No build found with id", build_id)
 
 
+@manager.option("--from_build_id", dest="from_build_id")
+@manager.option("--to_build_id", dest="to_build_id")
+def diff_builds(from_build_id, to_build_id):
+    from application.sitebuilder.manifest import diff_manifests
+
+    try:
+        from_build = db.session.query(Build).filter(Build.id == from_build_id).one()
+        to_build = db.session.query(Build).filter(Build.id == to_build_id).one()
+    except NoResultFound:
+        print("No build found with id", from_build_id, "or", to_build_id)
+        return
+
+    if from_build.manifest is None or to_build.manifest is None:
+        print("Both builds must have a manifest to be compared")
+        return
+
+    for change, paths in diff_manifests(from_build.manifest, to_build.manifest).items():
+        print(f"{len(paths)} {change}")
+        for path in paths:
+            entry = to_build.manifest.get(path) or from_build.manifest[path]
+            print(f"  {path} {entry['size']} bytes {entry['source'] or ''}")
+
+
+@manager.option("--build_id", dest="build_id")
+def rollback_static_site(build_id):
+    """Make an earlier build live again. Only available when builds are deployed with VERSIONED_DEPLOYS."""
+    import boto3
+    from application.sitebuilder.build_service import versioned_s3_deployer
+    from application.sitebuilder.exceptions import DeployException
+
+    s3_client = boto3.client("s3", region_name=app.config["S3_REGION"])
+    try:
+        deployer = versioned_s3_deployer(app, s3_client)
+    except DeployException as e:
+        print(e)
+        return
+
+    live_build = deployer.live_build()
+    if live_build is None:
+        print("No build has been deployed with VERSIONED_DEPLOYS")
+        return
+
+    try:
+        deployer.switch_to(build_id)
+        print("Build id", build_id, "is now live, replacing", live_build["build_id"])
+    except DeployException as e:
+        print(e)
+
+
+@manager.option("--topics", dest="topics", type=int, default=5)
+@manager.option("--subtopics", dest="subtopics", type=int, default=4)
+@manager.option("--measures", dest="measures", type=int, default=5)
+@manager.option("--versions", dest="versions", type=int, default=2)
+@manager.option("--dimensions", dest="dimensions", type=int, default=3)
+@manager.option("--build_workers", dest="build_workers", type=int, default=None)
+@manager.option("--output", dest="output", default=None)
+def benchmark_static_build(topics, subtopics, measures, versions, dimensions, build_workers, output):
+    """Build the static site from a synthetic dataset in the test database, and report its performance as JSON. The
+    test database is emptied first, so runs with the same options can be compared."""
+    import json
+    from application.config import TestConfig
+    from tests.benchmarks.static_build import clear_database, generate_synthetic_site, run_static_build_benchmark
+
+    environment = os.environ.get("ENVIRONMENT", "PRODUCTION")
+    if environment.upper().startswith("PROD"):
+        print("It looks like you are running this in production or some unknown environment.")
+        print("Do not run this command in this environment as it deletes data")
+        sys.exit(-1)
+
+    benchmark_app = create_app(TestConfig)
+    Migrate(benchmark_app, db)
+    with benchmark_app.app_context():
+        upgrade()
+        clear_database()
+        with TimedExecution("Generate synthetic dataset"):
+            generate_synthetic_site(
+                db.session,
+                topics=topics,
+                subtopics=subtopics,
+                measures=measures,
+                versions=versions,
+                dimensions=dimensions,
+            )
+
+    report = run_static_build_benchmark(benchmark_app, build_workers=build_workers)
+    report["dataset"] = {
+        "topics": topics,
+        "subtopics": subtopics,
+        "measures": measures,
+        "versions": versions,
+        "dimensions": dimensions,
+    }
+
+    print(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+
 @manager.command
 def run_data_migration(migration=None):
     data_migrations_folder = os.path.join("scripts", "data_migrations")
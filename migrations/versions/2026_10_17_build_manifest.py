@@ -0,0 +1,25 @@
+"""Add a manifest of every output file to each build
+
+Revision ID: 2026_10_17_build_manifest
+Revises: 2023_06_07_add_measure_retired
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_build_manifest"
+down_revision = "2023_06_07_add_measure_retired"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("build", sa.Column("manifest", postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column("build", "manifest")
@@ -0,0 +1,26 @@
+"""Add the measure a partial build is for
+
+Revision ID: 2026_10_17_build_measure
+Revises: 2026_10_17_build_progress
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_build_measure"
+down_revision = "2026_10_17_build_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("build", sa.Column("measure_id", sa.Integer(), nullable=True))
+    op.create_foreign_key("build_measure_id_fkey", "build", "measure", ["measure_id"], ["id"], ondelete="SET NULL")
+
+
+def downgrade():
+    op.drop_constraint("build_measure_id_fkey", "build", type_="foreignkey")
+    op.drop_column("build", "measure_id")
@@ -0,0 +1,24 @@
+"""Add the current phase of a running build
+
+Revision ID: 2026_10_17_build_progress
+Revises: 2026_10_17_build_telemetry
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_build_progress"
+down_revision = "2026_10_17_build_telemetry"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("build", sa.Column("progress", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("build", "progress")
@@ -0,0 +1,25 @@
+"""Add timings and query counts for each phase of a build
+
+Revision ID: 2026_10_17_build_telemetry
+Revises: 2026_10_17_build_manifest
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_build_telemetry"
+down_revision = "2026_10_17_build_manifest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("build", sa.Column("telemetry", postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column("build", "telemetry")
@@ -0,0 +1,82 @@
+"""Log changes to every table the static site is built from
+
+Revision ID: 2026_10_17_source_changes
+Revises: 2026_10_17_view_changes
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_source_changes"
+down_revision = "2026_10_17_view_changes"
+branch_labels = None
+depends_on = None
+
+# The tables the static site is built from. Users, logins, redirects and the builds themselves are left out, as they
+# aren't part of any page and some of them change during every build.
+SOURCE_TABLES = [
+    "classification",
+    "data_source",
+    "data_source_in_measure_version",
+    "dimension",
+    "dimension_categorisation",
+    "dimension_chart",
+    "dimension_table",
+    "ethnicity",
+    "ethnicity_in_classification",
+    "frequency_of_release",
+    "lowest_level_of_geography",
+    "measure",
+    "measure_version",
+    "organisation",
+    "parent_ethnicity_in_classification",
+    "subtopic",
+    "subtopic_measure",
+    "topic",
+    "type_of_statistic",
+    "upload",
+]
+
+# As for the dashboard views' change log, each table is logged at most once per transaction, without taking a lock
+# which another transaction writing to the same table would wait on.
+log_source_data_change_function = """
+CREATE OR REPLACE FUNCTION log_source_data_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO source_data_change (table_name) VALUES (TG_TABLE_NAME) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    op.create_table(
+        "source_data_change",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("transaction_id", sa.BigInteger(), server_default=sa.text("txid_current()"), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("table_name", "transaction_id", name="uq_source_data_change_table_transaction"),
+    )
+    op.execute(log_source_data_change_function)
+
+    for table in SOURCE_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_source_data_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE PROCEDURE log_source_data_change()
+            """
+        )
+
+
+def downgrade():
+    for table in SOURCE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_source_data_change ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS log_source_data_change()")
+    op.drop_table("source_data_change")
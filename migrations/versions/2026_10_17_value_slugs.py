@@ -0,0 +1,43 @@
+"""Add indexed slug columns to ethnicity values and geographies
+
+Revision ID: 2026_10_17_value_slugs
+Revises: 2026_10_17_build_measure
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from slugify import slugify
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_value_slugs"
+down_revision = "2026_10_17_build_measure"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("ethnicity", sa.Column("slug", sa.String(length=255), nullable=True))
+    op.add_column("lowest_level_of_geography", sa.Column("slug", sa.String(length=255), nullable=True))
+
+    # Slugs are generated with the same library as the dashboards' URLs, so they can't be backfilled in SQL
+    conn = op.get_bind()
+    for ethnicity_id, value in conn.execute("SELECT id, value FROM ethnicity WHERE value IS NOT NULL").fetchall():
+        conn.execute(sa.text("UPDATE ethnicity SET slug = :slug WHERE id = :id"), slug=slugify(value), id=ethnicity_id)
+    for (name,) in conn.execute("SELECT name FROM lowest_level_of_geography").fetchall():
+        conn.execute(
+            sa.text("UPDATE lowest_level_of_geography SET slug = :slug WHERE name = :name"),
+            slug=slugify(name),
+            name=name,
+        )
+
+    op.create_index("ix_ethnicity_slug", "ethnicity", ["slug"])
+    op.create_index("ix_lowest_level_of_geography_slug", "lowest_level_of_geography", ["slug"])
+
+
+def downgrade():
+    op.drop_index("ix_lowest_level_of_geography_slug", table_name="lowest_level_of_geography")
+    op.drop_index("ix_ethnicity_slug", table_name="ethnicity")
+    op.drop_column("lowest_level_of_geography", "slug")
+    op.drop_column("ethnicity", "slug")
@@ -0,0 +1,88 @@
+"""Log changes to the tables the dashboard materialized views are built from
+
+Revision ID: 2026_10_17_view_changes
+Revises: 2026_10_17_value_slugs
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026_10_17_view_changes"
+down_revision = "2026_10_17_value_slugs"
+branch_labels = None
+depends_on = None
+
+DASHBOARD_SOURCE_TABLES = [
+    "classification",
+    "dimension",
+    "dimension_categorisation",
+    "ethnicity",
+    "ethnicity_in_classification",
+    "lowest_level_of_geography",
+    "measure",
+    "measure_version",
+    "parent_ethnicity_in_classification",
+    "subtopic",
+    "subtopic_measure",
+    "topic",
+]
+
+# A statement-level trigger logs each table at most once per transaction, however many rows it changes, and without
+# taking a lock which another transaction writing to the same table would wait on.
+log_dashboard_source_change_function = """
+CREATE OR REPLACE FUNCTION log_dashboard_source_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO dashboard_source_change (table_name) VALUES (TG_TABLE_NAME) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    op.create_table(
+        "dashboard_source_change",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("transaction_id", sa.BigInteger(), server_default=sa.text("txid_current()"), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("table_name", "transaction_id", name="uq_dashboard_source_change_table_transaction"),
+    )
+    op.create_table(
+        "dashboard_view_refresh",
+        sa.Column("view_name", sa.String(), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("view_name"),
+    )
+    op.execute("CREATE SEQUENCE dashboard_view_generation_seq")
+    op.execute(log_dashboard_source_change_function)
+
+    for table in DASHBOARD_SOURCE_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_dashboard_source_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE PROCEDURE log_dashboard_source_change()
+            """
+        )
+
+    # Every view needs refreshing once, as changes made before now were not logged
+    op.execute(
+        "INSERT INTO dashboard_source_change (table_name) VALUES "
+        + ", ".join(f"('{table}')" for table in DASHBOARD_SOURCE_TABLES)
+    )
+
+
+def downgrade():
+    for table in DASHBOARD_SOURCE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_dashboard_source_change ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS log_dashboard_source_change()")
+    op.execute("DROP SEQUENCE IF EXISTS dashboard_view_generation_seq")
+    op.drop_table("dashboard_view_refresh")
+    op.drop_table("dashboard_source_change")
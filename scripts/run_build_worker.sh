@@ -0,0 +1,6 @@
+#!/bin/bash
+
+SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+
+# Runs in the foreground so the platform restarts the worker if it exits
+exec python3 "${SCRIPT_DIR}/../manage.py" run_build_worker >> /var/log/static-site-build.log 2>&1
@@ -27,5 +27,5 @@ display_result $? 1 "Apply migrations including any in review app PR"
 # ./manage.py delete_all_measures_except_two_per_subtopic
 # display_result $? 1 "Drop all but first two measures in each subtopic from database so rowcount < heroku limit of 10k"
 
-./manage.py refresh_materialized_views
+./manage.py refresh_materialized_views --all
 display_result $? 1 "Refresh materialized views"
@@ -90,6 +90,10 @@ resource "aws_cloudfront_distribution" "distribution__static_site" {
       locations = []
     }
   }
+
+  lifecycle {
+    ignore_changes = [origin]  // With VERSIONED_DEPLOYS, the publisher points the origin path at the live build's prefix
+  }
 }
 
 resource "aws_cloudfront_function" "http_basic_auth_function" {
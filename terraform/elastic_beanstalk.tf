@@ -485,6 +485,11 @@ resource "aws_elastic_beanstalk_environment" "main_app_elastic_beanstalk_environ
     // So the static site build kept running out of disk space (oops!)
     value     = "/var/tmp/static-build-dir"
   }
+  setting {
+    namespace = "aws:elasticbeanstalk:application:environment"
+    name      = "STATIC_SITE_DISTRIBUTION_ID"
+    value     = join("", aws_cloudfront_distribution.distribution__static_site[*].id)
+  }
   setting {
     namespace = "aws:elasticbeanstalk:application:environment"
     name      = "SURVEY_ENABLED"
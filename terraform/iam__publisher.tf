@@ -33,6 +33,16 @@ data "aws_iam_policy_document" "iam_policy_document__allow_publisher_to_access_s
       "${aws_s3_bucket.s3_bucket__uploads.arn}/*",      // The files within the bucket (to create / update / delete files)
     ]
   }
+
+  dynamic "statement" {
+    for_each = aws_cloudfront_distribution.distribution__static_site[*].arn  // Only if the distribution is created
+
+    content {
+      effect    = "Allow"
+      actions   = ["cloudfront:GetDistributionConfig", "cloudfront:UpdateDistribution"]  // To switch the live build
+      resources = [statement.value]
+    }
+  }
 }
 
 resource "aws_iam_policy" "iam_policy__allow_publisher_to_access_static_site_s3_bucket" {
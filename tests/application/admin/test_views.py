@@ -15,6 +15,7 @@ from tests.models import (
 from tests.utils import find_input_for_label_with_text
 from werkzeug.datastructures import ImmutableMultiDict
 import pytest
+import uuid
 
 
 @flaky(max_runs=10, min_passes=1)
@@ -652,3 +653,36 @@ class TestMergeDataSourcesView:
         )
 
         assert response.status_code == 200
+
+
+def test_site_build_page_shows_build_telemetry_without_loading_every_build_manifest(
+    db_session, test_app_client, logged_in_admin_user
+):
+    from sqlalchemy import event
+
+    from application.sitebuilder.models import Build, BuildStatus
+
+    telemetry = {
+        "totals": {"seconds": 42.0, "queries": 10, "query_seconds": 1.5, "bytes_written": 100},
+        "phases": [],
+        "page_count": 3,
+        "slowest_pages": [],
+    }
+    build = Build(id=str(uuid.uuid4()), status=BuildStatus.DONE, manifest={"index.html": {}}, telemetry=telemetry)
+    db_session.session.add(build)
+    db_session.session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_session.engine, "before_cursor_execute", record_statement)
+    try:
+        resp = test_app_client.get(url_for("admin.site_build"))
+    finally:
+        event.remove(db_session.engine, "before_cursor_execute", record_statement)
+
+    assert resp.status_code == 200
+    assert "42s" in resp.get_data(as_text=True)
+    assert not any("build.manifest" in statement for statement in statements)
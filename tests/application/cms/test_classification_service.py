@@ -172,3 +172,19 @@ def test_remove_parent_value_from_classification_removes_value():
 
     # then we have one fewer parent values for the classification
     assert len(g2.parent_values) == 2
+
+
+def test_get_value_by_slug_finds_value_by_its_slug():
+    value = classification_service.get_or_create_value("Mixed White/Black Caribbean")
+
+    assert value.slug == "mixed-white-black-caribbean"
+    assert classification_service.get_value_by_slug("mixed-white-black-caribbean") == value
+    assert classification_service.get_value_by_slug("not-a-value") is None
+
+
+def test_value_slug_is_updated_when_value_changes():
+    value = classification_service.get_or_create_value("Black")
+
+    value.value = "Black British"
+
+    assert value.slug == "black-british"
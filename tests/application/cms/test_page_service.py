@@ -1,6 +1,7 @@
 from datetime import datetime
 
 import pytest
+from sqlalchemy import event
 
 from application.auth.models import TypeOfUser
 from application.cms.exceptions import PageNotFoundException, InvalidPageHierarchy, PageExistsException, PageUnEditable
@@ -698,3 +699,32 @@ class TestPageService:
     def test_generate_topic_slug(self):
         slug = page_service.generate_topic_slug("Alphabet with SPaces")
         assert slug == "alphabet-with-spaces"
+
+    def test_get_build_snapshot_preloads_publishable_tree(self, db):
+        measure_version = MeasureVersionWithDimensionFactory(
+            status="APPROVED", measure__subtopics__topic__slug="topic", uploads__title="Upload"
+        )
+        dimension_guids = [dimension.guid for dimension in measure_version.dimensions]
+        TopicFactory(slug="testing-space")
+        db.session.expire_all()
+
+        topics = page_service.get_build_snapshot()
+
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record_statement)
+        try:
+            assert [topic.slug for topic in topics] == ["topic"]
+            measure = topics[0].subtopics[0].measures[0]
+            assert measure.subtopic.topic.slug == "topic"
+            loaded_version = measure.versions[0]
+            assert loaded_version.id == measure_version.id
+            assert [dimension.guid for dimension in loaded_version.ordered_dimensions] == dimension_guids
+            assert [upload.title for upload in loaded_version.uploads] == ["Upload"]
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record_statement)
+
+        assert statements == []
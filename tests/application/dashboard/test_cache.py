@@ -0,0 +1,69 @@
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from application.dashboard.cache import DashboardCache
+from manage import refresh_materialized_views
+from tests.models import MeasureVersionWithDimensionFactory
+
+
+@patch("application.dashboard.cache.dashboard_views_generation", return_value=1)
+def test_dashboard_cache_computes_data_once_per_generation(dashboard_views_generation, app):
+    cache = DashboardCache()
+    cache.max_entries = app.config["DASHBOARD_CACHE_MAX_ENTRIES"]
+    compute = Mock(side_effect=["first", "second"])
+
+    with app.test_request_context():
+        assert cache.get("ethnic-groups", compute) == "first"
+    with app.test_request_context():
+        assert cache.get("ethnic-groups", compute) == "first"
+    assert compute.call_count == 1
+
+    dashboard_views_generation.return_value = 2
+
+    with app.test_request_context():
+        assert cache.get("ethnic-groups", compute) == "second"
+    assert compute.call_count == 2
+
+
+@patch("application.dashboard.cache.dashboard_views_generation", return_value=1)
+def test_dashboard_cache_looks_up_the_generation_once_per_request(dashboard_views_generation, app):
+    cache = DashboardCache()
+    cache.max_entries = app.config["DASHBOARD_CACHE_MAX_ENTRIES"]
+
+    with app.test_request_context():
+        cache.get("ethnic-groups", lambda: "ethnic groups")
+        cache.get(("ethnic-groups", "indian"), lambda: "indian")
+        assert dashboard_views_generation.call_count == 1
+
+    with app.test_request_context():
+        cache.get("ethnic-groups", lambda: "not cached")
+        assert dashboard_views_generation.call_count == 2
+
+
+@patch("application.dashboard.cache.dashboard_views_generation", return_value=1)
+def test_dashboard_cache_evicts_least_recently_used_entries(dashboard_views_generation):
+    cache = DashboardCache()
+    cache.max_entries = 2
+
+    cache.get("a", lambda: "a")
+    cache.get("b", lambda: "b")
+    cache.get("a", lambda: "not cached")
+    cache.get("c", lambda: "c")
+
+    assert cache.get("a", lambda: "not cached") == "a"
+    assert cache.get("b", lambda: "recomputed") == "recomputed"
+
+
+def test_dashboard_pages_are_cached_until_the_views_are_refreshed(test_app_client, logged_in_rdu_user):
+    MeasureVersionWithDimensionFactory(status="APPROVED", published_at=datetime.now().date())
+    refresh_materialized_views()
+
+    with patch("application.dashboard.views.get_ethnic_groups_dashboard_data", return_value=[]) as get_data:
+        assert test_app_client.get("/dashboards/ethnic-groups").status_code == 200
+        assert test_app_client.get("/dashboards/ethnic-groups").status_code == 200
+        assert get_data.call_count == 1
+
+        refresh_materialized_views(refresh_all=True)
+
+        assert test_app_client.get("/dashboards/ethnic-groups").status_code == 200
+        assert get_data.call_count == 2
@@ -0,0 +1,129 @@
+from datetime import date, datetime, timedelta
+
+from slugify import slugify
+
+from application.dashboard.data_helpers import (
+    DashboardData,
+    get_ethnic_group_by_slug_dashboard_data,
+    get_ethnic_groups_dashboard_data,
+    get_ethnicity_classification_by_id_dashboard_data,
+    get_ethnicity_classifications_dashboard_data,
+    get_geographic_breakdown_by_slug_dashboard_data,
+    get_geographic_breakdown_dashboard_data,
+    get_published_dashboard_data,
+)
+from manage import refresh_materialized_views
+from tests.models import (
+    ClassificationFactory,
+    DimensionFactory,
+    EthnicityFactory,
+    MeasureFactory,
+    MeasureVersionFactory,
+    MeasureVersionWithDimensionFactory,
+)
+
+
+def test_dashboard_data_matches_data_for_each_dashboard(app):
+    for _ in range(3):
+        MeasureVersionWithDimensionFactory(status="APPROVED", latest=True, published_at=datetime.now().date())
+    refresh_materialized_views()
+
+    with app.test_request_context():
+        dashboard_data = DashboardData()
+
+        ethnic_groups = list(get_ethnic_groups_dashboard_data())
+        assert list(dashboard_data.ethnic_groups()) == ethnic_groups
+        for ethnic_group in ethnic_groups:
+            slug = slugify(ethnic_group["value"])
+            assert dashboard_data.ethnic_group_by_slug(slug) == get_ethnic_group_by_slug_dashboard_data(slug)
+
+        classifications = get_ethnicity_classifications_dashboard_data()
+        assert dashboard_data.ethnicity_classifications() == classifications
+        for classification in classifications:
+            assert dashboard_data.ethnicity_classification_by_id(
+                classification["id"]
+            ) == get_ethnicity_classification_by_id_dashboard_data(classification["id"])
+
+        location_levels = get_geographic_breakdown_dashboard_data()
+        assert dashboard_data.geographic_breakdown() == location_levels
+        for location_level in location_levels:
+            slug = slugify(location_level["name"])
+            assert dashboard_data.geographic_breakdown_by_slug(slug) == get_geographic_breakdown_by_slug_dashboard_data(
+                slug
+            )
+
+
+def test_published_dashboard_data_counts_publications_and_updates_for_each_week():
+    this_week = date.today() - timedelta(days=date.today().weekday())
+    three_weeks_ago = this_week - timedelta(weeks=3)
+    measure = MeasureFactory()
+    MeasureVersionFactory(measure=measure, status="APPROVED", version="1.0", published_at=three_weeks_ago)
+    MeasureVersionFactory(measure=measure, status="APPROVED", version="1.1", published_at=three_weeks_ago)
+    MeasureVersionFactory(
+        measure=measure, status="APPROVED", version="2.0", published_at=three_weeks_ago + timedelta(days=4)
+    )
+    MeasureVersionFactory(status="APPROVED", version="1.0", published_at=this_week)
+
+    data = get_published_dashboard_data()
+
+    assert data["number_of_publications"] == 2
+    assert data["number_of_major_updates"] == 1
+    assert [week["week"] for week in data["weeks"]] == [this_week - timedelta(weeks=weeks) for weeks in range(4)]
+    assert [len(week["publications"]) for week in data["weeks"]] == [1, 0, 0, 1]
+    assert [len(week["major_updates"]) for week in data["weeks"]] == [0, 0, 0, 1]
+    assert data["total_page_count_each_week"] == [1, 1, 1, 2]
+    assert data["total_major_updates_count_each_week"] == [1, 1, 1, 1]
+
+
+def test_ethnicity_classifications_dashboard_data_counts_dimensions_and_measures(app):
+    classification = ClassificationFactory(id="5A")
+    for _ in range(2):
+        MeasureVersionWithDimensionFactory(
+            status="APPROVED",
+            latest=True,
+            published_at=datetime.now().date(),
+            dimensions__classification_links__includes_parents=False,
+            dimensions__classification_links__includes_all=True,
+            dimensions__classification_links__includes_unknown=False,
+            dimensions__classification_links__classification=classification,
+        )
+    refresh_materialized_views()
+
+    with app.test_request_context():
+        classifications = {
+            classification["id"]: classification for classification in get_ethnicity_classifications_dashboard_data()
+        }
+        ethnic_groups = get_ethnic_groups_dashboard_data()
+
+    assert classifications["5A"]["measure_count"] == 2
+    assert classifications["5A"]["dimension_count"] == 2
+    assert classifications["5A"]["includes_parents_count"] == 0
+    assert classifications["5A"]["includes_all_count"] == 2
+    assert classifications["5A"]["includes_unknown_count"] == 0
+    assert all(ethnic_group["measure_count"] == 2 for ethnic_group in ethnic_groups)
+    assert all(len(ethnic_group["classifications"]) == 1 for ethnic_group in ethnic_groups)
+    assert [ethnic_group["position"] for ethnic_group in ethnic_groups] == sorted(
+        ethnic_group["position"] for ethnic_group in ethnic_groups
+    )
+
+
+def test_dashboard_data_does_not_merge_ethnic_groups_with_the_same_slug(app):
+    classification = ClassificationFactory(
+        parent_values=[],
+        ethnicities=[EthnicityFactory.build(value="Black African"), EthnicityFactory.build(value="Black-African")],
+    )
+    measure_version = MeasureVersionWithDimensionFactory(
+        status="APPROVED", latest=True, published_at=datetime.now().date(), dimensions=[]
+    )
+    DimensionFactory(measure_version=measure_version, classification_links__classification=classification)
+    refresh_materialized_views()
+
+    with app.test_request_context():
+        value_title, measure_count, nested_measures_and_dimensions = DashboardData().ethnic_group_by_slug(
+            "black-african"
+        )
+
+        assert value_title == "Black African"
+        assert (value_title, measure_count, nested_measures_and_dimensions) == get_ethnic_group_by_slug_dashboard_data(
+            "black-african"
+        )
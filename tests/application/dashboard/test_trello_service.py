@@ -1,7 +1,11 @@
+import json
+import time
+
 import pytest
 from unittest import mock
 
-from application.dashboard.trello_service import trello_service
+from application.dashboard.trello_service import TrelloService, trello_service
+from tests.utils import FakeTrelloClient, fake_trello_card
 
 
 # Mock out the Trello client at class level to be sure we don't make any calls out to external Trello API
@@ -26,3 +30,53 @@ class TestTrelloService:
     )
     def test_removal_of_internal_reference(self, client, card_name, expected_output):
         assert trello_service._remove_internal_reference(card_name) == expected_output
+
+
+@pytest.fixture
+def cached_trello_service(tmp_path):
+    service = TrelloService()
+    service.client = FakeTrelloClient(
+        [fake_trello_card("card-1", "[ABC 001] Planned measure", "67ced83546e9a460b380ccdd", labels=["HO"])]
+    )
+    service.snapshot_path = str(tmp_path / "trello-measure-cards.json")
+    service.cache_seconds = 300
+    return service
+
+
+class TestCachedMeasureCards:
+    def test_fetches_cards_once_until_the_snapshot_is_stale(self, cached_trello_service):
+        cards = cached_trello_service.get_cached_measure_cards()
+
+        assert [card["name"] for card in cards] == ["Planned measure"]
+        assert cached_trello_service.get_cached_measure_cards() == cards
+        assert cached_trello_service.client.fetch_count == 1
+
+    def test_serves_the_stale_snapshot_while_fetching_a_new_one(self, cached_trello_service):
+        cached_trello_service.get_cached_measure_cards()
+        cached_trello_service._snapshot["fetched_at"] = time.time() - 301
+        cached_trello_service.client.cards.append(
+            fake_trello_card("card-2", "Measure in review", "67ced83546e9a460b380ccd9", labels=["DfE"])
+        )
+
+        assert len(cached_trello_service.get_cached_measure_cards()) == 1
+
+        cached_trello_service.wait_for_refresh()
+        assert len(cached_trello_service.get_cached_measure_cards()) == 2
+        assert cached_trello_service.client.fetch_count == 2
+
+    def test_keeps_the_stale_snapshot_if_trello_fails(self, cached_trello_service):
+        cached_trello_service.get_cached_measure_cards()
+        cached_trello_service._snapshot["fetched_at"] = time.time() - 301
+        cached_trello_service.client.error = Exception("Trello is down")
+
+        cached_trello_service.get_cached_measure_cards()
+        cached_trello_service.wait_for_refresh()
+
+        assert [card["name"] for card in cached_trello_service.get_cached_measure_cards()] == ["Planned measure"]
+
+    def test_uses_the_snapshot_saved_by_another_process(self, cached_trello_service):
+        with open(cached_trello_service.snapshot_path, "w") as snapshot_file:
+            json.dump({"fetched_at": time.time(), "cards": [{"id": "saved-card", "stage": "planned"}]}, snapshot_file)
+
+        assert cached_trello_service.get_cached_measure_cards() == [{"id": "saved-card", "stage": "planned"}]
+        assert cached_trello_service.client.fetch_count == 0
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from application import db
+from application.dashboard.view_refresh import (
+    DASHBOARD_VIEWS,
+    dashboard_views_generation,
+    refresh_dashboard_views,
+    refresh_waves,
+    views_to_refresh,
+)
+from tests.models import EthnicityFactory, LowestLevelOfGeographyFactory, MeasureVersionWithDimensionFactory
+
+
+def test_views_to_refresh_includes_views_built_from_a_refreshed_view():
+    assert views_to_refresh({"measure_version"}) == list(DASHBOARD_VIEWS)
+    assert views_to_refresh({"ethnicity"}) == ["ethnic_groups_by_dimension"]
+    assert views_to_refresh({"lowest_level_of_geography"}) == ["latest_published_measure_versions_by_geography"]
+    assert views_to_refresh({"upload"}) == []
+
+
+def test_refresh_waves_refresh_views_after_the_views_they_are_built_from():
+    assert refresh_waves(list(DASHBOARD_VIEWS)) == [
+        ["latest_published_measure_versions"],
+        [
+            "latest_published_measure_versions_by_geography",
+            "ethnic_groups_by_dimension",
+            "classifications_by_dimension",
+        ],
+    ]
+    assert refresh_waves(["classifications_by_dimension", "ethnic_groups_by_dimension"]) == [
+        ["ethnic_groups_by_dimension", "classifications_by_dimension"]
+    ]
+
+
+def test_refresh_records_how_long_each_view_took_to_refresh():
+    durations = refresh_dashboard_views(refresh_all=True)
+
+    assert list(durations) == list(DASHBOARD_VIEWS)
+    assert all(seconds >= 0 for seconds in durations.values())
+
+
+def test_refresh_only_refreshes_views_whose_source_tables_have_changed():
+    MeasureVersionWithDimensionFactory(status="APPROVED", latest=True, published_at=datetime.now().date())
+    assert list(refresh_dashboard_views()) == list(DASHBOARD_VIEWS)
+    assert list(refresh_dashboard_views()) == []
+
+    ethnicity = EthnicityFactory(value="White")
+    refresh_dashboard_views()
+    ethnicity.value = "White British"
+    db.session.commit()
+    assert list(refresh_dashboard_views()) == ["ethnic_groups_by_dimension"]
+
+    LowestLevelOfGeographyFactory(name="Local authority", position=1)
+    assert list(refresh_dashboard_views()) == ["latest_published_measure_versions_by_geography"]
+
+
+def test_refresh_all_refreshes_every_view():
+    refresh_dashboard_views()
+
+    assert list(refresh_dashboard_views(refresh_all=True)) == list(DASHBOARD_VIEWS)
+
+
+def test_each_refresh_records_a_new_generation():
+    refresh_dashboard_views(refresh_all=True)
+    generation = dashboard_views_generation()
+
+    refresh_dashboard_views()
+    assert dashboard_views_generation() == generation
+
+    EthnicityFactory(value="Indian")
+    refresh_dashboard_views()
+    assert dashboard_views_generation() > generation
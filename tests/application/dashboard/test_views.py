@@ -39,6 +39,58 @@ def test_dashboard_pages_return_200(test_app_client, logged_in_rdu_user, dashboa
     assert resp.status_code == 200, f"Failed to load dashboards '{dashboard_url}'"
 
 
+@flaky(max_runs=10, min_passes=1)
+@pytest.mark.parametrize(
+    "dashboard_url",
+    (
+        "/dashboards/data/published",
+        "/dashboards/data/ethnic-groups",
+        "/dashboards/data/ethnic-groups/indian",
+        "/dashboards/data/ethnicity-classifications",
+        "/dashboards/data/ethnicity-classifications/5A",
+        "/dashboards/data/geographic-breakdown",
+    ),
+)
+def test_dashboard_json_is_not_sent_again_until_the_views_are_refreshed(
+    test_app_client, logged_in_rdu_user, dashboard_url
+):
+    MeasureVersionWithDimensionFactory(
+        status="APPROVED",
+        published_at=datetime.now().date(),
+        dimensions__classification_links__classification__id="5A",
+    )
+    refresh_materialized_views()
+
+    resp = test_app_client.get(dashboard_url)
+    assert resp.status_code == 200
+    assert resp.is_json
+    assert resp.headers["ETag"] and resp.headers["Last-Modified"]
+
+    resp = test_app_client.get(dashboard_url, headers={"If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+
+    refresh_materialized_views(refresh_all=True)
+
+    resp = test_app_client.get(dashboard_url, headers={"If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 200
+
+
+@flaky(max_runs=10, min_passes=1)
+def test_published_json_is_sent_again_once_a_measure_version_is_published(test_app_client, logged_in_rdu_user):
+    MeasureVersionWithDimensionFactory(status="APPROVED", published_at=datetime.now().date())
+    refresh_materialized_views()
+
+    resp = test_app_client.get("/dashboards/data/published")
+    assert resp.json["number_of_publications"] == 1
+
+    MeasureVersionWithDimensionFactory(status="APPROVED", published_at=datetime.now().date())
+
+    resp = test_app_client.get("/dashboards/data/published", headers={"If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 200
+    assert resp.json["number_of_publications"] == 2
+
+
 @flaky(max_runs=10, min_passes=1)
 def test_data_corrections_page_with_no_corrections(test_app_client, logged_in_rdu_user):
     resp = test_app_client.get(url_for("static_site.corrections"))
@@ -453,6 +453,60 @@ def test_classification_collection_will_not_return_invalid_classifications():
     assert 1 == len(valid_classifications)
 
 
+def test_classification_collection_orders_valid_classifications_by_data_fit_level():
+    # GIVEN
+    # two classifications valid for the same data, one with a data item for more of the values than the other
+    classification_1 = ethnicity_classification_requires_fish_mammal_and_either_reptile_or_other()
+    classification_2 = ethnicity_classification_from_data(
+        id="Code5",
+        name="Fish, mammals and reptiles",
+        data_rows=[
+            ["Mammal", "Mammal", "Mammal", 1, True],
+            ["Fish", "Fish", "Fish", 2, True],
+            ["Reptile", "Reptile", "Reptile", 3, False],
+        ],
+    )
+    classification_collection = ethnicity_classification_collection_from_classification_list(
+        [classification_1, classification_2]
+    )
+    raw_values = ["Mammal", "Fish", "Reptile", "Reptile"]
+
+    # WHEN
+    # we request valid classifications
+    valid_classifications = classification_collection.get_valid_classifications(raw_values, pet_standardiser())
+
+    # THEN
+    # the best fitting classification comes first
+    assert [classification.get_id() for classification in valid_classifications] == ["Code5", "Code4"]
+    assert [
+        classification.get_data_fit_level(raw_values, pet_standardiser()) for classification in valid_classifications
+    ] == [4, 2]
+
+
+def test_classification_collection_matches_repeated_raw_values_in_any_case():
+    classification_collection = ethnicity_classification_collection_from_classification_list(
+        [ethnicity_classification_with_cats_and_dogs_data()]
+    )
+    raw_values = ["cat", " CAT ", "Feline", "dog", "Canine "]
+
+    valid_classifications = classification_collection.get_valid_classifications(raw_values, pet_standardiser())
+
+    assert [classification.get_id() for classification in valid_classifications] == ["Code1"]
+
+
+def test_classification_collection_finds_classifications_added_after_a_search():
+    classification_collection = ethnicity_classification_collection_from_classification_list(
+        [ethnicity_classification_with_cats_and_dogs_data()]
+    )
+    raw_values = ["Cat", "Dog", "Fish"]
+    assert classification_collection.get_valid_classifications(raw_values, pet_standardiser()) == []
+
+    classification_collection.add_classification(ethnicity_classification_with_required_fish_cat_and_dog_data())
+
+    valid_classifications = classification_collection.get_valid_classifications(raw_values, pet_standardiser())
+    assert [classification.get_id() for classification in valid_classifications] == ["Code2"]
+
+
 def test_classification_finder_given_raw_data_returns_output_for_each_valid_classification_plus_custom():
     # Given
     # a classification search with multiple classifications
@@ -0,0 +1,153 @@
+import os
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from application.sitebuilder.build import (
+    _dashboards_affected_by_measure,
+    _link_or_copy,
+    sync_directory,
+    write_html,
+    write_measure_version_alias,
+    write_measure_versions,
+)
+from application.sitebuilder.render_pool import MeasureVersionRenderPool
+from application.sitebuilder.telemetry import BuildTelemetry
+from manage import refresh_materialized_views
+from tests.models import (
+    ClassificationFactory,
+    EthnicityFactory,
+    MeasureFactory,
+    MeasureVersionFactory,
+    MeasureVersionWithDimensionFactory,
+)
+from tests.test_data.chart_and_table import chart, simple_table
+
+
+def test_measure_versions_are_submitted_to_render_pool(app):
+    measure = MeasureFactory(slug="measure", subtopics__slug="subtopic", subtopics__topic__slug="topic")
+    MeasureVersionFactory(measure=measure, status="APPROVED", published_at=datetime.now().date(), version="1.0")
+    render_pool = Mock()
+
+    with patch("application.sitebuilder.build.write_measure_vesion_at_slug") as write_patch:
+        write_measure_versions(measure, "/build", render_pool=render_pool)
+
+    write_patch.assert_not_called()
+    render_pool.submit.assert_called_once()
+    assert render_pool.submit.call_args[0][1] == "/build/topic/subtopic/measure/1.0"
+    assert render_pool.submit.call_args[1]["latest_slug"] == "/build/topic/subtopic/measure/latest"
+
+
+def test_render_pool_writes_measure_version_pages_in_a_worker_process(app, tmpdir):
+    measure_version = MeasureVersionWithDimensionFactory(
+        status="APPROVED",
+        latest=True,
+        published_at=datetime.now().date(),
+        version="1.0",
+        dimensions__guid="dimension-guid",
+        dimensions__dimension_chart__chart_object=chart,
+        dimensions__dimension_table__table_object=simple_table(),
+        uploads=[],
+    )
+    dimension = measure_version.dimensions[0]
+    slug = os.path.join(str(tmpdir), "1.0")
+    latest_slug = os.path.join(str(tmpdir), "latest")
+    telemetry = BuildTelemetry()
+
+    # Builds render pages in static mode, and start the pool once they've switched to it
+    with telemetry.active(), patch.dict(app.config, {"STATIC_MODE": True}):
+        render_pool = MeasureVersionRenderPool(app, workers=1)
+        render_pool.submit(measure_version, slug, latest_slug=latest_slug, local_build=True, page_path="1.0")
+        render_pool.wait()
+
+    # The worker's telemetry for the page is passed back to the parent
+    assert [page["path"] for page in telemetry.pages] == ["1.0"]
+
+    with open(os.path.join(slug, "index.html")) as html_file:
+        assert measure_version.title in html_file.read()
+    assert os.path.isfile(os.path.join(latest_slug, "index.html"))
+    for page_slug in (slug, latest_slug):
+        assert os.path.isfile(os.path.join(page_slug, "downloads", dimension.static_file_name))
+
+
+def test_latest_alias_reuses_files_written_for_measure_version(app, tmpdir):
+    measure_version = MeasureVersionFactory(status="APPROVED", published_at=datetime.now().date(), version="1.0")
+    slug = os.path.join(str(tmpdir), "1.0")
+    latest_slug = os.path.join(str(tmpdir), "latest")
+    os.makedirs(os.path.join(slug, "downloads"))
+    with open(os.path.join(slug, "downloads", "data.csv"), "w") as csv_file:
+        csv_file.write("a,b\n")
+
+    with patch("application.sitebuilder.build.write_measure_version_html") as html_patch:
+        write_measure_version_alias(measure_version.measure, measure_version, slug, latest_slug)
+
+    html_patch.assert_called_once_with(measure_version.measure, measure_version, latest_slug, latest_url=True)
+    with open(os.path.join(latest_slug, "downloads", "data.csv")) as csv_file:
+        assert csv_file.read() == "a,b\n"
+
+
+def test_linking_over_a_linked_file_leaves_the_file_it_was_linked_to_alone(tmpdir):
+    first_download = tmpdir.join("cache/first.csv")
+    first_download.write("first", ensure=True)
+    second_download = tmpdir.join("cache/second.csv")
+    second_download.write("second")
+    build_file = str(tmpdir.join("data.csv"))
+
+    _link_or_copy(str(first_download), build_file)
+    _link_or_copy(str(second_download), build_file)
+
+    assert os.path.samefile(str(second_download), build_file)
+    assert first_download.read() == "first"
+
+    write_html(build_file, "written")
+
+    assert second_download.read() == "second"
+
+
+def test_sync_directory_links_new_files_and_removes_deleted_ones(tmpdir):
+    source = tmpdir.mkdir("source")
+    source.join("stylesheets/application.css").write("body {}", ensure=True)
+    destination = tmpdir.join("destination")
+    destination.join("stylesheets/removed.css").write("p {}", ensure=True)
+    destination.join("images/removed/icon.svg").write("<svg/>", ensure=True)
+
+    sync_directory(str(source), str(destination))
+
+    assert os.path.samefile(
+        str(source.join("stylesheets/application.css")), str(destination.join("stylesheets/application.css"))
+    )
+    assert not destination.join("stylesheets/removed.css").exists()
+    assert not destination.join("images").exists()
+
+
+def test_sync_directory_leaves_unchanged_files_alone(tmpdir):
+    source = tmpdir.mkdir("source")
+    source.join("application.js").write("var a;")
+    destination = tmpdir.mkdir("destination")
+    destination.join("application.js").write("var a;")
+    destination_inode = os.stat(str(destination.join("application.js"))).st_ino
+
+    sync_directory(str(source), str(destination))
+
+    assert os.stat(str(destination.join("application.js"))).st_ino == destination_inode
+
+
+def test_partial_build_only_writes_dashboards_for_ethnic_groups_a_measure_is_listed_under(app):
+    classification = ClassificationFactory(
+        id="2A",
+        ethnicities=[EthnicityFactory.build(value="Indian"), EthnicityFactory.build(value="Pakistani")],
+        parent_values=[EthnicityFactory.build(value="Asian")],
+    )
+    measure_version = MeasureVersionWithDimensionFactory(
+        status="APPROVED",
+        latest=True,
+        published_at=datetime.now().date(),
+        dimensions__classification_links__classification=classification,
+        dimensions__classification_links__includes_parents=False,
+    )
+    refresh_materialized_views()
+
+    ethnic_group_slugs, classification_ids, _ = _dashboards_affected_by_measure(measure_version.measure)
+
+    # Parent values aren't listed unless the dimension includes them, so a full build has no dashboard for "Asian"
+    assert ethnic_group_slugs == ["indian", "pakistani"]
+    assert classification_ids == ["2A"]
@@ -1,15 +1,35 @@
+import gzip
+import select
 from datetime import datetime, timedelta
 
 from unittest.mock import patch
 
 import pytest
 import stopit
+from botocore.exceptions import ClientError
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 from application.sitebuilder.build import do_it
-from application.sitebuilder.build_service import build_site, request_build
+from application.sitebuilder.build_service import (
+    BUILD_REQUESTED_CHANNEL,
+    S3Deployer,
+    VersionedS3Deployer,
+    _retrieve_and_start_latest_pending_build,
+    build_site,
+    request_build,
+)
+from application.sitebuilder.compression import compress_build_outputs
+from application.sitebuilder.exceptions import DeployException
+from application.sitebuilder.manifest import build_output_manifest
+import manage
 from manage import refresh_materialized_views
 from tests.models import MeasureFactory, MeasureVersionWithDimensionFactory
-from tests.utils import GeneralTestException, UnexpectedMockInvocationException
+from tests.utils import (
+    FakeCloudFrontClient,
+    FakeS3Client,
+    GeneralTestException,
+    UnexpectedMockInvocationException,
+)
 
 
 def test_build_exceptions_not_suppressed(app):
@@ -24,6 +44,41 @@ def test_build_exceptions_not_suppressed(app):
         assert str(e.value) == "build error"
 
 
+def test_request_build_notifies_build_worker(db_session):
+    connection = db_session.engine.raw_connection()
+    try:
+        connection.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        connection.cursor().execute(f"LISTEN {BUILD_REQUESTED_CHANNEL}")
+
+        request_build()
+
+        select.select([connection.connection], [], [], 1)
+        connection.connection.poll()
+        assert [notify.channel for notify in connection.connection.notifies] == [BUILD_REQUESTED_CHANNEL]
+    finally:
+        connection.close()
+
+
+def test_pending_partial_builds_for_one_measure_are_coalesced_into_a_partial_build(db_session):
+    measure = MeasureFactory()
+    request_build(measure=measure)
+    latest_request = request_build(measure=measure)
+
+    build = _retrieve_and_start_latest_pending_build(db_session.session)
+
+    assert build.id == latest_request.id
+    assert build.measure_id == measure.id
+
+
+def test_pending_partial_builds_for_different_measures_are_coalesced_into_a_full_build(db_session):
+    request_build(measure=MeasureFactory())
+    request_build(measure=MeasureFactory())
+
+    build = _retrieve_and_start_latest_pending_build(db_session.session)
+
+    assert build.measure_id is None
+
+
 def test_static_site_build(db_session, single_use_app):
     """
     A basic test for the core flow of the static site builder. This patches/mocks a few of the key integrations to
@@ -50,7 +105,7 @@ def test_static_site_build(db_session, single_use_app):
                         single_use_app.config["PUSH_SITE"] = False
                         single_use_app.config["DEPLOY_SITE"] = False
                         s3_fs_patch.side_effect = UnexpectedMockInvocationException
-                        trello_service_patch.get_measure_cards.return_value = []
+                        trello_service_patch.get_cached_measure_cards.return_value = []
 
                         from tests.test_data.chart_and_table import chart, simple_table
 
@@ -110,3 +165,254 @@ def test_static_site_build(db_session, single_use_app):
                         refresh_materialized_views()
 
                         do_it(single_use_app, request_build())
+
+
+def _write_build_file(build_dir, path, content):
+    build_dir.join(path).write(content, ensure=True)
+
+
+def test_s3_deployer_only_uploads_changed_files_and_deletes_removed_ones(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>")
+    _write_build_file(build_dir, "topic/index.html", "<p>topic</p>")
+    _write_build_file(build_dir, "static/stylesheets/application-abc123.css", "body {}")
+    s3_client = FakeS3Client(objects={"old-page/index.html": {"Body": b"old"}})
+
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(build_dir))
+
+    assert s3_client.uploaded_keys[0] == "static/stylesheets/application-abc123.css"
+    assert set(s3_client.uploaded_keys) == {
+        "index.html",
+        "topic/index.html",
+        "static/stylesheets/application-abc123.css",
+    }
+    assert s3_client.deleted_keys == ["old-page/index.html"]
+    assert s3_client.objects["index.html"]["ContentType"] == "text/html"
+    assert s3_client.objects["static/stylesheets/application-abc123.css"]["CacheControl"] == "max-age=31536000"
+
+    s3_client.uploaded_keys = []
+    s3_client.deleted_keys = []
+    _write_build_file(build_dir, "topic/index.html", "<p>updated topic</p>")
+    build_dir.join("index.html").remove()
+
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(build_dir))
+
+    assert s3_client.uploaded_keys == ["topic/index.html"]
+    assert s3_client.deleted_keys == ["index.html"]
+
+
+def test_s3_deployer_uploads_compressed_variants_with_content_encoding(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>" * 100)
+    compress_build_outputs(str(build_dir), build_output_manifest(str(build_dir)))
+    s3_client = FakeS3Client()
+
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(build_dir))
+
+    assert s3_client.objects["index.html"]["ContentEncoding"] == "gzip"
+    assert s3_client.objects["index.html"]["ContentType"] == "text/html"
+    assert gzip.decompress(s3_client.objects["index.html"]["Body"]) == b"<p>home</p>" * 100
+    assert ".compressed/index.html.gz" not in s3_client.objects
+
+
+def test_s3_deployer_partial_deploy_keeps_files_not_in_build(tmpdir):
+    full_build_dir = tmpdir.mkdir("full")
+    _write_build_file(full_build_dir, "index.html", "<p>home</p>")
+    _write_build_file(full_build_dir, "topic/index.html", "<p>topic</p>")
+    s3_client = FakeS3Client()
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(full_build_dir))
+
+    partial_build_dir = tmpdir.mkdir("partial")
+    _write_build_file(partial_build_dir, "index.html", "<p>updated home</p>")
+    s3_client.uploaded_keys = []
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(partial_build_dir), partial=True)
+
+    assert s3_client.uploaded_keys == ["index.html"]
+    assert s3_client.deleted_keys == []
+    assert "topic/index.html" in s3_client.objects
+
+    # The next full deploy knows the files from both deploys are already in place
+    _write_build_file(full_build_dir, "index.html", "<p>updated home</p>")
+    s3_client.uploaded_keys = []
+    S3Deployer(s3_client, "site-bucket", workers=2).deploy(str(full_build_dir))
+    assert s3_client.uploaded_keys == []
+
+
+def test_s3_deployer_failing_part_way_is_resumed_by_next_deploy(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    for page in range(3):
+        _write_build_file(build_dir, f"page-{page}/index.html", f"<p>{page}</p>")
+    s3_client = FakeS3Client()
+    upload_file = s3_client.upload_file
+
+    def fail_on_third_upload(Filename, Bucket, Key, ExtraArgs=None):
+        if len(s3_client.uploaded_keys) == 2:
+            raise GeneralTestException("Connection reset")
+        upload_file(Filename, Bucket, Key, ExtraArgs)
+
+    with patch("application.sitebuilder.build_service.DEPLOY_CHECKPOINT_BATCH_SIZE", 1):
+        with patch.object(s3_client, "upload_file", side_effect=fail_on_third_upload):
+            with pytest.raises(GeneralTestException):
+                S3Deployer(s3_client, "site-bucket", workers=1).deploy(str(build_dir))
+
+        previously_uploaded_keys = s3_client.uploaded_keys
+        s3_client.uploaded_keys = []
+        S3Deployer(s3_client, "site-bucket", workers=1).deploy(str(build_dir))
+
+    assert len(s3_client.uploaded_keys) == 1
+    assert s3_client.uploaded_keys[0] not in previously_uploaded_keys
+
+
+def test_versioned_deploy_copies_unchanged_files_and_switches_live_build(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>")
+    _write_build_file(build_dir, "topic/index.html", "<p>topic</p>")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    deployer = VersionedS3Deployer(s3_client, "site-bucket", cloudfront_client, "distribution", workers=2)
+
+    deployer.deploy(str(build_dir), "first")
+
+    assert deployer.live_build()["prefix"] == "builds/first/"
+    assert cloudfront_client.origin_path == "/builds/first"
+    assert set(s3_client.uploaded_keys) == {"builds/first/index.html", "builds/first/topic/index.html"}
+
+    s3_client.uploaded_keys = []
+    _write_build_file(build_dir, "topic/index.html", "<p>updated topic</p>")
+    deployer.deploy(str(build_dir), "second")
+
+    assert deployer.live_build()["prefix"] == "builds/second/"
+    assert cloudfront_client.origin_path == "/builds/second"
+    assert s3_client.uploaded_keys == ["builds/second/topic/index.html"]
+    assert s3_client.copied_keys == ["builds/second/index.html"]
+    assert s3_client.objects["builds/second/index.html"]["ContentType"] == "text/html"
+    assert s3_client.objects["builds/first/topic/index.html"]["Body"] == b"<p>topic</p>"
+
+    # Rolling back only routes requests back to the earlier build
+    s3_client.uploaded_keys = []
+    deployer.switch_to("first")
+    assert deployer.live_build()["prefix"] == "builds/first/"
+    assert cloudfront_client.origin_path == "/builds/first"
+    assert s3_client.uploaded_keys == []
+
+
+def test_versioned_deploy_which_fails_leaves_previous_build_live(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    deployer = VersionedS3Deployer(s3_client, "site-bucket", cloudfront_client, "distribution", workers=1)
+    deployer.deploy(str(build_dir), "first")
+
+    _write_build_file(build_dir, "index.html", "<p>updated home</p>")
+    with patch.object(s3_client, "upload_file", side_effect=GeneralTestException("Connection reset")):
+        with pytest.raises(GeneralTestException):
+            deployer.deploy(str(build_dir), "second")
+
+    assert deployer.live_build()["build_id"] == "first"
+    assert cloudfront_client.origin_path == "/builds/first"
+    with pytest.raises(DeployException):
+        deployer.switch_to("second")
+
+
+def test_versioned_deploy_retries_a_distribution_change_made_concurrently_and_waits_for_it_to_deploy(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    deployer = VersionedS3Deployer(
+        s3_client, "site-bucket", cloudfront_client, "distribution", workers=1, builds_kept=1
+    )
+    _write_build_file(build_dir, "index.html", "<p>first</p>")
+    deployer.deploy(str(build_dir), "first")
+
+    delete = deployer._delete
+
+    def delete_once_deployed(paths):
+        # The old build must not be removed while edge locations could still be serving it
+        assert cloudfront_client.deployed
+        delete(paths)
+
+    cloudfront_client.concurrent_updates = 1
+    _write_build_file(build_dir, "index.html", "<p>second</p>")
+    with patch.object(deployer, "_delete", side_effect=delete_once_deployed) as delete_patch:
+        deployer.deploy(str(build_dir), "second")
+
+    assert cloudfront_client.origin_path == "/builds/second"
+    assert cloudfront_client.deployed
+    assert delete_patch.called
+    assert not any(key.startswith("builds/first/") for key in s3_client.objects)
+
+
+def test_versioned_deploy_gives_up_if_the_distribution_keeps_changing(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    cloudfront_client.concurrent_updates = 10
+    deployer = VersionedS3Deployer(s3_client, "site-bucket", cloudfront_client, "distribution", workers=1)
+
+    with pytest.raises(ClientError):
+        deployer.deploy(str(build_dir), "first")
+
+    assert deployer.live_build() is None
+
+
+def test_versioned_deploy_fails_if_distribution_does_not_serve_the_bucket(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    _write_build_file(build_dir, "index.html", "<p>home</p>")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("other-bucket")
+    deployer = VersionedS3Deployer(s3_client, "site-bucket", cloudfront_client, "distribution", workers=1)
+
+    with pytest.raises(DeployException):
+        deployer.deploy(str(build_dir), "first")
+
+    assert deployer.live_build() is None
+
+
+def test_versioned_deploy_removes_builds_beyond_those_kept(tmpdir):
+    build_dir = tmpdir.mkdir("build")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    deployer = VersionedS3Deployer(
+        s3_client, "site-bucket", cloudfront_client, "distribution", workers=1, builds_kept=2
+    )
+
+    for build_id in ("first", "second", "third"):
+        _write_build_file(build_dir, "index.html", f"<p>{build_id}</p>")
+        deployer.deploy(str(build_dir), build_id)
+
+    assert deployer.live_build()["build_ids"] == ["third", "second"]
+    assert not any(key.startswith("builds/first/") for key in s3_client.objects)
+    assert "builds/second/index.html" in s3_client.objects
+
+
+def test_partial_versioned_deploy_copies_files_not_in_build(tmpdir):
+    full_build_dir = tmpdir.mkdir("full")
+    _write_build_file(full_build_dir, "index.html", "<p>home</p>")
+    _write_build_file(full_build_dir, "topic/index.html", "<p>topic</p>")
+    s3_client = FakeS3Client()
+    cloudfront_client = FakeCloudFrontClient("site-bucket")
+    deployer = VersionedS3Deployer(s3_client, "site-bucket", cloudfront_client, "distribution", workers=2)
+    deployer.deploy(str(full_build_dir), "full")
+
+    partial_build_dir = tmpdir.mkdir("partial")
+    _write_build_file(partial_build_dir, "index.html", "<p>updated home</p>")
+    s3_client.uploaded_keys = []
+    deployer.deploy(str(partial_build_dir), "partial", partial=True)
+
+    assert s3_client.uploaded_keys == ["builds/partial/index.html"]
+    assert s3_client.copied_keys == ["builds/partial/topic/index.html"]
+
+
+@pytest.mark.parametrize("measure", ("topic/measure", "topic/subtopic/measure/1.0", "topic/subtopic/missing-measure"))
+def test_build_static_site_rejects_a_measure_which_is_malformed_or_missing(app, measure, capsys):
+    MeasureFactory(slug="measure", subtopics__slug="subtopic", subtopics__topic__slug="topic")
+
+    with patch.dict(manage.app.config, {"BUILD_SITE": True}):
+        with patch("application.sitebuilder.build_service.build_site") as build_site_patch:
+            with pytest.raises(SystemExit):
+                manage.build_static_site(measure=measure)
+
+    build_site_patch.assert_not_called()
+    assert "measure" in capsys.readouterr().out
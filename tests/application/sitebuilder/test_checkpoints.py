@@ -0,0 +1,103 @@
+import uuid
+
+from application import db
+from application.sitebuilder.checkpoints import (
+    BuildCheckpoint,
+    can_resume,
+    prune_source_data_changes,
+    run_unit,
+    source_data_fingerprint,
+)
+from application.sitebuilder.fingerprints import BuildFingerprints
+from application.sitebuilder.manifest import OutputSources
+from application.sitebuilder.models import Build, BuildStatus
+from tests.models import EthnicityFactory
+
+
+def test_checkpoint_restores_completed_units_and_build_state(tmpdir):
+    build_dir = str(tmpdir)
+    fingerprints = BuildFingerprints()
+    output_sources = OutputSources()
+    checkpoint = BuildCheckpoint.load(build_dir, "source", fingerprints=fingerprints, output_sources=output_sources)
+
+    fingerprints.record("topic/subtopic/measure/1.0", "fingerprint")
+    output_sources.register(build_dir, str(tmpdir.join("topic/subtopic/measure/1.0")), measure_version_id=1)
+    checkpoint.complete("topics/topic")
+
+    assert can_resume(build_dir, "source")
+
+    fingerprints = BuildFingerprints()
+    output_sources = OutputSources()
+    resumed = BuildCheckpoint.load(build_dir, "source", fingerprints=fingerprints, output_sources=output_sources)
+
+    assert resumed.is_complete("topics/topic")
+    assert fingerprints.current == {"topic/subtopic/measure/1.0": "fingerprint"}
+    assert output_sources.source_for("topic/subtopic/measure/1.0/index.html") == {"measure_version_id": 1}
+
+
+def test_checkpoint_is_ignored_if_source_data_has_changed(tmpdir):
+    BuildCheckpoint.load(str(tmpdir), "source").complete("topics/topic")
+
+    assert not can_resume(str(tmpdir), "changed source")
+    assert not BuildCheckpoint.load(str(tmpdir), "changed source").is_complete("topics/topic")
+
+
+def test_cleared_checkpoint_cannot_be_resumed(tmpdir):
+    checkpoint = BuildCheckpoint.load(str(tmpdir), "source")
+    checkpoint.complete("static_pages")
+    checkpoint.clear()
+
+    assert not can_resume(str(tmpdir), "source")
+
+
+def test_run_unit_skips_units_completed_by_a_previous_attempt(tmpdir):
+    BuildCheckpoint.load(str(tmpdir), "source").complete("dashboards/ethnic-groups")
+    checkpoint = BuildCheckpoint.load(str(tmpdir), "source")
+    written = []
+
+    run_unit(checkpoint, "dashboards/ethnic-groups", lambda: written.append("ethnic-groups"))
+    run_unit(checkpoint, "dashboards/geographic-breakdown", lambda: written.append("geographic-breakdown"))
+
+    assert written == ["geographic-breakdown"]
+    assert checkpoint.is_complete("dashboards/geographic-breakdown")
+
+
+def test_source_data_fingerprint_only_changes_when_a_change_is_committed():
+    fingerprint = source_data_fingerprint("templates")
+
+    db.session.execute("INSERT INTO ethnicity (slug, value, position) VALUES ('rolled-back', 'Rolled back', 1)")
+    db.session.rollback()
+    assert source_data_fingerprint("templates") == fingerprint
+
+    EthnicityFactory(value="Indian")
+    changed = source_data_fingerprint("templates")
+    assert changed != fingerprint
+
+    prune_source_data_changes()
+    EthnicityFactory(value="White")
+    assert source_data_fingerprint("templates") not in (fingerprint, changed)
+    assert source_data_fingerprint("other templates") != source_data_fingerprint("templates")
+
+
+def test_source_data_fingerprint_is_not_changed_by_the_build_itself():
+    fingerprint = source_data_fingerprint("templates")
+
+    build = Build(id=str(uuid.uuid4()), status=BuildStatus.STARTED)
+    db.session.add(build)
+    db.session.commit()
+    build.progress = "build_dashboards"
+    db.session.commit()
+
+    assert source_data_fingerprint("templates") == fingerprint
+
+
+def test_pruning_source_data_changes_does_not_commit_the_session():
+    EthnicityFactory(value="Indian")
+    db.session.execute(
+        "INSERT INTO ethnicity (id, slug, value, position) VALUES (1000, 'uncommitted', 'Uncommitted', 1)"
+    )
+
+    prune_source_data_changes()
+    db.session.rollback()
+
+    assert db.session.execute("SELECT count(*) FROM ethnicity WHERE slug = 'uncommitted'").scalar() == 0
@@ -0,0 +1,26 @@
+import gzip
+import os
+
+from application.sitebuilder.compression import compress_build_outputs, compressed_variant
+from application.sitebuilder.manifest import build_output_manifest
+
+
+def test_text_outputs_are_compressed_and_unchanged_files_are_skipped(tmpdir):
+    build_dir = str(tmpdir)
+    tmpdir.join("topic/index.html").write("<p>topic</p>" * 100, ensure=True)
+    tmpdir.join("static/images/logo.png").write_binary(b"\x89PNG" * 100, ensure=True)
+
+    compress_build_outputs(build_dir, build_output_manifest(build_dir))
+
+    compressed_path = compressed_variant(build_dir, "topic/index.html")
+    assert gzip.decompress(open(compressed_path, "rb").read()) == b"<p>topic</p>" * 100
+    assert compressed_variant(build_dir, "static/images/logo.png") is None
+
+    first_mtime = os.stat(compressed_path).st_mtime_ns
+    os.utime(compressed_path, ns=(0, 0))
+    compress_build_outputs(build_dir, build_output_manifest(build_dir))
+    assert os.stat(compressed_path).st_mtime_ns == 0 != first_mtime
+
+    tmpdir.join("topic/index.html").remove()
+    compress_build_outputs(build_dir, build_output_manifest(build_dir))
+    assert compressed_variant(build_dir, "topic/index.html") is None
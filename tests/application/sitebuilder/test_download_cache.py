@@ -0,0 +1,57 @@
+import os
+from unittest.mock import Mock, patch
+
+from application.sitebuilder.download_cache import DownloadCache
+
+
+def _fake_download(tmpdir, content):
+    def get_measure_download(upload, file_name, directory):
+        path = tmpdir.join("download-%s" % file_name)
+        path.write(content)
+        return str(path)
+
+    return get_measure_download
+
+
+@patch("application.sitebuilder.download_cache.upload_service")
+def test_unchanged_upload_is_only_downloaded_once(upload_service, tmpdir):
+    upload_service.get_measure_download_version.return_value = ("1/1.0/source/data.csv", "etag-1")
+    upload_service.get_measure_download.side_effect = _fake_download(tmpdir, "a,1\n")
+    cache = DownloadCache(str(tmpdir.join("cache")), max_bytes=1024)
+    upload = Mock(file_name="data.csv")
+
+    first = cache.get_download(upload)
+    second = cache.get_download(upload)
+
+    assert first == second
+    assert upload_service.get_measure_download.call_count == 1
+    with open(first, encoding="windows-1252") as cached_file:
+        assert cached_file.read() == '"a","1"\n'
+    assert not os.path.exists(str(tmpdir.join("download-data.csv")))
+
+
+@patch("application.sitebuilder.download_cache.upload_service")
+def test_replaced_upload_is_downloaded_again(upload_service, tmpdir):
+    upload_service.get_measure_download.side_effect = _fake_download(tmpdir, "a,1\n")
+    cache = DownloadCache(str(tmpdir.join("cache")), max_bytes=1024)
+    upload = Mock(file_name="data.csv")
+
+    upload_service.get_measure_download_version.return_value = ("1/1.0/source/data.csv", "etag-1")
+    first = cache.get_download(upload)
+    upload_service.get_measure_download_version.return_value = ("1/1.0/source/data.csv", "etag-2")
+    second = cache.get_download(upload)
+
+    assert first != second
+    assert upload_service.get_measure_download.call_count == 2
+
+
+def test_evict_removes_least_recently_used_entries(tmpdir):
+    cache_dir = tmpdir.mkdir("cache")
+    for index, name in enumerate(["oldest", "middle", "newest"]):
+        entry = cache_dir.join(name)
+        entry.write("x" * 10)
+        os.utime(str(entry), (index, index))
+
+    DownloadCache(str(cache_dir), max_bytes=20).evict()
+
+    assert sorted(os.listdir(str(cache_dir))) == ["middle", "newest"]
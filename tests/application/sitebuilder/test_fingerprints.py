@@ -0,0 +1,53 @@
+import os
+
+from application.sitebuilder.fingerprints import BuildFingerprints, templates_fingerprint
+
+
+def test_fingerprints_round_trip_through_build_dir(tmpdir):
+    fingerprints = BuildFingerprints()
+    fingerprints.record("topic/subtopic/measure/1.0", "abc")
+    fingerprints.save(str(tmpdir))
+
+    os.makedirs(os.path.join(str(tmpdir), "topic/subtopic/measure/1.0"))
+    loaded = BuildFingerprints.load(str(tmpdir))
+
+    assert loaded.is_unchanged(str(tmpdir), "topic/subtopic/measure/1.0", "abc")
+    assert not loaded.is_unchanged(str(tmpdir), "topic/subtopic/measure/1.0", "def")
+
+
+def test_fingerprint_is_changed_if_previous_output_is_missing(tmpdir):
+    fingerprints = BuildFingerprints(previous={"topic/subtopic/measure/1.0": "abc"})
+
+    assert not fingerprints.is_unchanged(str(tmpdir), "topic/subtopic/measure/1.0", "abc")
+
+
+def test_load_without_previous_build_has_no_fingerprints(tmpdir):
+    fingerprints = BuildFingerprints.load(str(tmpdir))
+
+    assert fingerprints.previous == {}
+
+
+def test_stale_units_are_removed(tmpdir):
+    os.makedirs(os.path.join(str(tmpdir), "topic/subtopic/old-measure/1.0"))
+    os.makedirs(os.path.join(str(tmpdir), "topic/subtopic/measure/1.0"))
+
+    fingerprints = BuildFingerprints(
+        previous={"topic/subtopic/old-measure/1.0": "abc", "topic/subtopic/measure/1.0": "def"}
+    )
+    fingerprints.record("topic/subtopic/measure/1.0", "def")
+    fingerprints.remove_stale_units(str(tmpdir))
+
+    assert not os.path.exists(os.path.join(str(tmpdir), "topic/subtopic/old-measure/1.0"))
+    assert os.path.exists(os.path.join(str(tmpdir), "topic/subtopic/measure/1.0"))
+
+
+def test_templates_fingerprint_changes_with_template_content(tmpdir):
+    template = tmpdir.join("page.html")
+    template.write("<p>one</p>")
+    first = templates_fingerprint(str(tmpdir))
+
+    template.write("<p>two</p>")
+    second = templates_fingerprint(str(tmpdir))
+
+    assert first != second
+    assert second == templates_fingerprint(str(tmpdir))
@@ -0,0 +1,44 @@
+from application.sitebuilder.manifest import OutputSources, build_output_manifest, diff_manifests
+
+
+def test_build_output_manifest_records_hash_size_and_source(tmpdir):
+    tmpdir.join("topic/subtopic/measure/1.0/index.html").write("<p>page</p>", ensure=True)
+    tmpdir.join("topic/subtopic/measure/1.0/downloads/data.csv").write("a,b", ensure=True)
+    tmpdir.join("README.md").write("not deployed")
+    sources = OutputSources()
+    sources.register(str(tmpdir), str(tmpdir.join("topic/subtopic/measure/1.0")), measure_version_id=1)
+    sources.register(
+        str(tmpdir),
+        str(tmpdir.join("topic/subtopic/measure/1.0/downloads/data.csv")),
+        measure_version_id=1,
+        dimension_guid="dimension-guid",
+    )
+
+    manifest = build_output_manifest(str(tmpdir), sources)
+
+    assert set(manifest) == {"topic/subtopic/measure/1.0/index.html", "topic/subtopic/measure/1.0/downloads/data.csv"}
+    assert manifest["topic/subtopic/measure/1.0/index.html"]["size"] == len("<p>page</p>")
+    assert manifest["topic/subtopic/measure/1.0/index.html"]["source"] == {"measure_version_id": 1}
+    assert manifest["topic/subtopic/measure/1.0/downloads/data.csv"]["source"] == {
+        "measure_version_id": 1,
+        "dimension_guid": "dimension-guid",
+    }
+
+
+def test_diff_manifests():
+    old_manifest = {
+        "index.html": {"hash": "a", "size": 1, "source": None},
+        "removed.html": {"hash": "b", "size": 1, "source": None},
+        "unchanged.html": {"hash": "c", "size": 1, "source": None},
+    }
+    new_manifest = {
+        "index.html": {"hash": "z", "size": 1, "source": None},
+        "added.html": {"hash": "d", "size": 1, "source": None},
+        "unchanged.html": {"hash": "c", "size": 1, "source": None},
+    }
+
+    assert diff_manifests(old_manifest, new_manifest) == {
+        "added": ["added.html"],
+        "removed": ["removed.html"],
+        "changed": ["index.html"],
+    }
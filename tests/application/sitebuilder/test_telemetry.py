@@ -0,0 +1,38 @@
+from application.sitebuilder.telemetry import BuildTelemetry, record_bytes_written, telemetry_page
+
+
+def test_phase_records_queries_and_bytes_written(db_session, tmpdir):
+    output = tmpdir.join("index.html")
+    output.write("<p>page</p>")
+    telemetry = BuildTelemetry()
+
+    with telemetry.active(), telemetry.phase("build"):
+        db_session.session.execute("SELECT 1")
+        record_bytes_written(str(output))
+
+    assert telemetry.phases[0]["name"] == "build"
+    assert telemetry.phases[0]["queries"] == 1
+    assert telemetry.phases[0]["bytes_written"] == len("<p>page</p>")
+
+
+def test_summary_includes_slowest_pages():
+    telemetry = BuildTelemetry()
+    for index in range(5):
+        telemetry.add_page(
+            {"path": f"page-{index}", "seconds": index, "queries": 1, "query_seconds": 0.1, "bytes_written": 10}
+        )
+
+    summary = telemetry.summary(slowest_pages_count=2)
+
+    assert summary["page_count"] == 5
+    assert [page["path"] for page in summary["slowest_pages"]] == ["page-4", "page-3"]
+    assert summary["totals"]["queries"] == 5
+
+
+def test_pages_are_not_recorded_without_active_telemetry():
+    telemetry = BuildTelemetry()
+
+    with telemetry_page("topic"):
+        pass
+
+    assert telemetry.pages == []
@@ -1,7 +1,10 @@
+import json
+import os
+
 import pytest
 
 from application.cms.filters import html_line_breaks
-from application.static_site.filters import render_markdown
+from application.static_site.filters import load_rev_manifest, render_markdown
 from application.static_site.filters import html_params
 
 
@@ -83,3 +86,20 @@ class TestHtmlLineBreaks:
     )
     def test_other_html_is_escaped(self, input_text, expected_output):
         assert html_line_breaks(input_text) == expected_output
+
+
+class TestLoadRevManifest:
+    def test_manifest_is_only_reloaded_when_modified(self, tmpdir):
+        manifest_file = tmpdir.join("rev-manifest.json")
+        manifest_file.write(json.dumps({"application.css": "application-1.css"}))
+        os.utime(str(manifest_file), ns=(1, 1))
+
+        assert load_rev_manifest(str(manifest_file)) == {"application.css": "application-1.css"}
+
+        # Rewritten without changing the mtime, so the cached manifest is still used
+        manifest_file.write(json.dumps({"application.css": "application-2.css"}))
+        os.utime(str(manifest_file), ns=(1, 1))
+        assert load_rev_manifest(str(manifest_file)) == {"application.css": "application-1.css"}
+
+        os.utime(str(manifest_file), ns=(2, 2))
+        assert load_rev_manifest(str(manifest_file)) == {"application.css": "application-2.css"}
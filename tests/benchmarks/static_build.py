@@ -0,0 +1,147 @@
+"""
+Benchmarks the static site build against a synthetic dataset of a configurable size, so that build performance can be
+measured and compared between changes without running a real production build.
+
+Used by `./manage.py benchmark_static_build` and `tests/benchmarks/test_static_build_benchmark.py`.
+"""
+
+import random
+import resource
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import factory.random
+import sqlalchemy
+
+from application import db
+from application.sitebuilder.build import do_it
+from application.sitebuilder.telemetry import BuildTelemetry
+from tests.models import (
+    ALL_FACTORIES,
+    ClassificationFactory,
+    DimensionFactory,
+    MeasureFactory,
+    MeasureVersionFactory,
+    SubtopicFactory,
+    TopicFactory,
+)
+from tests.test_data.chart_and_table import (
+    chart,
+    chart_settings_and_source_data,
+    grouped_table,
+    simple_table,
+    table_settings_and_source_data,
+)
+
+CLASSIFICATIONS_COUNT = 5
+
+
+def generate_synthetic_site(session, topics=2, subtopics=2, measures=2, versions=2, dimensions=2, seed=0):
+    """Create `topics` × `subtopics` × `measures` published measures, each with `versions` published versions of
+    `dimensions` dimensions with a chart and table. Uploads are left out, as they would only measure the file service.
+    The same `seed` always generates the same dataset."""
+    random.seed(seed)
+    factory.random.reseed_random(seed)
+    for model_factory in ALL_FACTORIES:
+        model_factory._meta.sqlalchemy_session = session
+
+    classifications = [ClassificationFactory(id=f"{index + 1}A") for index in range(CLASSIFICATIONS_COUNT)]
+
+    for topic_index in range(topics):
+        topic = TopicFactory(slug=f"topic-{topic_index}")
+
+        for subtopic_index in range(subtopics):
+            subtopic = SubtopicFactory(topic=topic, slug=f"subtopic-{topic_index}-{subtopic_index}")
+
+            for measure_index in range(measures):
+                measure = MeasureFactory(
+                    subtopics=[subtopic], slug=f"measure-{topic_index}-{subtopic_index}-{measure_index}"
+                )
+
+                for version_index in range(versions):
+                    measure_version = MeasureVersionFactory(
+                        measure=measure,
+                        status="APPROVED",
+                        latest=version_index == versions - 1,
+                        version=f"{version_index + 1}.0",
+                        published_at=date.today() - timedelta(weeks=versions - version_index),
+                        uploads=[],
+                    )
+                    for dimension_index in range(dimensions):
+                        _create_dimension(measure_version, dimension_index, random.choice(classifications))
+
+    session.commit()
+
+
+def _create_dimension(measure_version, position, classification):
+    return DimensionFactory(
+        measure_version=measure_version,
+        position=position,
+        dimension_chart__classification=classification,
+        dimension_chart__chart_object=chart,
+        dimension_chart__settings_and_source_data=chart_settings_and_source_data,
+        dimension_table__classification=classification,
+        dimension_table__table_object=simple_table() if position % 2 == 0 else grouped_table(),
+        dimension_table__settings_and_source_data=table_settings_and_source_data,
+        classification_links__classification=classification,
+    )
+
+
+def run_static_build_benchmark(app, build_workers=None):
+    """Build the whole site from the data already in the database, without deploying it, and return a report of its
+    performance which can be serialised as JSON and compared with other runs."""
+    from application.dashboard.view_refresh import refresh_dashboard_views
+
+    build_dir = tempfile.mkdtemp(prefix="benchmark-build-")
+    telemetry = BuildTelemetry()
+
+    try:
+        with patch.dict(app.config), patch("application.dashboard.data_helpers.trello_service") as trello_service:
+            app.config["STATIC_BUILD_DIR"] = build_dir
+            app.config["DEPLOY_SITE"] = False
+            app.config["LOCAL_BUILD"] = False
+            app.config["INCREMENTAL_BUILD"] = False
+            if build_workers is not None:
+                app.config["BUILD_WORKERS"] = build_workers
+            trello_service.get_cached_measure_cards.return_value = []
+
+            with telemetry.active():
+                with app.app_context(), telemetry.phase("refresh_materialized_views"):
+                    refresh_dashboard_views(refresh_all=True)
+                do_it(app, None)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    summary = telemetry.summary()
+    totals = summary["totals"]
+    page_count = summary["page_count"]
+
+    return {
+        "page_count": page_count,
+        "seconds": totals["seconds"],
+        "pages_per_second": round(page_count / totals["seconds"], 3) if totals["seconds"] else None,
+        "queries": totals["queries"],
+        "queries_per_page": round(totals["queries"] / page_count, 3) if page_count else None,
+        "bytes_written": totals["bytes_written"],
+        "peak_rss_bytes": _peak_rss_bytes(resource.RUSAGE_SELF),
+        "peak_worker_rss_bytes": _peak_rss_bytes(resource.RUSAGE_CHILDREN),
+        "phases": summary["phases"],
+    }
+
+
+def _peak_rss_bytes(who):
+    # Reported in kilobytes on Linux, but bytes on macOS
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def clear_database():
+    """Remove the data from every table, but not the materialized views, as the test suite does before each test."""
+    view_names = sqlalchemy.inspect(db.engine).get_view_names()
+    for table in reversed(db.metadata.sorted_tables):
+        if table.name not in view_names:
+            db.engine.execute(table.delete())
+    db.session.commit()
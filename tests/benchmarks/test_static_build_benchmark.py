@@ -0,0 +1,23 @@
+import json
+import os
+
+from tests.benchmarks.static_build import generate_synthetic_site, run_static_build_benchmark
+
+
+def test_static_build_benchmark(db_session, single_use_app):
+    """Builds a small synthetic site to catch build-time regressions. Set BUILD_BENCHMARK_REPORT to a file path to keep
+    the report so it can be compared with other runs."""
+    generate_synthetic_site(db_session.session, topics=2, subtopics=2, measures=2, versions=2, dimensions=2)
+
+    report = run_static_build_benchmark(single_use_app, build_workers=1)
+
+    if os.environ.get("BUILD_BENCHMARK_REPORT"):
+        with open(os.environ["BUILD_BENCHMARK_REPORT"], "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    # 2 topic pages, and a page for each of the 2 published versions of 8 measures
+    assert report["page_count"] == 18
+    assert report["pages_per_second"] > 0
+    assert report["queries_per_page"] > 0
+    assert report["peak_rss_bytes"] > 0
+    assert [phase["name"] for phase in report["phases"]][:2] == ["refresh_materialized_views", "prepare_build_dir"]
@@ -1,3 +1,7 @@
+import io
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
 from lxml import html
 from werkzeug.datastructures import ImmutableMultiDict
 
@@ -101,3 +105,106 @@ def find_input_for_label_with_text(dom_node, label_text):
         raise Exception(f"{number_of_matching_label_tags} labels found with the text '{label_text}'")
     else:
         raise Exception(f"No label not found with the text '{label_text}'")
+
+
+class FakeS3Client:
+    """An in-memory stand-in for the parts of a boto3 S3 client used when deploying the static site."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self.uploaded_keys = []
+        self.copied_keys = []
+        self.deleted_keys = []
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, "rb") as uploaded_file:
+            self.objects[Key] = {"Body": uploaded_file.read(), **(ExtraArgs or {})}
+        self.uploaded_keys.append(Key)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = {"Body": Body, **kwargs}
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective="COPY"):
+        self.objects[Key] = dict(self.objects[CopySource["Key"]])
+        self.copied_keys.append(Key)
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not found"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key]["Body"])}
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+            self.deleted_keys.append(obj["Key"])
+        return {}
+
+    def get_paginator(self, operation_name):
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix=""):
+                yield {"Contents": [{"Key": key} for key in sorted(client.objects) if key.startswith(Prefix)]}
+
+        return Paginator()
+
+
+class FakeCloudFrontClient:
+    """An in-memory stand-in for the parts of a boto3 CloudFront client used to switch the live static site build."""
+
+    def __init__(self, bucket_name):
+        self.etag = 1
+        self.origin = {"Id": "static-site", "DomainName": f"{bucket_name}.s3-website.eu-west-2.amazonaws.com"}
+        self.deployed = True
+        # The number of times the distribution is changed by someone else just after its config is read
+        self.concurrent_updates = 0
+
+    @property
+    def origin_path(self):
+        return self.origin.get("OriginPath", "")
+
+    def get_distribution_config(self, Id):
+        distribution_config = {"Origins": {"Quantity": 1, "Items": [dict(self.origin)]}}
+        response = {"ETag": str(self.etag), "DistributionConfig": distribution_config}
+        if self.concurrent_updates:
+            self.concurrent_updates -= 1
+            self.etag += 1
+        return response
+
+    def update_distribution(self, Id, IfMatch, DistributionConfig):
+        if IfMatch != str(self.etag):
+            raise ClientError({"Error": {"Code": "PreconditionFailed", "Message": "Stale ETag"}}, "UpdateDistribution")
+        self.origin = DistributionConfig["Origins"]["Items"][0]
+        self.etag += 1
+        self.deployed = False
+
+    def get_waiter(self, waiter_name):
+        assert waiter_name == "distribution_deployed"
+        return self
+
+    def wait(self, Id):
+        self.deployed = True
+
+
+class FakeTrelloClient:
+    """A local stand-in for the parts of the Trello API client used to fetch the cards on the planned pages board."""
+
+    def __init__(self, cards=None):
+        self.cards = list(cards or [])
+        self.fetch_count = 0
+        self.error = None
+
+    def get_board(self, board_id):
+        return self
+
+    def all_cards(self):
+        self.fetch_count += 1
+        if self.error is not None:
+            raise self.error
+        return list(self.cards)
+
+
+def fake_trello_card(card_id, name, list_id, labels=(), closed=False):
+    return SimpleNamespace(
+        id=card_id, name=name, idList=list_id, labels=[SimpleNamespace(name=label) for label in labels], closed=closed
+    )